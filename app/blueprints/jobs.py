@@ -1,25 +1,49 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from app import db
 from app.models.jenkins_job_config import JenkinsJobConfig
-from app.services.jenkins_service import JenkinsService
+from app.services.jenkins_service import JenkinsService, get_breaker_metrics, jenkins_connections, jenkins_snapshots
 from app.services.scheduler_service import SchedulerService
 
 bp = Blueprint('jobs', __name__)
 
 scheduler_service = SchedulerService()
 
+# Jenkins ball color -> (label, bootstrap badge color)
+JOB_COLOR_BADGES = {
+    'blue': ('Успешно', 'success'),
+    'red': ('Ошибка', 'danger'),
+    'yellow': ('Нестабильно', 'warning'),
+    'aborted': ('Прервано', 'secondary'),
+    'notbuilt': ('Не запускалась', 'light text-dark'),
+    'disabled': ('Отключена', 'dark'),
+}
+
+def job_status_badge(state):
+    """(label, badge color) of a job snapshot entry"""
+    if not state:
+        return 'Нет данных', 'light text-dark'
+    if state['inQueue']:
+        return 'В очереди', 'info'
+    color = state.get('color') or ''
+    if color.endswith('_anime'):
+        return 'Выполняется', 'primary'
+    return JOB_COLOR_BADGES.get(color, (color or 'Нет данных', 'light text-dark'))
+
 @bp.route('/')
 def list_jobs():
     page = request.args.get('page', 1, type=int)
     jobs = JenkinsJobConfig.query.order_by(JenkinsJobConfig.id.desc()).paginate(
         page=page, per_page=20, error_out=False
     )
-    return render_template('jobs/list.html', jobs=jobs)
+    states = JenkinsService().get_config_statuses(jobs.items)
+    statuses = {job_id: job_status_badge(state) for job_id, state in states.items()}
+    return render_template('jobs/list.html', jobs=jobs, statuses=statuses)
 
 @bp.route('/<int:job_id>')
 def job_detail(job_id):
     job = JenkinsJobConfig.query.get_or_404(job_id)
-    return render_template('jobs/detail.html', job=job)
+    state = JenkinsService().get_config_statuses([job])[job.id]
+    return render_template('jobs/detail.html', job=job, state=state, status=job_status_badge(state))
 
 @bp.route('/create', methods=['GET', 'POST'])
 def create_job():
@@ -62,10 +86,10 @@ def trigger_job(job_id):
     job = JenkinsJobConfig.query.get_or_404(job_id)
     jenkins_service = JenkinsService()
     
-    success, message = jenkins_service.trigger_job_by_config(job_id)
+    success, message, handle = jenkins_service.trigger_job_by_config(job_id)
     
     if success:
-        flash(f'Job {job.job_name} successfully triggered', 'success')
+        flash(f'Job {job.job_name} successfully triggered (queue item {handle.queue_id})', 'success')
     else:
         flash(f'Failed to trigger job: {message}', 'error')
     
@@ -110,11 +134,12 @@ def api_trigger_job(job_id):
     data = request.get_json() or {}
     parameters = data.get('parameters', {})
 
-    success, message = jenkins_service.trigger_job_by_config(job_id, parameters)
+    success, message, handle = jenkins_service.trigger_job_by_config(job_id, parameters)
 
     return jsonify({
         'success': success,
         'message': message,
+        'build': handle.to_dict() if handle else None,
         'job_name': job.job_name,
         'job_id': job_id,
         'parameters': parameters
@@ -136,12 +161,84 @@ def api_trigger_job_by_url():
     parameters = data.get('parameters', {})
 
     jenkins_service = JenkinsService()
-    success, message = jenkins_service.trigger_job_by_url(jenkins_url, job_name, parameters)
+    success, message, handle = jenkins_service.trigger_job_by_url(jenkins_url, job_name, parameters)
 
     return jsonify({
         'success': success,
         'message': message,
+        'build': handle.to_dict() if handle else None,
         'jenkins_url': jenkins_url,
         'job_name': job_name,
         'parameters': parameters
-    }), 200 if success else 500
\ No newline at end of file
+    }), 200 if success else 500
+
+@bp.route('/api/connection-stats')
+def api_connection_stats():
+    """Shared Jenkins connections of this worker process"""
+    return jsonify(jenkins_connections.get_stats())
+
+@bp.route('/api/metrics')
+def api_metrics():
+    """Circuit breaker state, request latency, connections and snapshot cache of this worker process"""
+    return jsonify({
+        'breakers': get_breaker_metrics(),
+        'connections': jenkins_connections.get_stats(),
+        'snapshots': jenkins_snapshots.get_stats()
+    })
+
+@bp.route('/api/status')
+def api_status():
+    """Current state of configured jobs from the per-server snapshots (?refresh=1 to bypass the cache)"""
+    query = JenkinsJobConfig.query
+    project = request.args.get('project')
+    if project:
+        query = query.filter_by(project=project)
+    jobs = query.order_by(JenkinsJobConfig.job_name).all()
+    jenkins_urls = sorted({job.project_url for job in jobs})
+    
+    if request.args.get('refresh', '').lower() in ('1', 'true', 'yes'):
+        for jenkins_url in jenkins_urls:
+            jenkins_snapshots.invalidate(jenkins_url)
+    
+    jenkins_service = JenkinsService()
+    servers = jenkins_service.get_servers_status(jenkins_urls)
+    states = jenkins_service.get_config_statuses(jobs, fetch=False)
+    return jsonify({
+        'jobs': [{
+            'id': job.id,
+            'job_name': job.job_name,
+            'project': job.project,
+            'project_url': job.project_url,
+            'status': job_status_badge(states[job.id])[0],
+            'state': states[job.id]
+        } for job in jobs],
+        'servers': servers,
+        'cache': jenkins_snapshots.get_stats()
+    })
+
+@bp.route('/api/servers')
+def api_servers():
+    """Summary of every configured Jenkins server, queried in parallel (?jobs=1 adds all their jobs)"""
+    jenkins_urls = [row.project_url for row in db.session.query(JenkinsJobConfig.project_url).distinct()]
+    jenkins_service = JenkinsService()
+    response = {'servers': jenkins_service.get_servers_status(jenkins_urls)}
+    if request.args.get('jobs', '').lower() in ('1', 'true', 'yes'):
+        response['jobs'] = jenkins_service.list_all_jobs(jenkins_urls)
+    return jsonify(response)
+
+@bp.route('/api/trigger-batch', methods=['POST'])
+def api_trigger_batch():
+    """Trigger several jobs: [{jenkins_url, job_name, parameters}], different servers in parallel"""
+    data = request.get_json()
+    items = data.get('jobs') if isinstance(data, dict) else data
+    if not items or not all(isinstance(item, dict) and item.get('jenkins_url') and item.get('job_name') for item in items):
+        return jsonify({
+            'success': False,
+            'message': 'jobs list with jenkins_url and job_name is required'
+        }), 400
+    
+    results = JenkinsService().trigger_jobs([
+        (item['jenkins_url'], item['job_name'], item.get('parameters') or None) for item in items
+    ])
+    success = all(result['success'] for result in results)
+    return jsonify({'success': success, 'results': results}), 200 if success else 500
\ No newline at end of file
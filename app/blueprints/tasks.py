@@ -1,14 +1,27 @@
+import queue
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, current_app
 from sqlalchemy import or_
 from app import db
+from app.models.jira_outbox import JiraOutbox
 from app.models.jira_task import JiraTask
-from app.services.jira_service import JiraService
+from app.models.resource_lock import ResourceLock
+from app.services.jira_outbox_service import JiraOutboxService
+from app.services.jira_service import JiraService, jira_clients
+from app.services.jira_webhook_service import get_jira_webhook_service
 from app.services.task_scheduler_service import TaskSchedulerService
 from app.services.auto_task_service import AutoTaskService
 from app.services.autolt_service import AutoLTService
 
 bp = Blueprint('tasks', __name__)
 
+def _sync_counts_text(sync_stats):
+    """'новых 1, обновлено 2, без изменений 3' from JiraService.last_sync_stats"""
+    sync_stats = sync_stats or {}
+    return (
+        f"новых {sync_stats.get('inserted', 0)}, обновлено {sync_stats.get('updated', 0)}, "
+        f"без изменений {sync_stats.get('unchanged', 0)}"
+    )
+
 @bp.route('/')
 def list_tasks():
     page = request.args.get('page', 1, type=int)
@@ -49,7 +62,7 @@ def task_detail(task_id):
 @bp.route('/sync', methods=['POST'])
 def sync_tasks():
     jql = request.form.get('jql', 'project = "YOUR_PROJECT" AND status != "Closed"')
-    max_results = request.form.get('max_results', 50, type=int)
+    max_results = request.form.get('max_results', type=int)  # None - sync all pages
     
     jira_service = JiraService()
     synced_count = jira_service.sync_tasks_to_db(jql, max_results)
@@ -64,33 +77,83 @@ def sync_tasks():
 @bp.route('/sync-ekplt', methods=['POST', 'GET'])
 def sync_ekplt_tasks():
     """Sync EKPLT tasks with autolt label and planned_start >= today"""
-    max_results = request.form.get('max_results', 100, type=int)
+    max_results = request.form.get('max_results', type=int)  # None - sync all pages
     
     jira_service = JiraService()
     synced_count = jira_service.sync_ekplt_autolt_tasks(max_results)
     
-    if synced_count > 0:
-        flash(f'Синхронизировано {synced_count} задач EKPLT с меткой "autolt"', 'success')
+    if synced_count is None:
+        flash('Не удалось синхронизировать задачи EKPLT', 'error')
+    elif synced_count > 0:
+        flash(f'Синхронизировано {synced_count} задач EKPLT с меткой "autolt" ({_sync_counts_text(jira_service.last_sync_stats)})', 'success')
     else:
-        flash('Не удалось синхронизировать задачи EKPLT или задачи не найдены', 'warning')
+        flash('Задачи EKPLT с меткой "autolt" не изменились с прошлой синхронизации', 'info')
     
     return redirect(url_for('tasks.list_tasks'))
 
 @bp.route('/api/sync-ekplt', methods=['POST'])
 def api_sync_ekplt_tasks():
     """API endpoint for EKPLT task synchronization"""
-    max_results = request.json.get('max_results', 100) if request.json else 100
+    max_results = request.json.get('max_results') if request.json else None
+    full = bool(request.json.get('full', False)) if request.json else False
     
     jira_service = JiraService()
-    synced_count = jira_service.sync_ekplt_autolt_tasks(max_results)
+    synced_count = jira_service.sync_ekplt_autolt_tasks(max_results, full=full)
+    
+    if synced_count is None:
+        message = 'Ошибка синхронизации задач EKPLT'
+    else:
+        message = f'Синхронизировано {synced_count} задач EKPLT ({_sync_counts_text(jira_service.last_sync_stats)})'
     
     return jsonify({
-        'success': synced_count > 0,
-        'synced_count': synced_count,
-        'message': f'Синхронизировано {synced_count} задач EKPLT' if synced_count > 0 
-                  else 'Задачи не найдены или произошла ошибка'
+        'success': synced_count is not None,
+        'synced_count': synced_count or 0,
+        'sync_stats': jira_service.last_sync_stats,
+        'message': message
     })
 
+@bp.route('/api/jira-client-stats')
+def api_jira_client_stats():
+    """Shared Jira client statistics for this worker process"""
+    return jsonify(jira_clients.get_stats())
+
+@bp.route('/api/jira-outbox-drain', methods=['POST'])
+def api_jira_outbox_drain():
+    """Push pending Jira updates of scheduling decisions (for cron)"""
+    max_batches = request.args.get('max_batches', type=int)
+    stats = JiraOutboxService().drain(max_batches=max_batches)
+    return jsonify({'success': True, 'drained': stats, 'outbox': JiraOutbox.get_stats()})
+
+@bp.route('/api/jira-outbox-stats')
+def api_jira_outbox_stats():
+    """Jira outbox rows per status"""
+    return jsonify(JiraOutbox.get_stats())
+
+@bp.route('/api/jira-webhook', methods=['POST'])
+def api_jira_webhook():
+    """Jira webhook receiver for issue created/updated/deleted events"""
+    webhook_service = get_jira_webhook_service(current_app._get_current_object())
+    
+    secret = request.args.get('secret') or request.headers.get('X-Webhook-Secret')
+    if not webhook_service.is_authorized(secret):
+        return jsonify({'success': False, 'message': 'Invalid webhook secret'}), 403
+    
+    try:
+        event = webhook_service.enqueue(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except queue.Full:
+        return jsonify({'success': False, 'message': 'Webhook queue is full'}), 503
+    
+    if event is None:
+        return jsonify({'success': True, 'message': 'Event ignored'})
+    
+    return jsonify({
+        'success': True,
+        'event': event,
+        'queued': webhook_service.queue.qsize()
+    }), 202
+
 @bp.route('/api/tasks')
 def api_tasks():
     page = request.args.get('page', 1, type=int)
@@ -126,6 +189,8 @@ def api_update_task(task_id):
     for field in allowed_fields:
         if field in data:
             setattr(task, field, data[field])
+    # Local edits no longer match Jira - let the next sync rewrite the row
+    task.content_hash = None
     
     db.session.commit()
     return jsonify(task.to_dict())
@@ -141,9 +206,11 @@ def schedule_tasks():
 
 @bp.route('/api/schedule-tasks', methods=['POST'])
 def api_schedule_tasks():
-    """API endpoint for task scheduling"""
+    """API endpoint for task scheduling (?dry_run=true plans without writing anything)"""
+    dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+    horizon_days = request.args.get('horizon_days', type=int)
     scheduler = TaskSchedulerService()
-    result = scheduler.schedule_next_tasks()
+    result = scheduler.schedule_next_tasks(dry_run=dry_run, horizon_days=horizon_days)
     return jsonify(result)
 
 @bp.route('/api/scheduling-status')
@@ -153,6 +220,16 @@ def api_scheduling_status():
     status = scheduler.get_scheduling_status()
     return jsonify(status)
 
+@bp.route('/api/duration-stats')
+def api_duration_stats():
+    """Run duration percentiles per pipeline and slot utilization gained by sizing slots from them"""
+    scheduler = TaskSchedulerService()
+    report = scheduler.duration_stats.get_utilization_report(
+        scheduler.slot_hours, scheduler.default_slot_hours, scheduler.calendar, scheduler.stands
+    )
+    report['enabled'] = current_app.config['SCHEDULER_DURATION_STATS_ENABLED']
+    return jsonify(report)
+
 @bp.route('/api/auto-sync-and-schedule', methods=['POST'])
 def api_auto_sync_and_schedule():
     """API endpoint for automated sync and scheduling (for cron)"""
@@ -169,63 +246,29 @@ def api_auto_sync_only():
 
 @bp.route('/api/autolt-process', methods=['POST'])
 def api_autolt_process():
-    """API endpoint for AutoLT process execution (for cron) - starts process in background"""
-    import threading
-    from datetime import datetime
-
-    def run_background_process():
-        """Run AutoLT process in background thread"""
-        from flask import current_app
-        import logging
-
-        try:
-            # Import app from main module
-            from run import app
-            with app.app_context():
-                autolt_service = AutoLTService()
-                result = autolt_service.run_autolt_process()
-                current_app.logger.info(f"🏁 Background AutoLT process completed: {result}")
-        except Exception as e:
-            try:
-                from run import app
-                with app.app_context():
-                    current_app.logger.error(f"❌ Background AutoLT process failed: {e}")
-            except Exception:
-                # Fallback to basic logging if app context unavailable
-                logging.error(f"❌ Background AutoLT process failed: {e}")
-
-    # Start background thread
-    thread = threading.Thread(target=run_background_process, daemon=True)
-    thread.start()
-
-    # Return immediate response
-    return jsonify({
-        "status": "started",
-        "message": "AutoLT process started in background",
-        "started_at": datetime.utcnow().isoformat(),
-        "thread_id": thread.ident,
-        "info": "Process will run in background. Check logs for progress updates."
-    })
+    """API endpoint for AutoLT process execution (for cron) - queues tasks of the current hour and advances runs"""
+    autolt_service = AutoLTService()
+    result = autolt_service.run_autolt_process()
+    return jsonify(result)
+
+@bp.route('/api/pipeline-tick', methods=['POST'])
+def api_pipeline_tick():
+    """API endpoint advancing due pipeline runs by one step (for cron, every minute)"""
+    autolt_service = AutoLTService()
+    result = autolt_service.tick()
+    return jsonify(result)
 
 @bp.route('/api/autolt-status', methods=['GET'])
 def api_autolt_status():
-    """API endpoint to check status of background AutoLT processes"""
-    import threading
-
-    active_threads = []
-    for thread in threading.enumerate():
-        if thread.name.startswith('Thread-') and thread.is_alive():
-            active_threads.append({
-                "thread_id": thread.ident,
-                "thread_name": thread.name,
-                "is_alive": thread.is_alive(),
-                "daemon": thread.daemon
-            })
+    """API endpoint to check status of AutoLT pipeline runs"""
+    autolt_service = AutoLTService()
+    active_runs = autolt_service.get_active_runs()
 
     return jsonify({
-        "active_background_threads": len(active_threads),
-        "threads": active_threads,
-        "info": "Check application logs for detailed progress information"
+        "active_runs": len(active_runs),
+        "runs": active_runs,
+        "locks": ResourceLock.get_locks(),
+        "info": "Runs are advanced by /tasks/api/pipeline-tick, check application logs for details"
     })
 
 @bp.route('/api/auto-schedule-only', methods=['POST'])
@@ -1,4 +1,8 @@
 from app.models.jira_task import JiraTask
 from app.models.jenkins_job_config import JenkinsJobConfig
 from app.models.user_data import UserData
-from app.models.scheduler import Scheduler
\ No newline at end of file
+from app.models.scheduler import Scheduler
+from app.models.sync_watermark import SyncWatermark
+from app.models.slot_reservation import SlotReservation
+from app.models.jira_outbox import JiraOutbox
+from app.models.resource_lock import ResourceLock
\ No newline at end of file
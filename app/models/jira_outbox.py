@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, or_, and_
+from app import db
+
+class JiraOutbox(db.Model):
+    """
+    Jira mutations waiting to be pushed. Rows are written in the same transaction
+    as the local change and drained asynchronously by JiraOutboxService
+    """
+    __tablename__ = 'jira_outbox'
+    __table_args__ = (
+        Index('ix_jira_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    jira_key = Column(String(50), nullable=False, index=True)
+    action = Column(String(30), nullable=False)  # schedule
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')  # pending, in_flight, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)  # Lease of the drainer that claimed the row
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<JiraOutbox {self.jira_key}:{self.action}:{self.status}>'
+    
+    @classmethod
+    def claim_batch(cls, limit, lease_seconds):
+        """
+        Lock up to limit due rows with FOR UPDATE SKIP LOCKED, lease them to this drainer and commit.
+        Rows of a crashed drainer become due again when their lease expires.
+        Returns plain dicts so they can be handed to worker threads
+        """
+        now = datetime.utcnow()
+        rows = cls.query.filter(
+            or_(
+                and_(cls.status == 'pending', cls.next_attempt_at <= now),
+                and_(cls.status == 'in_flight', cls.locked_until < now)
+            )
+        ).order_by(cls.id).limit(limit).with_for_update(skip_locked=True).all()
+        
+        claimed = []
+        for row in rows:
+            row.status = 'in_flight'
+            row.locked_until = now + timedelta(seconds=lease_seconds)
+            row.attempts += 1
+            claimed.append({
+                'id': row.id,
+                'jira_key': row.jira_key,
+                'action': row.action,
+                'payload': row.payload,
+                'attempts': row.attempts
+            })
+        db.session.commit()
+        return claimed
+    
+    @classmethod
+    def mark_done(cls, ids):
+        if ids:
+            cls.query.filter(cls.id.in_(ids)).update(
+                {'status': 'done', 'locked_until': None, 'last_error': None, 'updated_at': datetime.utcnow()},
+                synchronize_session=False
+            )
+    
+    @classmethod
+    def mark_retry(cls, row_id, error, delay_seconds):
+        cls.query.filter(cls.id == row_id).update(
+            {
+                'status': 'pending',
+                'locked_until': None,
+                'last_error': error,
+                'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay_seconds),
+                'updated_at': datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+    
+    @classmethod
+    def mark_failed(cls, row_id, error):
+        cls.query.filter(cls.id == row_id).update(
+            {'status': 'failed', 'locked_until': None, 'last_error': error, 'updated_at': datetime.utcnow()},
+            synchronize_session=False
+        )
+    
+    @classmethod
+    def get_stats(cls):
+        """Row count per status and age of the oldest pending row"""
+        counts = dict(db.session.query(cls.status, db.func.count()).group_by(cls.status).all())
+        oldest = db.session.query(db.func.min(cls.created_at)).filter(cls.status.in_(['pending', 'in_flight'])).scalar()
+        return {
+            'pending': counts.get('pending', 0),
+            'in_flight': counts.get('in_flight', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_seconds': round((datetime.utcnow() - oldest).total_seconds()) if oldest else None
+        }
\ No newline at end of file
@@ -1,6 +1,17 @@
+import hashlib
+import json
 from datetime import datetime
+from sqlalchemy import literal_column, or_, update
+from sqlalchemy.dialects.postgresql import insert
 from app import db
 
+# Columns filled from Jira on every sync
+SYNCED_COLUMNS = (
+    'summary', 'description', 'status', 'assignee', 'reporter', 'priority',
+    'issue_type', 'project_key', 'planned_start', 'labels',
+    'created_date', 'updated_date', 'resolved_date'
+)
+
 class JiraTask(db.Model):
     __tablename__ = 'jira_tasks'
     __table_args__ = {'schema': 'autoltv2'}
@@ -26,6 +37,7 @@ class JiraTask(db.Model):
     resolved_date = db.Column(db.DateTime)
     
     # Metadata
+    content_hash = db.Column(db.String(40))  # SHA-1 of synced columns, see compute_content_hash
     last_synced = db.Column(db.DateTime, default=datetime.now())
     created_at = db.Column(db.DateTime, default=datetime.now())
     updated_at = db.Column(db.DateTime, default=datetime.now(), onupdate=datetime.now())
@@ -33,6 +45,82 @@ class JiraTask(db.Model):
     def __repr__(self):
         return f'<JiraTask {self.jira_key}: {self.summary}>'
     
+    @staticmethod
+    def compute_content_hash(row):
+        """Stable hash of the synced columns of a row dict"""
+        payload = json.dumps([row.get(column) for column in SYNCED_COLUMNS], default=str, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def upsert_many(cls, rows, newer_only=False):
+        """
+        Insert or update tasks keyed by jira_key in one INSERT ... ON CONFLICT DO UPDATE.
+        Rows whose content hash did not change are not rewritten, only last_synced
+        is touched for them with a separate bulk UPDATE.
+        With newer_only a row does not overwrite a stored task with a later updated_date
+        (such rows are counted as unchanged).
+        Returns inserted/updated/unchanged counts
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not rows:
+            return counts
+        
+        now = datetime.now()
+        table = cls.__table__
+        
+        # ON CONFLICT cannot affect the same row twice in one statement - keep the last row per key
+        values = {}
+        for row in rows:
+            value = {key: row.get(key) for key in SYNCED_COLUMNS}
+            value.update(
+                jira_key=row['jira_key'],
+                content_hash=cls.compute_content_hash(row),
+                last_synced=now,
+                created_at=now,
+                updated_at=now
+            )
+            values[row['jira_key']] = value
+        
+        stmt = insert(table).values(list(values.values()))
+        excluded = stmt.excluded
+        set_ = {column: excluded[column] for column in SYNCED_COLUMNS}
+        set_.update(
+            content_hash=excluded.content_hash,
+            last_synced=excluded.last_synced,
+            updated_at=excluded.updated_at
+        )
+        
+        where = table.c.content_hash.is_distinct_from(excluded.content_hash)
+        if newer_only:
+            # Events from several workers can be applied out of order
+            where = where & or_(
+                table.c.updated_date.is_(None),
+                excluded.updated_date.is_(None),
+                excluded.updated_date >= table.c.updated_date
+            )
+        
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.jira_key],
+            set_=set_,
+            where=where
+        ).returning(table.c.jira_key, literal_column('xmax = 0').label('inserted'))
+        
+        written_keys = set()
+        for jira_key, inserted in db.session.execute(stmt):
+            written_keys.add(jira_key)
+            counts['inserted' if inserted else 'updated'] += 1
+        
+        unchanged_keys = [jira_key for jira_key in values if jira_key not in written_keys]
+        counts['unchanged'] = len(unchanged_keys)
+        if unchanged_keys:
+            # Keep updated_at as is, otherwise the column onupdate default would bump it
+            db.session.execute(
+                update(table)
+                .where(table.c.jira_key.in_(unchanged_keys))
+                .values(last_synced=now, updated_at=table.c.updated_at)
+            )
+        return counts
+    
     def to_dict(self):
         return {
             'id': self.id,
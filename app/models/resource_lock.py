@@ -0,0 +1,67 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+
+class ResourceLock(db.Model):
+    """
+    Durable lock on a shared resource (a Jenkins job) held by a pipeline run.
+    Survives restarts together with the run and is released when the run ends
+    """
+    __tablename__ = 'resource_locks'
+    
+    resource = Column(String(100), primary_key=True)  # e.g. jenkins:Start_EKP_pipe
+    holder_id = Column(Integer, nullable=False, index=True)  # scheduler.id of the run
+    holder = Column(String(50), nullable=True)  # jira_task, for humans
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ResourceLock {self.resource}:{self.holder}>'
+    
+    @classmethod
+    def acquire(cls, resources, holder_id, holder=None):
+        """
+        Take all resources for holder_id or none of them, inside the current transaction.
+        Resources the holder already owns count as taken. Returns True on success
+        """
+        resources = sorted(set(resources))
+        if not resources:
+            return True
+        
+        with db.session.begin_nested() as savepoint:
+            # Sorted inserts: concurrent holders wait on the same first key instead of deadlocking
+            for resource in resources:
+                db.session.execute(insert(cls.__table__).values(
+                    resource=resource,
+                    holder_id=holder_id,
+                    holder=holder,
+                    acquired_at=datetime.utcnow()
+                ).on_conflict_do_nothing(index_elements=['resource']))
+            
+            owned = db.session.query(db.func.count()).filter(
+                cls.resource.in_(resources),
+                cls.holder_id == holder_id
+            ).scalar()
+            if owned != len(resources):
+                savepoint.rollback()
+                return False
+        return True
+    
+    @classmethod
+    def release(cls, resources, holder_id):
+        cls.query.filter(
+            cls.resource.in_(list(resources)),
+            cls.holder_id == holder_id
+        ).delete(synchronize_session=False)
+    
+    @classmethod
+    def release_all(cls, holder_id):
+        cls.query.filter(cls.holder_id == holder_id).delete(synchronize_session=False)
+    
+    @classmethod
+    def get_locks(cls):
+        return [{
+            'resource': lock.resource,
+            'holder': lock.holder,
+            'acquired_at': lock.acquired_at.isoformat() if lock.acquired_at else None
+        } for lock in cls.query.order_by(cls.resource).all()]
\ No newline at end of file
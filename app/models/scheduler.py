@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, JSON
 from app import db
 
 class Scheduler(db.Model):
@@ -9,12 +9,16 @@ class Scheduler(db.Model):
     planned_start = Column(DateTime, nullable=True)
     status = Column(String(20), nullable=True)
     pipeline = Column(String(20), nullable=True)  # EKP, INFOSRV
+    stand = Column(Integer, nullable=True)  # Test stand assigned by the slot allocator, None - stand 0
     stage_before_start = Column(DateTime, nullable=True)
     stage_before_end = Column(DateTime, nullable=True)
     stage_deploy_start = Column(DateTime, nullable=True)
     stage_deploy_end = Column(DateTime, nullable=True)
     stage_after_start = Column(DateTime, nullable=True)
     stage_after_end = Column(DateTime, nullable=True)
+    phase_started_at = Column(DateTime, nullable=True)  # When the current status (phase) was entered
+    next_run_at = Column(DateTime, nullable=True, index=True)  # When the pipeline executor advances the run
+    jenkins_builds = Column(JSON, nullable=True)  # Job name -> BuildHandle.to_dict() of builds triggered by the run
     
     def __repr__(self):
         return f'<Scheduler {self.jira_task}:{self.status}>'
\ No newline at end of file
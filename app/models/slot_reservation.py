@@ -0,0 +1,72 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, TSRANGE
+from app import db
+
+# SQLSTATE of EXCLUDE constraint violations
+EXCLUSION_VIOLATION = '23P01'
+
+class SlotReservation(db.Model):
+    """
+    Test stand time booked for a task. The EXCLUDE constraint (needs btree_gist)
+    rejects overlapping periods on the same stand, so concurrent schedulers
+    cannot double-book a slot
+    """
+    __tablename__ = 'slot_reservations'
+    __table_args__ = (
+        ExcludeConstraint(('stand', '='), ('period', '&&'), using='gist', name='slot_reservations_no_overlap'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    jira_task = Column(String(50), nullable=False, unique=True)
+    pipeline = Column(String(20), nullable=True)  # EKP, INFOSRV
+    stand = Column(Integer, nullable=False, default=0)
+    period = Column(TSRANGE, nullable=False)  # [start, end)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SlotReservation {self.jira_task}:{self.stand}>'
+    
+    @classmethod
+    def claim(cls, jira_task, stand, start, end, pipeline=None):
+        """
+        Insert a reservation in a savepoint, the caller commits it together
+        with the rest of the scheduling decision.
+        Raises IntegrityError if the period overlaps another reservation on the
+        stand (see is_overlap) or the task is already reserved; only the
+        savepoint is rolled back then
+        """
+        with db.session.begin_nested():
+            reservation = cls(
+                jira_task=jira_task,
+                pipeline=pipeline,
+                stand=stand,
+                period=func.tsrange(start, end, '[)')
+            )
+            db.session.add(reservation)
+        return reservation
+    
+    @classmethod
+    def release_finished(cls, jira_tasks, now):
+        """Drop reservations of the given tasks whose period is already over, so they can be booked again"""
+        if not jira_tasks:
+            return
+        cls.query.filter(
+            cls.jira_task.in_(list(jira_tasks)),
+            func.upper(cls.period) <= now
+        ).delete(synchronize_session=False)
+        db.session.commit()
+    
+    @classmethod
+    def in_period(cls, start, end):
+        """(jira_task, stand, start, end) tuples of reservations overlapping [start, end)"""
+        return db.session.query(
+            cls.jira_task, cls.stand, func.lower(cls.period), func.upper(cls.period)
+        ).filter(
+            cls.period.op('&&')(func.tsrange(start, end, '[)'))
+        ).all()
+    
+    @staticmethod
+    def is_overlap(error):
+        """True if IntegrityError came from the no-overlap constraint"""
+        return getattr(error.orig, 'pgcode', None) == EXCLUSION_VIOLATION
\ No newline at end of file
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Column, String, DateTime
+from app import db
+
+class SyncWatermark(db.Model):
+    __tablename__ = 'sync_watermarks'
+    
+    profile = Column(String(50), primary_key=True)  # e.g. ekplt_autolt
+    watermark = Column(DateTime, nullable=True)  # Highest Jira updated_date seen
+    last_full_sync = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<SyncWatermark {self.profile}:{self.watermark}>'
+    
+    @classmethod
+    def get_or_create(cls, profile):
+        """Get watermark for sync profile, creating an empty one if missing"""
+        watermark = db.session.get(cls, profile)
+        if not watermark:
+            watermark = cls(profile=profile)
+            db.session.add(watermark)
+        return watermark
+    
+    def is_full_sync_due(self, interval_hours):
+        """Full reconcile is due if it never ran or ran more than interval_hours ago"""
+        if not self.watermark or not self.last_full_sync:
+            return True
+        return datetime.now() - self.last_full_sync >= timedelta(hours=interval_hours)
+    
+    def advance(self, updated_date):
+        """Move watermark forward (never backwards)"""
+        if updated_date and (not self.watermark or updated_date > self.watermark):
+            self.watermark = updated_date
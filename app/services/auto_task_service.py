@@ -1,6 +1,5 @@
 import logging
 from datetime import datetime
-from app.services.jira_service import JiraService
 from app.services.task_scheduler_service import TaskSchedulerService
 
 logger = logging.getLogger(__name__)
@@ -9,8 +8,8 @@ class AutoTaskService:
     """Service for automated task synchronization and scheduling"""
     
     def __init__(self):
-        self.jira_service = JiraService()
         self.scheduler_service = TaskSchedulerService()
+        self.jira_service = self.scheduler_service.jira_service
     
     def sync_and_schedule_tasks(self) -> dict:
         """
@@ -30,13 +29,16 @@ class AutoTaskService:
         try:
             # Step 1: Sync EKPLT tasks
             logger.info("📥 Syncing EKPLT tasks from JIRA...")
-            synced_count = self.jira_service.sync_ekplt_autolt_tasks(max_results=100)
+            synced_count = self.jira_service.sync_ekplt_autolt_tasks()
             result['sync_result'] = {
-                'synced_count': synced_count,
-                'success': synced_count >= 0
+                'synced_count': synced_count or 0,
+                'sync_stats': self.jira_service.last_sync_stats,
+                'success': synced_count is not None
             }
             
-            if synced_count > 0:
+            if synced_count is None:
+                logger.warning("⚠️ JIRA sync failed, scheduling tasks already in the database")
+            elif synced_count > 0:
                 logger.info(f"✅ Synced {synced_count} tasks from JIRA")
             else:
                 logger.info("ℹ️ No new tasks to sync")
@@ -52,7 +54,7 @@ class AutoTaskService:
                 logger.info("ℹ️ No tasks to schedule")
             
             result['success'] = True
-            result['message'] = f"Synced {synced_count} tasks, scheduled {schedule_result['scheduled']} tasks"
+            result['message'] = f"Synced {synced_count or 0} tasks, scheduled {schedule_result['scheduled']} tasks"
             
         except Exception as e:
             logger.error(f"❌ Error in automated task processing: {e}")
@@ -65,10 +67,17 @@ class AutoTaskService:
     def sync_tasks_only(self) -> dict:
         """Sync tasks only without scheduling"""
         try:
-            synced_count = self.jira_service.sync_ekplt_autolt_tasks(max_results=100)
+            synced_count = self.jira_service.sync_ekplt_autolt_tasks()
+            if synced_count is None:
+                return {
+                    'timestamp': datetime.now().isoformat(),
+                    'success': False,
+                    'error': 'JIRA sync failed'
+                }
             return {
                 'timestamp': datetime.now().isoformat(),
                 'synced_count': synced_count,
+                'sync_stats': self.jira_service.last_sync_stats,
                 'success': True,
                 'message': f"Synced {synced_count} tasks"
             }
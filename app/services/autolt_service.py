@@ -1,22 +1,146 @@
 import logging
-import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from flask import current_app
 from app import db
+from app.models.resource_lock import ResourceLock
 from app.models.scheduler import Scheduler
 from app.models.jenkins_job_config import JenkinsJobConfig
-from app.services.jenkins_service import JenkinsService
+from app.services.jenkins_service import BuildHandle, JenkinsService
+from config.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Scheduler.status of a run: ready -> queued -> warmup -> test_before -> deploy_wait -> deploy ->
+# warmup_after -> test_after -> generating_report -> completed (or FAIL at any step)
+PHASE_QUEUED = 'queued'
+PHASE_WARMUP = 'warmup'
+PHASE_TEST_BEFORE = 'test_before'
+PHASE_DEPLOY_WAIT = 'deploy_wait'
+PHASE_DEPLOY = 'deploy'
+PHASE_WARMUP_AFTER = 'warmup_after'
+PHASE_TEST_AFTER = 'test_after'
+PHASE_REPORT = 'generating_report'
+
+# Phases of a run that occupies the environment
+ACTIVE_PHASES = (
+    PHASE_WARMUP, PHASE_TEST_BEFORE, PHASE_DEPLOY_WAIT, PHASE_DEPLOY,
+    PHASE_WARMUP_AFTER, PHASE_TEST_AFTER, PHASE_REPORT
+)
+
+# Jenkins jobs of each pipeline on stand 0, a run holds locks on both for its whole duration.
+# Other stands get their own jobs from AUTOLT_STAND_JOBS
+PIPELINE_JOBS = {
+    'EKP': {'start_job': 'Start_EKP_pipe', 'test_job': 'test-project-build'},
+    'INFOSRV': {'start_job': 'Start_infosrv_pipe', 'test_job': 'infosrv_only'},
+}
+
+# Shared by all pipelines, locked only while deploying
+DEPLOY_JOB = 'job.deploy'
+
+# Readiness probe kind -> AutoLTService method(task, argument) returning bool
+READINESS_PROBES = {
+    'build': '_probe_build',
+    'console': '_probe_console',
+    'http': '_probe_http',
+}
+
+def parse_readiness_probes(value):
+    """
+    Parse probes like 'build|console:Warmup finished|http:http://host/health'
+    into (kind, argument) pairs
+    """
+    probes = []
+    for part in filter(None, (chunk.strip() for chunk in (value or '').split('|'))):
+        kind, _, argument = part.partition(':')
+        kind = kind.strip().lower()
+        if kind not in READINESS_PROBES:
+            raise ValueError(f'Unknown readiness probe: {part}')
+        probes.append((kind, argument.strip()))
+    return probes
+
+def parse_stand_jobs(value):
+    """
+    Parse per-stand jobs like 'EKP@1=Start_EKP_pipe_2/test-project-build_2'
+    into {(pipeline, stand): {'start_job': ..., 'test_job': ...}}
+    """
+    stand_jobs = {}
+    for part in filter(None, (chunk.strip() for chunk in (value or '').split(','))):
+        key, _, jobs = part.partition('=')
+        pipeline, _, stand = key.partition('@')
+        start_job, _, test_job = jobs.partition('/')
+        if not stand.strip().isdigit() or not start_job.strip() or not test_job.strip():
+            raise ValueError(f'Invalid stand jobs: {part}')
+        stand_jobs[(pipeline.strip().upper(), int(stand))] = {'start_job': start_job.strip(), 'test_job': test_job.strip()}
+    return stand_jobs
+
+def get_pipeline_jobs(pipeline, stand, stand_jobs):
+    """Start/test jobs of a pipeline on a stand, None if the stand has none configured"""
+    if not stand:
+        return PIPELINE_JOBS.get(pipeline)
+    return stand_jobs.get((pipeline, stand))
+
+def check_stand_jobs(stands, stand_jobs):
+    """
+    Raise ValueError unless every pipeline has jobs on every stand and no two stands
+    share a job: runs planned in parallel on different stands must not wait for each other
+    """
+    missing = []
+    jobs_by_stand = {}
+    for stand in range(stands):
+        for pipeline in PIPELINE_JOBS:
+            jobs = get_pipeline_jobs(pipeline, stand, stand_jobs)
+            if jobs is None:
+                missing.append(f'{pipeline}@{stand}')
+                continue
+            jobs_by_stand.setdefault(stand, set()).update(jobs.values())
+    if missing:
+        raise ValueError(f"SCHEDULER_STANDS={stands} needs AUTOLT_STAND_JOBS for {', '.join(missing)}")
+    
+    for stand in range(1, stands):
+        for other in range(stand):
+            shared = jobs_by_stand[stand] & jobs_by_stand[other]
+            if shared:
+                raise ValueError(f"Stands {other} and {stand} share Jenkins jobs {', '.join(sorted(shared))}")
+
+def job_resource(job_name):
+    """ResourceLock key of a Jenkins job"""
+    return f'jenkins:{job_name}'
+
+def _advance_in_app_context(app, task_id, status):
+    """Worker thread entry: own app context, DB session and Jenkins connections"""
+    with app.app_context():
+        try:
+            return AutoLTService()._advance(task_id, status)
+        finally:
+            db.session.remove()
+
 class AutoLTService:
-    """Service for AutoLT pipeline execution"""
+    """
+    Service for AutoLT pipeline execution.
+    A run is a state machine persisted on its Scheduler row: every phase stores
+    when it started and when the run has to be advanced next (next_run_at).
+    tick() does one short step for every due run, so nothing sleeps and a
+    restarted process resumes from the database.
+    Runs go in parallel unless they need the same Jenkins jobs (ResourceLock)
+    """
     
     def __init__(self):
         self.jenkins_service = JenkinsService()
+        self._phase_handlers = {
+            PHASE_QUEUED: self._start_run,
+            PHASE_WARMUP: self._finish_warmup,
+            PHASE_TEST_BEFORE: self._start_deploy_phase,
+            PHASE_DEPLOY_WAIT: self._trigger_deploy,
+            PHASE_DEPLOY: self._poll_deploy_phase,
+            PHASE_WARMUP_AFTER: self._finish_warmup_after,
+            PHASE_TEST_AFTER: self._finish_test_after_phase,
+        }
     
     def run_autolt_process(self):
         """
-        Main AutoLT process - checks for ready tasks scheduled for current hour
+        Main AutoLT process - queues ready tasks scheduled for current hour and advances due runs
         """
         logger.info("🤖 Starting AutoLT process...")
 
@@ -34,261 +158,379 @@ class AutoLTService:
             Scheduler.planned_start < next_hour
         ).all()
 
-        if not ready_tasks:
+        queued_count = 0
+        for task in ready_tasks:
+            if task.pipeline not in PIPELINE_JOBS:
+                logger.warning(f"⚠️ Unknown pipeline: {task.pipeline} for task {task.jira_task}")
+                continue
+            logger.info(f"📥 Queueing task {task.jira_task} with pipeline {task.pipeline} for {task.planned_start}")
+            # Slots are 15-minute aligned: tick() starts the run at its slot, not at the top of the hour
+            self._set_phase(task, PHASE_QUEUED, timedelta(0))
+            task.next_run_at = max(task.planned_start, task.next_run_at)
+            queued_count += 1
+        db.session.commit()
+        
+        if not queued_count:
             logger.info("ℹ️ No ready tasks found for current hour")
-            return {"message": "No ready tasks found for current hour", "processed": 0}
         
-        logger.info(f"📋 Found {len(ready_tasks)} ready tasks")
-        processed_count = 0
+        result = self.tick()
+        result['queued'] = queued_count
+        logger.info(f"✅ AutoLT process completed. Queued {queued_count} tasks, advanced {result['processed']} runs")
+        return result
+    
+    def tick(self):
+        """
+        Advance every run whose next_run_at is due by one step, up to
+        AUTOLT_TICK_WORKERS runs in parallel. Each run is locked with
+        FOR UPDATE SKIP LOCKED, so concurrent ticks (cron, several workers)
+        never advance the same run twice
+        """
+        due = db.session.query(Scheduler.id, Scheduler.status).filter(
+            Scheduler.status.in_((PHASE_QUEUED,) + ACTIVE_PHASES),
+            Scheduler.next_run_at <= datetime.utcnow()
+        ).order_by(Scheduler.next_run_at, Scheduler.id).all()
+        db.session.commit()
         
-        for task in ready_tasks:
-            try:
-                logger.info(f"🔄 Processing task {task.jira_task} with pipeline {task.pipeline}")
-                
-                if task.pipeline == 'EKP':
-                    self._execute_ekp_pipeline(task)
-                elif task.pipeline == 'INFOSRV':
-                    self._execute_infosrv_pipeline(task)
-                else:
-                    logger.warning(f"⚠️ Unknown pipeline: {task.pipeline} for task {task.jira_task}")
-                    continue
-                
-                processed_count += 1
-                
-            except Exception as e:
-                logger.error(f"❌ Error processing task {task.jira_task}: {e}")
-                # Set task status to FAIL
-                task.status = 'FAIL'
+        advanced = []
+        if due:
+            app = current_app._get_current_object()
+            with ThreadPoolExecutor(max_workers=min(Config.AUTOLT_TICK_WORKERS, len(due))) as executor:
+                # Submitted in due order, so earlier queued runs usually get contended jobs first
+                futures = [executor.submit(_advance_in_app_context, app, task_id, status) for task_id, status in due]
+                for future in futures:
+                    step = future.result()
+                    if step:
+                        advanced.append(step)
+        
+        return {
+            "message": f"Advanced {len(advanced)} runs",
+            "processed": len(advanced),
+            "advanced": advanced,
+            "active": self.get_active_runs()
+        }
+    
+    def get_active_runs(self):
+        """Queued and running pipelines with their phase timing"""
+        runs = Scheduler.query.filter(
+            Scheduler.status.in_((PHASE_QUEUED,) + ACTIVE_PHASES)
+        ).order_by(Scheduler.planned_start).all()
+        return [{
+            "task": run.jira_task,
+            "pipeline": run.pipeline,
+            "status": run.status,
+            "phase_started_at": run.phase_started_at.isoformat() if run.phase_started_at else None,
+            "next_run_at": run.next_run_at.isoformat() if run.next_run_at else None
+        } for run in runs]
+    
+    def _advance(self, task_id, status):
+        """Lock one due run, execute the handler of its phase and commit the new state"""
+        try:
+            task = Scheduler.query.filter(
+                Scheduler.id == task_id,
+                Scheduler.status == status,
+                Scheduler.next_run_at <= datetime.utcnow()
+            ).with_for_update(skip_locked=True).first()
+            if not task:
+                db.session.rollback()
+                return None
+            
+            if status == PHASE_QUEUED and not self._acquire_pipeline_jobs(task):
+                # Another run uses the same Jenkins jobs - stay queued and check again later
+                logger.info(f"🔒 Jobs of {task.pipeline} pipeline are used by another run, task {task.jira_task} waits")
+                task.next_run_at = datetime.utcnow() + timedelta(seconds=Config.AUTOLT_LOCK_POLL_SECONDS)
                 db.session.commit()
+                return None
+            
+            self._phase_handlers[status](task)
+        except Exception as e:
+            logger.error(f"❌ Error processing task {task_id} in phase {status}: {e}")
+            db.session.rollback()
+            task = Scheduler.query.filter(Scheduler.id == task_id).with_for_update(skip_locked=True).first()
+            if not task or task.status != status:
+                db.session.rollback()
+                return None
+            self._fail(task)
         
-        logger.info(f"✅ AutoLT process completed. Processed {processed_count} tasks")
-        return {"message": f"Processed {processed_count} tasks", "processed": processed_count}
+        db.session.commit()
+        return {
+            "task": task.jira_task,
+            "from": status,
+            "to": task.status,
+            "next_run_at": task.next_run_at.isoformat() if task.next_run_at else None
+        }
     
-    def _execute_ekp_pipeline(self, task: Scheduler):
-        """Execute EKP pipeline"""
-        logger.info(f"🎯 Starting EKP pipeline for task {task.jira_task}")
-        
-        # Phase 1: Check and start required jobs
-        if not self._check_and_start_ekp_jobs(task):
-            return
-        
-        # Phase 2: Wait for warmup (30 minutes)
-        logger.info("⏰ Waiting 30 minutes for environment warmup...")
-        time.sleep(30 * 60)  # 30 minutes
-        
-        # Phase 3: Test BEFORE phase
-        self._execute_test_before_phase(task, 'test-project-build')
-        
-        # Phase 4: Deploy phase
-        self._execute_deploy_phase(task)
-        
-        # Phase 5: Test AFTER phase
-        self._execute_test_after_phase(task, 'test-project-build')
-        
-        # Phase 6: Generate report
-        self._execute_report_phase(task)
-        
-        logger.info(f"✅ EKP pipeline completed for task {task.jira_task}")
+    def _acquire_pipeline_jobs(self, task: Scheduler) -> bool:
+        """Lock the Jenkins jobs of the run's pipeline, False if another run holds any of them"""
+        jobs = self._pipeline_jobs(task)
+        return ResourceLock.acquire(
+            [job_resource(jobs['start_job']), job_resource(jobs['test_job'])],
+            task.id,
+            task.jira_task
+        )
+    
+    def _pipeline_jobs(self, task: Scheduler) -> dict:
+        """Start/test jobs of the run's pipeline on its stand"""
+        jobs = get_pipeline_jobs(task.pipeline, task.stand, parse_stand_jobs(Config.AUTOLT_STAND_JOBS))
+        if jobs is None:
+            raise ValueError(f"No Jenkins jobs for {task.pipeline} on stand {task.stand}, see AUTOLT_STAND_JOBS")
+        return jobs
+    
+    def _set_phase(self, task: Scheduler, phase: str, wait: timedelta = None):
+        """Move run to phase; wait is the delay until the executor advances it (None - never)"""
+        now = datetime.utcnow()
+        task.status = phase
+        task.phase_started_at = now
+        task.next_run_at = now + wait if wait is not None else None
+    
+    def _fail(self, task: Scheduler):
+        task.status = 'FAIL'
+        task.next_run_at = None
+        ResourceLock.release_all(task.id)
     
-    def _execute_infosrv_pipeline(self, task: Scheduler):
-        """Execute INFOSRV pipeline"""
-        logger.info(f"🎯 Starting INFOSRV pipeline for task {task.jira_task}")
+    def _start_run(self, task: Scheduler):
+        """queued -> warmup: check and start pipeline jobs"""
+        logger.info(f"🎯 Starting {task.pipeline} pipeline for task {task.jira_task}")
         
         # Phase 1: Check and start required jobs
-        if not self._check_and_start_infosrv_jobs(task):
+        jobs = self._pipeline_jobs(task)
+        if not self._check_and_start_jobs(task, jobs['start_job'], jobs['test_job']):
             return
         
-        # Phase 2: Wait for warmup (30 minutes)
-        logger.info("⏰ Waiting 30 minutes for environment warmup...")
-        time.sleep(30 * 60)  # 30 minutes
-        
-        # Phase 3: Test BEFORE phase
-        self._execute_test_before_phase(task, 'infosrv_only')
-        
-        # Phase 4: Deploy phase
-        self._execute_deploy_phase(task)
-        
-        # Phase 5: Test AFTER phase
-        self._execute_test_after_phase(task, 'infosrv_only')
-        
-        # Phase 6: Generate report
-        self._execute_report_phase(task)
-        
-        logger.info(f"✅ INFOSRV pipeline completed for task {task.jira_task}")
+        # Phase 2: Warmup
+        self._start_warmup(task, PHASE_WARMUP)
     
-    def _check_and_start_ekp_jobs(self, task: Scheduler) -> bool:
-        """Check and start EKP jobs: Start_EKP_pipe and test-project-build"""
-        logger.info("🔍 Checking EKP pipeline jobs status...")
+    def _check_and_start_jobs(self, task: Scheduler, start_job: str, test_job: str) -> bool:
+        """Check and start pipeline jobs, e.g. Start_EKP_pipe and test-project-build"""
+        logger.info(f"🔍 Checking {task.pipeline} pipeline jobs status...")
         
         # Check job status
-        start_ekp_running = self._is_job_running('Start_EKP_pipe')
-        test_build_running = self._is_job_running('test-project-build')
+        start_job_running = self._is_job_running(start_job)
+        test_job_running = self._is_job_running(test_job)
         
-        logger.info(f"📊 Job status - Start_EKP_pipe: {'Running' if start_ekp_running else 'Stopped'}, test-project-build: {'Running' if test_build_running else 'Stopped'}")
+        logger.info(f"📊 Job status - {start_job}: {'Running' if start_job_running else 'Stopped'}, {test_job}: {'Running' if test_job_running else 'Stopped'}")
         
-        if not start_ekp_running and not test_build_running:
-            # Both stopped - start Start_EKP_pipe
-            logger.info("🚀 Starting Start_EKP_pipe...")
-            success, message = self._trigger_job('Start_EKP_pipe')
+        if not start_job_running and not test_job_running:
+            # Both stopped - start the pipeline job
+            logger.info(f"🚀 Starting {start_job}...")
+            success, message = self._trigger_job(start_job, task=task)
             if not success:
-                logger.error(f"❌ Failed to start Start_EKP_pipe: {message}")
-                task.status = 'FAIL'
-                db.session.commit()
+                logger.error(f"❌ Failed to start {start_job}: {message}")
+                self._fail(task)
                 return False
         
-        elif start_ekp_running and not test_build_running:
-            # Only start test-project-build
-            logger.info("🚀 Starting test-project-build...")
-            success, message = self._trigger_job('test-project-build')
+        elif start_job_running and not test_job_running:
+            # Only start the test job
+            logger.info(f"🚀 Starting {test_job}...")
+            success, message = self._trigger_job(test_job, task=task)
             if not success:
-                logger.error(f"❌ Failed to start test-project-build: {message}")
-                task.status = 'FAIL'
-                db.session.commit()
+                logger.error(f"❌ Failed to start {test_job}: {message}")
+                self._fail(task)
                 return False
         
-        elif not start_ekp_running and test_build_running:
-            # Start_EKP_pipe stopped but test-project-build running - FAIL
-            logger.error("❌ Invalid state: Start_EKP_pipe stopped but test-project-build running")
-            task.status = 'FAIL'
-            db.session.commit()
+        elif not start_job_running and test_job_running:
+            # Pipeline job stopped but test job running - FAIL
+            logger.error(f"❌ Invalid state: {start_job} stopped but {test_job} running")
+            self._fail(task)
             return False
         
         # Both running - continue
         return True
     
-    def _check_and_start_infosrv_jobs(self, task: Scheduler) -> bool:
-        """Check and start INFOSRV jobs: Start_infosrv_pipe and infosrv_only"""
-        logger.info("🔍 Checking INFOSRV pipeline jobs status...")
-        
-        # Check job status
-        start_infosrv_running = self._is_job_running('Start_infosrv_pipe')
-        infosrv_only_running = self._is_job_running('infosrv_only')
-        
-        logger.info(f"📊 Job status - Start_infosrv_pipe: {'Running' if start_infosrv_running else 'Stopped'}, infosrv_only: {'Running' if infosrv_only_running else 'Stopped'}")
-        
-        if not start_infosrv_running and not infosrv_only_running:
-            # Both stopped - start Start_infosrv_pipe
-            logger.info("🚀 Starting Start_infosrv_pipe...")
-            success, message = self._trigger_job('Start_infosrv_pipe')
-            if not success:
-                logger.error(f"❌ Failed to start Start_infosrv_pipe: {message}")
-                task.status = 'FAIL'
-                db.session.commit()
+    def _start_warmup(self, task: Scheduler, phase: str):
+        """Enter a warmup phase: probe readiness soon if probes are configured, otherwise wait the full warmup"""
+        cap = timedelta(minutes=Config.AUTOLT_WARMUP_MINUTES)
+        if self._get_readiness_probes(task):
+            logger.info(f"⏰ Environment warmup, probing readiness (at most {Config.AUTOLT_WARMUP_MINUTES} minutes)...")
+            self._set_phase(task, phase, min(cap, timedelta(seconds=Config.AUTOLT_READINESS_MIN_POLL_SECONDS)))
+        else:
+            logger.info(f"⏰ Environment warmup for {Config.AUTOLT_WARMUP_MINUTES} minutes...")
+            self._set_phase(task, phase, cap)
+    
+    def _finish_warmup(self, task: Scheduler):
+        """warmup -> test_before once the environment is ready"""
+        if self._is_warmup_over(task):
+            self._start_test_before_phase(task)
+    
+    def _finish_warmup_after(self, task: Scheduler):
+        """warmup_after -> test_after once the environment is ready"""
+        if self._is_warmup_over(task):
+            self._start_test_after_phase(task)
+    
+    def _is_warmup_over(self, task: Scheduler) -> bool:
+        """
+        True when all readiness probes pass or AUTOLT_WARMUP_MINUTES have passed.
+        Otherwise schedules the next check with backoff: the interval grows with time
+        spent in warmup, from AUTOLT_READINESS_MIN_POLL_SECONDS to AUTOLT_READINESS_MAX_POLL_SECONDS
+        """
+        now = datetime.utcnow()
+        elapsed = now - task.phase_started_at
+        deadline = task.phase_started_at + timedelta(minutes=Config.AUTOLT_WARMUP_MINUTES)
+        probes = self._get_readiness_probes(task)
+        
+        if probes and self._is_environment_ready(task, probes):
+            logger.info(f"✅ Environment of {task.jira_task} is ready after {elapsed.total_seconds() / 60:.1f} minutes of warmup")
+            return True
+        if now >= deadline:
+            if probes:
+                logger.warning(f"⚠️ Environment of {task.jira_task} not ready within {Config.AUTOLT_WARMUP_MINUTES} minutes, continuing")
+            return True
+        
+        interval = min(
+            timedelta(seconds=Config.AUTOLT_READINESS_MAX_POLL_SECONDS),
+            max(timedelta(seconds=Config.AUTOLT_READINESS_MIN_POLL_SECONDS), elapsed)
+        )
+        task.next_run_at = min(now + interval, deadline)
+        return False
+    
+    def _get_readiness_probes(self, task: Scheduler):
+        try:
+            return parse_readiness_probes(Config.AUTOLT_READINESS_PROBES.get(task.pipeline))
+        except ValueError as e:
+            logger.error(f"❌ Invalid readiness probes for {task.pipeline}: {e}")
+            return []
+    
+    def _is_environment_ready(self, task: Scheduler, probes) -> bool:
+        for kind, argument in probes:
+            try:
+                ready = getattr(self, READINESS_PROBES[kind])(task, argument)
+            except Exception as e:
+                logger.warning(f"⚠️ Readiness probe {kind} failed for {task.jira_task}: {e}")
+                ready = False
+            if not ready:
+                logger.info(f"⏳ Readiness probe {kind} of {task.jira_task}: not ready yet")
                 return False
+        return True
+    
+    def _get_running_build(self, job_name: str, task: Scheduler = None):
+        """(jenkins_url, build number) of the job's build if it is in progress, else None"""
+        handle = self._get_build_handle(task, job_name)
+        if handle:
+            state = self._get_build_state(task, handle)
+            if not state or not state['building']:
+                return None
+            return handle.jenkins_url, state['number']
         
-        elif start_infosrv_running and not infosrv_only_running:
-            # Only start infosrv_only
-            logger.info("🚀 Starting infosrv_only...")
-            success, message = self._trigger_job('infosrv_only')
-            if not success:
-                logger.error(f"❌ Failed to start infosrv_only: {message}")
-                task.status = 'FAIL'
-                db.session.commit()
-                return False
+        jenkins_url = self._get_job_url(job_name)
+        if not jenkins_url:
+            return None
         
-        elif not start_infosrv_running and infosrv_only_running:
-            # Start_infosrv_pipe stopped but infosrv_only running - FAIL
-            logger.error("❌ Invalid state: Start_infosrv_pipe stopped but infosrv_only running")
-            task.status = 'FAIL'
-            db.session.commit()
+        state = self.jenkins_service.get_job_state_by_url(job_name, jenkins_url, fresh=True)
+        last_build = (state or {}).get('lastBuild')
+        if not last_build or not last_build.get('number') or not last_build.get('building'):
+            return None
+        return jenkins_url, last_build['number']
+    
+    def _probe_build(self, task: Scheduler, argument: str) -> bool:
+        """Test job build (or the job given as argument) has left the queue and is running"""
+        job_name = argument or self._pipeline_jobs(task)['test_job']
+        return self._get_running_build(job_name, task) is not None
+    
+    def _probe_console(self, task: Scheduler, marker: str) -> bool:
+        """Console log of the running test job build contains marker"""
+        job_name = self._pipeline_jobs(task)['test_job']
+        build = self._get_running_build(job_name, task)
+        if not build:
             return False
-        
-        # Both running - continue
-        return True
+        console = self.jenkins_service.get_build_console_output(job_name, build[1], build[0])
+        return bool(console) and marker in console
+    
+    def _probe_http(self, task: Scheduler, url: str) -> bool:
+        """Probe URL answers with 2xx/3xx"""
+        response = requests.get(url, timeout=Config.AUTOLT_READINESS_HTTP_TIMEOUT, verify=False, allow_redirects=False)
+        return response.status_code < 400
     
-    def _execute_test_before_phase(self, task: Scheduler, test_job_name: str):
-        """Execute test BEFORE phase"""
+    def _start_test_before_phase(self, task: Scheduler):
+        """warmup -> test_before"""
         logger.info(f"🧪 Starting test BEFORE phase for task {task.jira_task}")
-        
-        # Update status and start time
-        task.status = 'test_before'
-        task.stage_before_start = datetime.utcnow()
-        db.session.commit()
-        
-        # Wait 60 minutes for test
-        logger.info("⏰ Running tests for 60 minutes...")
-        time.sleep(60 * 60)  # 60 minutes
-        
+        logger.info(f"⏰ Running tests for {Config.AUTOLT_TEST_MINUTES} minutes...")
+        self._set_phase(task, PHASE_TEST_BEFORE, timedelta(minutes=Config.AUTOLT_TEST_MINUTES))
+        task.stage_before_start = task.phase_started_at
+    
+    def _start_deploy_phase(self, task: Scheduler):
+        """test_before -> deploy: stop test job and trigger job.deploy"""
         # Fix end time and stop test job
         task.stage_before_end = datetime.utcnow()
-        db.session.commit()
-        
-        # Stop test job
-        logger.info(f"🛑 Stopping {test_job_name}...")
-        self._stop_job(test_job_name)
-        
+        test_job = self._pipeline_jobs(task)['test_job']
+        logger.info(f"🛑 Stopping {test_job}...")
+        self._stop_job(test_job, task)
         logger.info("✅ Test BEFORE phase completed")
+        
+        self._set_phase(task, PHASE_DEPLOY_WAIT, timedelta(0))
+        self._trigger_deploy(task)
     
-    def _execute_deploy_phase(self, task: Scheduler):
-        """Execute deploy phase"""
-        logger.info(f"🚀 Starting deploy phase for task {task.jira_task}")
+    def _trigger_deploy(self, task: Scheduler):
+        """deploy_wait -> deploy once job.deploy is not used by another run"""
+        if not ResourceLock.acquire([job_resource(DEPLOY_JOB)], task.id, task.jira_task):
+            logger.info(f"🔒 {DEPLOY_JOB} is used by another run, task {task.jira_task} waits")
+            task.next_run_at = datetime.utcnow() + timedelta(seconds=Config.AUTOLT_LOCK_POLL_SECONDS)
+            return
         
-        # Update status and start time
-        task.status = 'deploy'
-        task.stage_deploy_start = datetime.utcnow()
-        db.session.commit()
+        logger.info(f"🚀 Starting deploy phase for task {task.jira_task}")
+        self._set_phase(task, PHASE_DEPLOY, timedelta(seconds=Config.AUTOLT_DEPLOY_POLL_SECONDS))
+        task.stage_deploy_start = task.phase_started_at
         
-        # Trigger deploy job and wait for completion
+        # Trigger deploy job, completion is polled by the next ticks
         logger.info("🚀 Starting job.deploy...")
-        success, message = self._trigger_job('job.deploy')
-        
+        success, message = self._trigger_job(DEPLOY_JOB, task=task)
         if not success:
             logger.error(f"❌ Failed to start job.deploy: {message}")
-            task.status = 'FAIL'
-            db.session.commit()
-            return
-        
-        # Wait for job completion (implement job monitoring)
-        self._wait_for_job_completion('job.deploy')
-        
-        # Fix end time
-        task.stage_deploy_end = datetime.utcnow()
-        db.session.commit()
-        
-        logger.info("✅ Deploy phase completed")
+            self._fail(task)
     
-    def _execute_test_after_phase(self, task: Scheduler, test_job_name: str):
-        """Execute test AFTER phase"""
-        logger.info(f"🧪 Starting test AFTER phase for task {task.jira_task}")
-        
-        # Start test job again
-        logger.info(f"🚀 Starting {test_job_name}...")
-        self._trigger_job(test_job_name)
+    def _poll_deploy_phase(self, task: Scheduler):
+        """deploy -> warmup_after once job.deploy is finished (or timed out)"""
+        now = datetime.utcnow()
+        timeout = timedelta(minutes=Config.AUTOLT_DEPLOY_TIMEOUT_MINUTES)
         
-        # Wait for warmup again (30 minutes)
-        logger.info("⏰ Waiting 30 minutes for environment warmup...")
-        time.sleep(30 * 60)  # 30 minutes
+        if self._is_job_running(DEPLOY_JOB, task):
+            if now - task.phase_started_at < timeout:
+                task.next_run_at = now + timedelta(seconds=Config.AUTOLT_DEPLOY_POLL_SECONDS)
+                return
+            logger.warning(f"⚠️ Job job.deploy did not complete within {Config.AUTOLT_DEPLOY_TIMEOUT_MINUTES} minutes")
+        else:
+            logger.info("✅ Job job.deploy completed")
         
-        # Update status and start time
-        task.status = 'test_after'
-        task.stage_after_start = datetime.utcnow()
-        db.session.commit()
+        # Fix end time, other runs may deploy now
+        task.stage_deploy_end = now
+        ResourceLock.release([job_resource(DEPLOY_JOB)], task.id)
+        logger.info("✅ Deploy phase completed")
         
-        # Wait 60 minutes for test
-        logger.info("⏰ Running tests for 60 minutes...")
-        time.sleep(60 * 60)  # 60 minutes
+        # Start test job again and wait for warmup
+        test_job = self._pipeline_jobs(task)['test_job']
+        logger.info(f"🧪 Starting test AFTER phase for task {task.jira_task}")
+        logger.info(f"🚀 Starting {test_job}...")
+        self._trigger_job(test_job, task=task)
         
+        self._start_warmup(task, PHASE_WARMUP_AFTER)
+    
+    def _start_test_after_phase(self, task: Scheduler):
+        """warmup_after -> test_after"""
+        logger.info(f"⏰ Running tests for {Config.AUTOLT_TEST_MINUTES} minutes...")
+        self._set_phase(task, PHASE_TEST_AFTER, timedelta(minutes=Config.AUTOLT_TEST_MINUTES))
+        task.stage_after_start = task.phase_started_at
+    
+    def _finish_test_after_phase(self, task: Scheduler):
+        """test_after -> generating_report -> completed"""
         # Fix end time and stop test job
         task.stage_after_end = datetime.utcnow()
-        db.session.commit()
-        
-        # Stop test job
-        logger.info(f"🛑 Stopping {test_job_name}...")
-        self._stop_job(test_job_name)
-        
+        test_job = self._pipeline_jobs(task)['test_job']
+        logger.info(f"🛑 Stopping {test_job}...")
+        self._stop_job(test_job, task)
         logger.info("✅ Test AFTER phase completed")
+        
+        self._execute_report_phase(task)
+        ResourceLock.release_all(task.id)
+        logger.info(f"✅ {task.pipeline} pipeline finished for task {task.jira_task} with status {task.status}")
     
     def _execute_report_phase(self, task: Scheduler):
         """Execute report generation phase"""
         logger.info(f"📊 Starting report generation for task {task.jira_task}")
         
         # Update status
-        task.status = 'generating_report'
-        db.session.commit()
+        self._set_phase(task, PHASE_REPORT)
         
         # Trigger report job
         logger.info("🚀 Starting create_report...")
-        success, message = self._trigger_job('create_report')
+        success, message = self._trigger_job('create_report', task=task)
         
         if success:
             task.status = 'completed'
@@ -296,50 +538,74 @@ class AutoLTService:
         else:
             task.status = 'FAIL'
             logger.error(f"❌ Failed to start create_report: {message}")
-        
-        db.session.commit()
     
-    def _is_job_running(self, job_name: str) -> bool:
-        """Check if Jenkins job is currently running by checking last build inProgress status"""
+    def _get_build_handle(self, task: Scheduler, job_name: str):
+        """BuildHandle of the build the run triggered for job_name, None if it did not trigger one"""
+        if not task or not task.jenkins_builds:
+            return None
+        return BuildHandle.from_dict(task.jenkins_builds.get(job_name))
+    
+    def _save_build_handle(self, task: Scheduler, handle: BuildHandle):
+        # New dict, so the JSON column change is flushed
+        task.jenkins_builds = {**(task.jenkins_builds or {}), handle.job_name: handle.to_dict()}
+    
+    def _get_build_state(self, task: Scheduler, handle: BuildHandle):
+        """State of the run's own build, keeps the build number once the queue item is resolved"""
+        queued = handle.build_number is None and not handle.cancelled
+        state = self.jenkins_service.get_build_state(handle)
+        if queued and (handle.build_number or handle.cancelled):
+            self._save_build_handle(task, handle)
+        return state
+    
+    def _is_job_running(self, job_name: str, task: Scheduler = None) -> bool:
+        """
+        Check if Jenkins job is queued or still building. With a task that triggered
+        the job its own build is checked, otherwise the last build of the job
+        """
+        handle = self._get_build_handle(task, job_name)
+        if handle:
+            state = self._get_build_state(task, handle)
+            if not state:
+                # Unknown is treated as running: the caller waits (up to its timeout) and checks again
+                logger.warning(f"⚠️ Could not get build state for {job_name}, checking again later")
+                return True
+            if state['queued']:
+                logger.info(f"🕐 Job {job_name} (queue item {handle.queue_id}) is in queue")
+                return True
+            if state['building']:
+                logger.info(f"🔄 Job {job_name} build #{state['number']} is in progress")
+            else:
+                logger.info(f"✅ Job {job_name} build #{state['number']} is completed ({state['result']})")
+            return state['building']
+        
         try:
             # Get Jenkins URL for this job
             jenkins_url = self._get_job_url(job_name)
             if not jenkins_url:
                 return False
 
-            # Get job info first
-            job_info = self.jenkins_service.get_job_info_by_url(job_name, jenkins_url)
-            if not job_info:
-                logger.warning(f"⚠️ Could not get job info for {job_name}")
+            # One tree API request instead of job info + build info; not the cached snapshot,
+            # which may predate a build triggered a moment ago
+            state = self.jenkins_service.get_job_state_by_url(job_name, jenkins_url, fresh=True)
+            if not state:
+                logger.warning(f"⚠️ Could not get job state for {job_name}")
                 return False
 
             # Check if job is in queue first
-            if job_info.get('inQueue', False):
+            if state['inQueue']:
                 logger.info(f"🕐 Job {job_name} is in queue")
                 return True
 
-            # Get last build info
-            last_build = job_info.get('lastBuild')
-            if not last_build:
+            last_build = state['lastBuild']
+            if not last_build or not last_build.get('number'):
                 logger.info(f"📭 Job {job_name} has no builds")
                 return False
 
-            last_build_number = last_build.get('number')
-            if not last_build_number:
-                return False
-
-            # Get detailed build information
-            build_info = self.jenkins_service.get_build_info(job_name, last_build_number, jenkins_url)
-            if not build_info:
-                logger.warning(f"⚠️ Could not get build info for {job_name} build #{last_build_number}")
-                return False
-
-            # Check inProgress field
-            is_running = build_info.get('inProgress', False)
+            is_running = bool(last_build.get('building'))
             if is_running:
-                logger.info(f"🔄 Job {job_name} build #{last_build_number} is in progress")
+                logger.info(f"🔄 Job {job_name} build #{last_build['number']} is in progress")
             else:
-                logger.info(f"✅ Job {job_name} build #{last_build_number} is completed")
+                logger.info(f"✅ Job {job_name} build #{last_build['number']} is completed ({last_build.get('result')})")
 
             return is_running
 
@@ -347,39 +613,28 @@ class AutoLTService:
             logger.warning(f"⚠️ Could not check status for job {job_name}: {e}")
             return False
     
-    def _stop_job(self, job_name: str):
-        """Stop Jenkins job"""
+    def _stop_job(self, job_name: str, task: Scheduler = None):
+        """Stop Jenkins job: the build the run triggered, otherwise the running last build"""
         try:
-            # Get Jenkins URL for this job
-            jenkins_url = self._get_job_url(job_name)
-            if not jenkins_url:
-                logger.warning(f"⚠️ Cannot find URL for job {job_name}")
-                return
+            handle = self._get_build_handle(task, job_name)
+            if handle:
+                success, message = self.jenkins_service.stop_build(handle)
+                self._save_build_handle(task, handle)
+            else:
+                # Get Jenkins URL for this job
+                jenkins_url = self._get_job_url(job_name)
+                if not jenkins_url:
+                    logger.warning(f"⚠️ Cannot find URL for job {job_name}")
+                    return
 
-            success, message = self.jenkins_service.stop_job_by_url(job_name, jenkins_url)
+                success, message = self.jenkins_service.stop_job_by_url(job_name, jenkins_url)
             if success:
-                logger.info(f"✅ Job {job_name} stopped successfully")
+                logger.info(f"✅ Job {job_name} stopped successfully: {message}")
             else:
                 logger.warning(f"⚠️ Could not stop job {job_name}: {message}")
         except Exception as e:
             logger.warning(f"⚠️ Could not stop job {job_name}: {e}")
     
-    def _wait_for_job_completion(self, job_name: str, timeout_minutes: int = 60):
-        """Wait for job completion with timeout"""
-        logger.info(f"⏰ Waiting for {job_name} to complete...")
-        start_time = datetime.utcnow()
-        timeout = timedelta(minutes=timeout_minutes)
-
-        while datetime.utcnow() - start_time < timeout:
-            if not self._is_job_running(job_name):
-                logger.info(f"✅ Job {job_name} completed")
-                return True
-
-            time.sleep(30)  # Check every 30 seconds
-
-        logger.warning(f"⚠️ Job {job_name} did not complete within {timeout_minutes} minutes")
-        return False
-
     def _get_job_url(self, job_name: str) -> str:
         """Get Jenkins URL for job by job name"""
         try:
@@ -393,8 +648,8 @@ class AutoLTService:
             logger.error(f"❌ Error getting URL for job {job_name}: {e}")
             return None
 
-    def _trigger_job(self, job_name: str, parameters=None):
-        """Trigger Jenkins job by name (gets URL from database)"""
+    def _trigger_job(self, job_name: str, parameters=None, task: Scheduler = None):
+        """Trigger Jenkins job by name (gets URL from database), the build is remembered on the task"""
         try:
             # Get Jenkins URL for this job
             jenkins_url = self._get_job_url(job_name)
@@ -402,6 +657,9 @@ class AutoLTService:
                 return False, f"Cannot find URL for job {job_name}"
 
             # Use Jenkins service to trigger job
-            return self.jenkins_service.trigger_job_by_url(jenkins_url, job_name, parameters)
+            success, message, handle = self.jenkins_service.trigger_job_by_url(jenkins_url, job_name, parameters)
+            if handle and task:
+                self._save_build_handle(task, handle)
+            return success, message
         except Exception as e:
             return False, f"Error triggering job {job_name}: {e}"
\ No newline at end of file
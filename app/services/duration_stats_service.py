@@ -0,0 +1,143 @@
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import func
+from app import db
+from app.models.scheduler import Scheduler
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+def _seconds(end, start):
+    return func.extract('epoch', end - start)
+
+class DurationStatsService:
+    """Run duration percentiles per pipeline from completed Scheduler rows"""
+    
+    def __init__(self, percentile: float = None, min_samples: int = None,
+                 lookback_days: int = None, lead_minutes: int = None, align_minutes: int = 15):
+        self.percentile = percentile if percentile is not None else Config.SCHEDULER_DURATION_PERCENTILE
+        self.min_samples = min_samples if min_samples is not None else Config.SCHEDULER_DURATION_MIN_SAMPLES
+        self.lookback_days = lookback_days if lookback_days is not None else Config.SCHEDULER_DURATION_LOOKBACK_DAYS
+        self.lead_minutes = lead_minutes if lead_minutes is not None else Config.SCHEDULER_DURATION_LEAD_MINUTES
+        self.align_minutes = align_minutes
+    
+    def get_pipeline_stats(self) -> Dict[str, dict]:
+        """
+        Duration statistics (hours) per pipeline over completed runs in the lookback period.
+        A run lasts from stage_before_start to stage_after_end; percentiles are computed in PostgreSQL
+        """
+        pipeline = func.coalesce(Scheduler.pipeline, Config.SCHEDULER_DEFAULT_PIPELINE)
+        run = _seconds(Scheduler.stage_after_end, Scheduler.stage_before_start)
+        
+        rows = db.session.query(
+            pipeline,
+            func.count(),
+            func.percentile_cont(0.5).within_group(run),
+            func.percentile_cont(self.percentile).within_group(run),
+            func.max(run),
+            func.percentile_cont(0.5).within_group(_seconds(Scheduler.stage_before_end, Scheduler.stage_before_start)),
+            func.percentile_cont(0.5).within_group(_seconds(Scheduler.stage_deploy_end, Scheduler.stage_deploy_start)),
+            func.percentile_cont(0.5).within_group(_seconds(Scheduler.stage_after_end, Scheduler.stage_after_start))
+        ).filter(
+            Scheduler.status == 'completed',
+            Scheduler.stage_before_start.isnot(None),
+            Scheduler.stage_after_end > Scheduler.stage_before_start,
+            Scheduler.stage_after_end >= datetime.utcnow() - timedelta(days=self.lookback_days)
+        ).group_by(pipeline).all()
+        
+        def hours(seconds):
+            return round(float(seconds) / 3600, 2) if seconds is not None else None
+        
+        return {
+            name.upper(): {
+                'samples': samples,
+                'p50_hours': hours(p50),
+                f'p{round(self.percentile * 100)}_hours': hours(chosen),
+                'max_hours': hours(longest),
+                'run_seconds': float(chosen),
+                'stage_p50_hours': {
+                    'before': hours(before),
+                    'deploy': hours(deploy),
+                    'after': hours(after)
+                }
+            }
+            for name, samples, p50, chosen, longest, before, deploy, after in rows
+        }
+    
+    def slot_hours(self, configured: Dict[str, float], stats: Optional[Dict[str, dict]] = None,
+                   max_hours: Optional[float] = None) -> Dict[str, float]:
+        """
+        Slot length per pipeline: chosen percentile + lead time, rounded up to the slot grid.
+        Pipelines with fewer than min_samples runs keep the configured length.
+        A learned length above max_hours (the longest calendar window) is clamped to it,
+        otherwise the pipeline would never fit into any window
+        """
+        if stats is None:
+            try:
+                stats = self.get_pipeline_stats()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"⚠️ Could not load run duration statistics, using configured slot lengths: {e}")
+                return dict(configured)
+        
+        hours = dict(configured)
+        for pipeline, pipeline_stats in stats.items():
+            if pipeline_stats['samples'] < self.min_samples:
+                continue
+            minutes = pipeline_stats['run_seconds'] / 60 + self.lead_minutes
+            learned = math.ceil(minutes / self.align_minutes) * self.align_minutes / 60
+            if max_hours is not None and learned > max_hours:
+                logger.warning(
+                    f"⚠️ Learned slot length for {pipeline} ({learned}h) exceeds the longest window, "
+                    f"clamped to {max_hours}h"
+                )
+                learned = max_hours
+            hours[pipeline] = learned
+        return hours
+    
+    def get_utilization_report(self, configured: Dict[str, float], default_hours: float, calendar, stands: int = 1) -> dict:
+        """
+        Compare configured and learned slot lengths: runs per day that fit into the calendar
+        windows and share of reserved stand time actually used by a median run
+        """
+        stats = self.get_pipeline_stats()
+        max_hours = calendar.longest_window_hours()
+        learned = self.slot_hours(configured, stats, max_hours)
+        unclamped = self.slot_hours(configured, stats)
+        
+        pipelines = {}
+        for pipeline in sorted(set(configured) | set(stats)):
+            before_hours = configured.get(pipeline, default_hours)
+            after_hours = learned.get(pipeline, default_hours)
+            pipeline_stats = stats.get(pipeline)
+            # Stand time a median run really occupies
+            median = pipeline_stats['p50_hours'] + self.lead_minutes / 60 if pipeline_stats else None
+            
+            runs_before = calendar.runs_per_day(timedelta(hours=before_hours)) * stands
+            runs_after = calendar.runs_per_day(timedelta(hours=after_hours)) * stands
+            pipelines[pipeline] = {
+                'configured_slot_hours': before_hours,
+                'learned_slot_hours': after_hours,
+                'unclamped_slot_hours': unclamped.get(pipeline, default_hours),
+                'clamped_to_window': after_hours < unclamped.get(pipeline, default_hours),
+                'uses_history': pipeline_stats is not None and pipeline_stats['samples'] >= self.min_samples,
+                'stats': {key: value for key, value in (pipeline_stats or {}).items() if key != 'run_seconds'},
+                'runs_per_day_configured': runs_before,
+                'runs_per_day_learned': runs_after,
+                'runs_per_day_gained': runs_after - runs_before,
+                'stand_hours_freed_per_run': round(before_hours - after_hours, 2),
+                'utilization_configured': round(median / before_hours, 2) if median else None,
+                'utilization_learned': round(median / after_hours, 2) if median else None
+            }
+        
+        return {
+            'percentile': self.percentile,
+            'min_samples': self.min_samples,
+            'lookback_days': self.lookback_days,
+            'lead_minutes': self.lead_minutes,
+            'max_slot_hours': max_hours,
+            'stands': stands,
+            'pipelines': pipelines
+        }
\ No newline at end of file
@@ -0,0 +1,55 @@
+import bisect
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+class IntervalIndex:
+    """
+    Occupied time as sorted, disjoint [start, end) intervals kept in two bisect arrays.
+    Overlapping or touching intervals are merged on insert, lookups are O(log n)
+    """
+    
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]] = ()):
+        self._starts = []
+        self._ends = []
+        for start, end in intervals:
+            self.add(start, end)
+    
+    def __len__(self):
+        return len(self._starts)
+    
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+    
+    def add(self, start: datetime, end: datetime):
+        """Mark [start, end) as occupied"""
+        if end <= start:
+            return
+        
+        # Intervals touching [start, end): first one ending at/after start .. last one starting at/before end
+        first = bisect.bisect_left(self._ends, start)
+        last = bisect.bisect_right(self._starts, end)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+        
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+    
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """True if any occupied interval intersects [start, end)"""
+        i = bisect.bisect_right(self._ends, start)  # first interval ending after start
+        return i < len(self._starts) and self._starts[i] < end
+    
+    def next_free(self, start: datetime, duration: timedelta, limit: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Earliest time >= start where [time, time + duration) is free,
+        or None if it would end after limit
+        """
+        i = bisect.bisect_right(self._ends, start)
+        while i < len(self._starts) and self._starts[i] < start + duration:
+            start = max(start, self._ends[i])
+            i += 1
+        
+        if limit is not None and start + duration > limit:
+            return None
+        return start
\ No newline at end of file
@@ -1,7 +1,17 @@
+import json
 import logging
+import os
+import threading
+import time
+import requests
 import urllib3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 from datetime import datetime
+from urllib.parse import urlparse
 import jenkins
+from flask import current_app
+from requests.adapters import HTTPAdapter
 from app import db
 from app.models.jenkins_job_config import JenkinsJobConfig
 from app.models.user_data import UserData
@@ -12,82 +22,636 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 logger = logging.getLogger(__name__)
 
-class JenkinsService:
-    def __init__(self):
-        self.connections = {}  # Cache for multiple Jenkins connections
+# Only the fields pipeline checks need instead of the whole job document with its build list
+JOB_STATE_TREE = 'inQueue,lastBuild[number,building,result,timestamp,duration]'
+JOB_STATE_URL = '%(folder_url)sjob/%(short_name)s/api/json?tree=%(tree)s'
+BUILD_STATE_TREE = 'number,building,result,timestamp,duration'
+BUILD_STATE_URL = '%(folder_url)sjob/%(short_name)s/%(number)d/api/json?tree=%(tree)s'
+# Queue item of a triggered build; Jenkins answers 404 once it forgot the item
+QUEUE_ITEM_URL = 'queue/item/%(number)d/api/json?tree=cancelled,executable[number]'
+# Recent builds searched for the queue id once Jenkins has forgotten the queue item
+RECENT_BUILDS_TREE = 'builds[number,queueId]{0,50}'
+# Per-server snapshot: state of every job in one request, folders are nested jobs[...]
+JOB_SNAPSHOT_FIELDS = 'name,color,inQueue,lastBuild[number,building,result,timestamp,duration]'
+SNAPSHOT_URL = 'api/json?tree=%(tree)s'
+
+def snapshot_tree(folder_depth):
+    """tree= expression for all jobs, following folders folder_depth levels down"""
+    tree = f'jobs[{JOB_SNAPSHOT_FIELDS}]'
+    for _ in range(folder_depth):
+        tree = f'jobs[{JOB_SNAPSHOT_FIELDS},{tree}]'
+    return tree
+
+def find_snapshot_job(jobs, job_name):
+    """Snapshot entry of job_name, short names are matched too when they are unique on the server"""
+    if job_name in jobs:
+        return jobs[job_name]
+    matches = [job for name, job in jobs.items() if name.rsplit('/', 1)[-1] == job_name]
+    return matches[0] if len(matches) == 1 else None
+
+def flatten_snapshot(jobs, prefix=''):
+    """Full job name ('folder/job') -> {'name', 'color', 'inQueue', 'lastBuild'} for jobs of all folders"""
+    flat = {}
+    for job in jobs or []:
+        full_name = prefix + job['name']
+        if 'jobs' in job:
+            flat.update(flatten_snapshot(job['jobs'], full_name + '/'))
+        else:
+            flat[full_name] = {
+                'name': full_name,
+                'color': job.get('color'),
+                'inQueue': job.get('inQueue', False),
+                'lastBuild': job.get('lastBuild')
+            }
+    return flat
+
+class BuildHandle:
+    """
+    Build started by a trigger. Jenkins only returns the queue item id, the build
+    number is known once the item leaves the queue (see JenkinsService.resolve_build)
+    """
     
+    def __init__(self, jenkins_url, job_name, queue_id, build_number=None, cancelled=False):
+        self.jenkins_url = jenkins_url
+        self.job_name = job_name
+        self.queue_id = queue_id
+        self.build_number = build_number
+        self.cancelled = cancelled
     
-    def _get_jenkins_connection(self, jenkins_url, username=None, token=None):
-        """Get or create Jenkins connection for specific instance"""
-        # Try database credentials first if no specific credentials provided
-        if not username or not token:
-            jenkins_creds = None
-            try:
-                # Ищем credentials по URL в поле url таблицы user_data
-                jenkins_creds = UserData.query.filter_by(url=jenkins_url).first()
+    def __repr__(self):
+        return f'<BuildHandle {self.job_name}:{self.build_number or "queue " + str(self.queue_id)}>'
+    
+    def to_dict(self):
+        return {
+            'jenkins_url': self.jenkins_url,
+            'job_name': self.job_name,
+            'queue_id': self.queue_id,
+            'build_number': self.build_number,
+            'cancelled': self.cancelled
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data) if data else None
 
-                logger.info(f"🔍 Поиск credentials для URL: {jenkins_url}")
-                if jenkins_creds:
-                    logger.info(f"✅ Найдены credentials: name={jenkins_creds.name}, url={jenkins_creds.url}")
-                else:
-                    logger.warning(f"⚠️ Не найдены Jenkins credentials для URL: {jenkins_url}")
+# Per-server limit of concurrent Jenkins requests, shared by all threads of the process
+_server_limits = {}
+_server_limits_lock = threading.Lock()
+
+def _server_limit(jenkins_url):
+    """Semaphore limiting concurrent requests to the server of jenkins_url"""
+    server = urlparse(jenkins_url or '').netloc
+    with _server_limits_lock:
+        if server not in _server_limits:
+            _server_limits[server] = threading.BoundedSemaphore(max(Config.JENKINS_MAX_CONCURRENT_PER_SERVER, 1))
+        return _server_limits[server]
+
+def parse_server_timeouts(value):
+    """
+    Parse per-server timeouts like 'https://jenkins-prod.company.ru=5:20,https://jenkins-mobile.company.ru=3:60'
+    into {server host: (connect seconds, read seconds)}
+    """
+    timeouts = {}
+    for part in filter(None, (chunk.strip() for chunk in (value or '').split(','))):
+        url, _, seconds = part.rpartition('=')
+        connect, _, read = seconds.partition(':')
+        if not url or not read:
+            raise ValueError(f'Invalid Jenkins timeout: {part}')
+        timeouts[urlparse(url.strip()).netloc or url.strip()] = (float(connect), float(read))
+    return timeouts
+
+def server_timeout(jenkins_url):
+    """(connect, read) timeout for the server of jenkins_url"""
+    default = (Config.JENKINS_CONNECT_TIMEOUT, Config.JENKINS_READ_TIMEOUT)
+    try:
+        timeouts = parse_server_timeouts(Config.JENKINS_SERVER_TIMEOUTS)
+    except ValueError as e:
+        logger.error(f"❌ Invalid JENKINS_SERVER_TIMEOUTS: {e}")
+        return default
+    return timeouts.get(urlparse(jenkins_url or '').netloc, default)
+
+class CircuitOpenError(jenkins.JenkinsException):
+    """Request not sent: the server keeps failing and its circuit breaker is open"""
+
+class CircuitBreaker:
+    """
+    Breaker of one Jenkins server. closed: requests go through. After
+    JENKINS_BREAKER_FAILURES consecutive failures (connection errors, timeouts, 5xx)
+    it opens and requests fail fast with CircuitOpenError for JENKINS_BREAKER_RESET_SECONDS.
+    Then it is half-open: one trial request goes through, success closes the breaker,
+    failure opens it again
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, server):
+        self.server = server
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._latencies = deque(maxlen=200)
+        self.stats = {'requests': 0, 'failures': 0, 'short_circuited': 0, 'opened': 0, 'last_error': None}
+    
+    def before_request(self):
+        """Raise CircuitOpenError if the request must not be sent"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= Config.JENKINS_BREAKER_RESET_SECONDS:
+                self.state = self.HALF_OPEN
+                logger.info(f"🔌 Jenkins {self.server} breaker half-open, sending a trial request")
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.stats['short_circuited'] += 1
+        raise CircuitOpenError(f'Jenkins {self.server} is unavailable (circuit open after {self.consecutive_failures} failures)')
+    
+    def record_success(self, seconds):
+        with self._lock:
+            self.stats['requests'] += 1
+            self._latencies.append(seconds)
+            if self.state != self.CLOSED:
+                logger.info(f"✅ Jenkins {self.server} breaker closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+    
+    def release_trial(self):
+        """Free the half-open trial slot after a request that proved nothing either way"""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_failure(self, seconds, error):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(error)[:200]
+            self._latencies.append(seconds)
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.consecutive_failures >= Config.JENKINS_BREAKER_FAILURES):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.stats['opened'] += 1
+                logger.error(f"🚫 Jenkins {self.server} breaker open after {self.consecutive_failures} failures: {error}")
+    
+    def get_metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, Config.JENKINS_BREAKER_RESET_SECONDS - (time.monotonic() - self.opened_at)), 1)
+            return {
+                **self.stats,
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in_seconds': retry_in,
+                'latency_ms': {
+                    'p50': round(latencies[len(latencies) // 2] * 1000, 1),
+                    'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+                    'max': round(latencies[-1] * 1000, 1)
+                } if latencies else None
+            }
+
+# Breakers by server host, shared by all clients of the process
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(jenkins_url):
+    server = urlparse(jenkins_url or '').netloc
+    with _breakers_lock:
+        if server not in _breakers:
+            _breakers[server] = CircuitBreaker(server)
+        return _breakers[server]
+
+def get_breaker_metrics():
+    """Circuit breaker state and request latency of every Jenkins server contacted by this process"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.server: breaker.get_metrics() for breaker in breakers}
+
+def _run_in_app_context(app, operation, jenkins_url):
+    """Fan-out worker entry: own app context and DB session (credentials lookup)"""
+    with app.app_context():
+        try:
+            return operation(jenkins_url)
+        finally:
+            db.session.remove()
+
+# Transport errors that count against a server's circuit breaker
+SERVER_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError
+)
+
+def is_connection_error(error):
+    """Errors after which a cached Jenkins connection must not be reused"""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, jenkins.TimeoutException)):
+        return True
+    # python-jenkins reports 401/403/500 this way - credentials may have been rotated
+    return isinstance(error, jenkins.JenkinsException) and 'Possibly authentication failed' in str(error)
+
+class PooledJenkins(jenkins.Jenkins):
+    """
+    Jenkins client owned by JenkinsConnectionRegistry: (connect, read) timeouts of its server,
+    requests go through the server's circuit breaker, evicts itself when the server fails
+    """
+    
+    def __init__(self, url, username, password, registry, key):
+        super().__init__(url, username=username, password=password, timeout=server_timeout(url))
+        self._registry = registry
+        self._registry_key = key
+        self._breaker = get_breaker(url)
+    
+    def _request(self, req, stream=None):
+        # Only the HTTP send is limited and guarded: jenkins_request re-enters itself to fetch the crumb
+        self._breaker.before_request()
+        started = time.monotonic()
+        try:
+            with _server_limit(self.server):
+                response = super()._request(req, stream)
+        except SERVER_ERRORS as e:
+            self._breaker.record_failure(time.monotonic() - started, e)
+            raise
+        except Exception:
+            # Not the server's fault (bad request, SSL config): neither a success nor a failure
+            self._breaker.release_trial()
+            raise
+        
+        seconds = time.monotonic() - started
+        if response.status_code >= 500:
+            self._breaker.record_failure(seconds, f'HTTP {response.status_code}')
+        elif response.status_code < 400 or response.status_code == 404:
+            # 404 is an expected answer (expired queue item, unknown job)
+            self._breaker.record_success(seconds)
+        else:
+            # 401/403/409 say nothing about the server's health
+            self._breaker.release_trial()
+        return response
+    
+    def jenkins_request(self, req, add_crumb=True, resolve_auth=True, stream=None):
+        try:
+            return super().jenkins_request(req, add_crumb, resolve_auth, stream)
+        except Exception as e:
+            if is_connection_error(e):
+                self._registry.evict(self._registry_key, self)
+            raise
 
-            except Exception as e:
-                logger.warning(f"⚠️ Ошибка доступа к БД для Jenkins credentials: {e}")
+class JenkinsConnectionRegistry:
+    """
+    Per-process shared Jenkins clients keyed by (server URL, user). Each client keeps
+    a pooled keep-alive session and its crumb, credentials are cached for
+    JENKINS_CREDENTIALS_TTL seconds. Clients connect lazily: a client idle for more
+    than JENKINS_HEALTH_CHECK_SECONDS is probed before reuse, clients older than
+    JENKINS_CONNECTION_TTL are rebuilt and clients that failed are evicted
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (url, username) -> {'client', 'token', 'created_at', 'checked_at'}
+        self._credentials = {}  # url -> ((username, token), loaded_at)
+        self._pid = None
+        self.stats = {'connects': 0, 'reuses': 0, 'health_checks': 0, 'evictions': 0, 'expired': 0, 'credential_lookups': 0}
+    
+    def get_connection(self, jenkins_url, username=None, token=None):
+        """Shared client for jenkins_url, None if the server failed its health probe"""
+        if not username or not token:
+            cached_username, cached_token = self._get_credentials(jenkins_url)
+            username = username or cached_username
+            token = token or cached_token
+        key = (jenkins_url, username)
+        now = time.monotonic()
+        
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked gunicorn workers must not share the parent's sockets
+                self._entries.clear()
+                self._pid = os.getpid()
+            
+            entry = self._entries.get(key)
+            if entry and (entry['token'] != token or now - entry['created_at'] >= Config.JENKINS_CONNECTION_TTL):
+                self.stats['expired'] += 1
+                entry = None
+            if not entry:
+                entry = self._connect(jenkins_url, username, token, key, now)
+                self._entries[key] = entry
+                return entry['client']
+            
+            self.stats['reuses'] += 1
+            probe = now - entry['checked_at'] >= Config.JENKINS_HEALTH_CHECK_SECONDS
+            if probe:
+                # Other threads keep using the client while this one probes it
+                entry['checked_at'] = now
+        
+        if probe and not self._is_healthy(jenkins_url, entry['client']):
+            self.evict(key, entry['client'])
+            return None
+        return entry['client']
+    
+    def evict(self, key, client=None):
+        """Forget a client (only if it is still the cached one) and the server's credentials"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (client is None or entry['client'] is client):
+                del self._entries[key]
+                self._credentials.pop(key[0], None)
+                self.stats['evictions'] += 1
+                logger.warning(f"🔌 Jenkins connection to {key[0]} evicted")
+    
+    def reset(self):
+        """Drop all clients and credentials"""
+        with self._lock:
+            self._entries.clear()
+            self._credentials.clear()
+    
+    def get_stats(self):
+        with self._lock:
+            return {
+                **self.stats,
+                'connections': [url for url, _ in self._entries]
+            }
+    
+    def _count(self, name):
+        # For counters bumped outside self._lock (fan-out threads probe and look up concurrently)
+        with self._lock:
+            self.stats[name] += 1
+    
+    def _connect(self, jenkins_url, username, token, key, now):
+        client = PooledJenkins(jenkins_url, username, token, self, key)
+        # Disable SSL certificate verification
+        client._session.verify = False
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.JENKINS_HTTP_POOL_SIZE)
+        client._session.mount('https://', adapter)
+        client._session.mount('http://', adapter)
+        self.stats['connects'] += 1
+        logger.info(f"🔌 New Jenkins connection to {jenkins_url} as {username} (pid {os.getpid()})")
+        return {'client': client, 'token': token, 'created_at': now, 'checked_at': now}
+    
+    def _is_healthy(self, jenkins_url, client):
+        self._count('health_checks')
+        try:
+            client.get_whoami()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to Jenkins {jenkins_url}: {e}")
+            return False
+    
+    def _get_credentials(self, jenkins_url):
+        """(username, token) for jenkins_url: user_data row with this url, fallback to env"""
+        cached = self._credentials.get(jenkins_url)
+        if cached and time.monotonic() - cached[1] < Config.JENKINS_CREDENTIALS_TTL:
+            return cached[0]
+        
+        self._count('credential_lookups')
+        jenkins_creds = None
+        try:
+            # Ищем credentials по URL в поле url таблицы user_data
+            jenkins_creds = UserData.query.filter_by(url=jenkins_url).first()
 
+            logger.info(f"🔍 Поиск credentials для URL: {jenkins_url}")
             if jenkins_creds:
-                # Берем name как username, token как token
-                auth_username = username or jenkins_creds.name
-                auth_token = token or jenkins_creds.token
+                logger.info(f"✅ Найдены credentials: name={jenkins_creds.name}, url={jenkins_creds.url}")
             else:
-                # Fallback на переменные окружения
-                auth_username = username or Config.JENKINS_USERNAME
-                auth_token = token or Config.JENKINS_TOKEN
+                logger.warning(f"⚠️ Не найдены Jenkins credentials для URL: {jenkins_url}")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Ошибка доступа к БД для Jenkins credentials: {e}")
+            # Not cached, the database may be back on the next call
+            return Config.JENKINS_USERNAME, Config.JENKINS_TOKEN
+
+        if jenkins_creds:
+            # Берем name как username, token как token
+            credentials = (jenkins_creds.name, jenkins_creds.token)
         else:
-            auth_username = username
-            auth_token = token
+            # Fallback на переменные окружения
+            credentials = (Config.JENKINS_USERNAME, Config.JENKINS_TOKEN)
+        with self._lock:
+            self._credentials[jenkins_url] = (credentials, time.monotonic())
+        return credentials
+
+jenkins_connections = JenkinsConnectionRegistry()
+
+class JenkinsSnapshotCache:
+    """
+    Per-process cache of server snapshots: name, color, inQueue and lastBuild of every
+    job of a Jenkins server fetched with one tree=jobs[...] request. Snapshots live
+    JENKINS_SNAPSHOT_TTL seconds, concurrent readers of a stale server wait for one
+    fetch instead of sending their own. Triggering or stopping a job invalidates its server
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._server_locks = {}
+        self._snapshots = {}  # url -> (jobs, fetched_at)
+        # Bumped by invalidate(): a fetch that started before an invalidation must not be stored
+        self._generations = {}  # url -> int
+        self._epoch = 0  # bumped when all servers are invalidated
+        self.stats = {'hits': 0, 'fetches': 0, 'fetch_failures': 0, 'invalidations': 0, 'discarded': 0}
+    
+    def get_snapshot(self, jenkins_url):
+        """Jobs of the server by full name, None if Jenkins is not available"""
+        cached = self._get_fresh(jenkins_url)
+        if cached is not None:
+            return cached
         
-        # Create connection key for caching
-        connection_key = f"{jenkins_url}:{auth_username}"
+        with self._lock:
+            server_lock = self._server_locks.setdefault(jenkins_url, threading.Lock())
+        with server_lock:
+            cached = self._get_fresh(jenkins_url)
+            if cached is not None:
+                return cached
+            with self._lock:
+                generation = self._generation_of(jenkins_url)
+            jobs = self._fetch(jenkins_url)
+            if jobs is not None:
+                with self._lock:
+                    if self._generation_of(jenkins_url) == generation:
+                        self._snapshots[jenkins_url] = (jobs, time.monotonic())
+                    else:
+                        # Invalidated meanwhile (a job was triggered), the result may predate it
+                        self.stats['discarded'] += 1
+            return jobs
+    
+    def get_job(self, jenkins_url, job_name):
+        """Snapshot entry of one job, None if it is not in the snapshot"""
+        jobs = self.get_snapshot(jenkins_url)
+        return find_snapshot_job(jobs, job_name) if jobs else None
+    
+    def peek(self, jenkins_url):
+        """Cached snapshot of the server whatever its age, never fetches"""
+        cached = self._snapshots.get(jenkins_url)
+        return cached[0] if cached else None
+    
+    def get_age(self, jenkins_url):
+        """Seconds since the cached snapshot of the server was fetched, None if not cached"""
+        cached = self._snapshots.get(jenkins_url)
+        return round(time.monotonic() - cached[1], 1) if cached else None
+    
+    def invalidate(self, jenkins_url=None):
+        """Drop the snapshot of one server (or all), the next read fetches it again"""
+        with self._lock:
+            if jenkins_url:
+                self._snapshots.pop(jenkins_url, None)
+                self._generations[jenkins_url] = self._generations.get(jenkins_url, 0) + 1
+            else:
+                self._snapshots.clear()
+                self._epoch += 1
+            self.stats['invalidations'] += 1
+    
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            snapshots = list(self._snapshots.items())
+        return {
+            **stats,
+            'servers': {url: {'jobs': len(jobs), 'age_seconds': self.get_age(url)} for url, (jobs, _) in snapshots}
+        }
+    
+    def _generation_of(self, jenkins_url):
+        # Caller holds self._lock
+        return self._epoch, self._generations.get(jenkins_url, 0)
+    
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+    
+    def _get_fresh(self, jenkins_url):
+        cached = self._snapshots.get(jenkins_url)
+        if cached and time.monotonic() - cached[1] < Config.JENKINS_SNAPSHOT_TTL:
+            self._count('hits')
+            return cached[0]
+        return None
+    
+    def _fetch(self, jenkins_url):
+        jenkins_conn = jenkins_connections.get_connection(jenkins_url)
+        if not jenkins_conn:
+            self._count('fetch_failures')
+            return None
+        
+        started = time.monotonic()
+        try:
+            url = jenkins_conn._build_url(SNAPSHOT_URL, {'tree': snapshot_tree(Config.JENKINS_SNAPSHOT_FOLDER_DEPTH)})
+            jobs = flatten_snapshot(json.loads(jenkins_conn.jenkins_open(requests.Request('GET', url))).get('jobs'))
+        except Exception as e:
+            self._count('fetch_failures')
+            logger.warning(f"⚠️ Could not get jobs snapshot from {jenkins_url}: {e}")
+            return None
+        
+        self._count('fetches')
+        logger.debug(f"📸 Snapshot of {len(jobs)} jobs from {jenkins_url} in {time.monotonic() - started:.2f}s")
+        return jobs
+
+jenkins_snapshots = JenkinsSnapshotCache()
+
+class JenkinsService:
+    def _get_jenkins_connection(self, jenkins_url, username=None, token=None):
+        """Shared connection for specific Jenkins instance (see JenkinsConnectionRegistry)"""
+        return jenkins_connections.get_connection(jenkins_url, username, token)
+    
+    def fan_out(self, jenkins_urls, operation, timeout=None):
+        """
+        Run operation(jenkins_url) against all servers in parallel and merge results as they complete:
+        {jenkins_url: {'ok': bool, 'result' or 'error', 'seconds'}}. Servers that do not answer
+        within timeout (JENKINS_FANOUT_TIMEOUT) are reported as timed out, so the call takes as long
+        as the slowest server instead of the sum of all of them
+        """
+        jenkins_urls = list(dict.fromkeys(url for url in jenkins_urls if url))
+        if not jenkins_urls:
+            return {}
+        timeout = Config.JENKINS_FANOUT_TIMEOUT if timeout is None else timeout
+        app = current_app._get_current_object()
+        started = time.monotonic()
+        results = {}
         
-        if connection_key not in self.connections:
+        executor = ThreadPoolExecutor(max_workers=min(Config.JENKINS_FANOUT_WORKERS, len(jenkins_urls)), thread_name_prefix='jenkins-fanout')
+        try:
+            futures = {executor.submit(_run_in_app_context, app, operation, url): url for url in jenkins_urls}
             try:
-                self.connections[connection_key] = jenkins.Jenkins(
-                    jenkins_url,
-                    username=auth_username,
-                    password=auth_token
-                )
-                # Disable SSL certificate verification
-                self.connections[connection_key]._session.verify = False
-                # Test connection
-                self.connections[connection_key].get_whoami()
-            except Exception as e:
-                logger.error(f"Failed to connect to Jenkins {jenkins_url}: {e}")
-                self.connections[connection_key] = None
-        
-        return self.connections[connection_key]
+                for future in as_completed(futures, timeout=timeout):
+                    url = futures[future]
+                    try:
+                        results[url] = {'ok': True, 'result': future.result()}
+                    except Exception as e:
+                        logger.warning(f"⚠️ Jenkins {url}: {e}")
+                        results[url] = {'ok': False, 'error': str(e)}
+                    results[url]['seconds'] = round(time.monotonic() - started, 3)
+            except FuturesTimeoutError:
+                for url in jenkins_urls:
+                    if url not in results:
+                        logger.warning(f"⏱️ Jenkins {url} did not answer within {timeout}s")
+                        results[url] = {'ok': False, 'error': f'timeout after {timeout}s', 'seconds': round(time.monotonic() - started, 3)}
+        finally:
+            # Do not wait for hung servers, their requests end with the connection timeouts
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+    
+    def get_servers_status(self, jenkins_urls):
+        """Job counts by state for every server from fresh or cached snapshots, fetched in parallel"""
+        def summarize(jenkins_url):
+            jobs = jenkins_snapshots.get_snapshot(jenkins_url)
+            if jobs is None:
+                raise jenkins.JenkinsException(f'Cannot get jobs from {jenkins_url}')
+            return {
+                'jobs': len(jobs),
+                'building': sum(1 for job in jobs.values() if (job['color'] or '').endswith('_anime')),
+                'queued': sum(1 for job in jobs.values() if job['inQueue']),
+                'failed': sum(1 for job in jobs.values() if (job['color'] or '').startswith('red')),
+                'age_seconds': jenkins_snapshots.get_age(jenkins_url)
+            }
+        return self.fan_out(jenkins_urls, summarize)
+    
+    def list_all_jobs(self, jenkins_urls):
+        """Jobs of all servers from their snapshots: [{'jenkins_url', 'name', 'color', 'inQueue', 'lastBuild'}]"""
+        merged = []
+        for jenkins_url, outcome in self.fan_out(jenkins_urls, jenkins_snapshots.get_snapshot).items():
+            for job in (outcome.get('result') or {}).values():
+                merged.append({'jenkins_url': jenkins_url, **job})
+        return merged
+    
+    def trigger_jobs(self, jobs):
+        """
+        Trigger (jenkins_url, job_name, parameters) items, servers in parallel and jobs of one
+        server in the given order. Returns results in input order:
+        [{'jenkins_url', 'job_name', 'success', 'message', 'build'}]
+        """
+        by_server = {}
+        for index, (jenkins_url, job_name, parameters) in enumerate(jobs):
+            by_server.setdefault(jenkins_url, []).append((index, job_name, parameters))
+        
+        def trigger_server(jenkins_url):
+            triggered = []
+            for index, job_name, parameters in by_server[jenkins_url]:
+                success, message, handle = self.trigger_job_by_url(jenkins_url, job_name, parameters)
+                triggered.append((index, success, message, handle.to_dict() if handle else None))
+            return triggered
+        
+        results = [None] * len(jobs)
+        for jenkins_url, outcome in self.fan_out(by_server, trigger_server).items():
+            if outcome['ok']:
+                for index, success, message, build in outcome['result']:
+                    results[index] = {'success': success, 'message': message, 'build': build}
+            else:
+                # Timed out: some jobs may still have been triggered
+                for index, _, _ in by_server[jenkins_url]:
+                    results[index] = {'success': False, 'message': outcome['error'], 'build': None}
+        return [
+            {'jenkins_url': jenkins_url, 'job_name': job_name, **result}
+            for (jenkins_url, job_name, _), result in zip(jobs, results)
+        ]
     
     def trigger_job_by_config(self, job_config_id, parameters=None):
-        """Trigger a Jenkins job using JenkinsJobConfig"""
+        """Trigger a Jenkins job using JenkinsJobConfig, returns (success, message, BuildHandle)"""
         job_config = JenkinsJobConfig.query.get(job_config_id)
         if not job_config:
-            return False, f"Job configuration {job_config_id} not found"
-        
-        # Get connection for this specific Jenkins instance
-        jenkins_conn = self._get_jenkins_connection(job_config.project_url)
+            return False, f"Job configuration {job_config_id} not found", None
         
-        if not jenkins_conn:
-            return False, f"Cannot connect to Jenkins instance: {job_config.project_url}"
-        
-        try:
-            if parameters:
-                jenkins_conn.build_job(job_config.job_name, parameters)
-            else:
-                jenkins_conn.build_job(job_config.job_name)
-            
-            return True, f"Job {job_config.job_name} triggered successfully"
-        except Exception as e:
-            return False, f"Failed to trigger job: {str(e)}"
+        return self.trigger_job_by_url(job_config.project_url, job_config.job_name, parameters)
     
     
     def get_job_info_by_url(self, job_name, jenkins_url):
@@ -102,6 +666,40 @@ class JenkinsService:
             logger.warning(f"⚠️ Could not get job info for {job_name} on {jenkins_url}: {e}")
             return None
     
+    def get_job_state_by_url(self, job_name, jenkins_url, fresh=False):
+        """Queue flag and last build state of a job from the server snapshot or one tree API request
+
+        The snapshot may be up to JENKINS_SNAPSHOT_TTL seconds old; fresh=True skips it
+        for decisions that must see a build triggered a moment ago.
+        Returns {'inQueue': bool, 'lastBuild': {'number', 'building', 'result', 'timestamp', 'duration'} or None}
+        or None if Jenkins is not available.
+        """
+        if not fresh:
+            job = jenkins_snapshots.get_job(jenkins_url, job_name)
+            if job:
+                return {'inQueue': job['inQueue'], 'lastBuild': job['lastBuild']}
+        
+        # Not in the snapshot (deeper in folders than JENKINS_SNAPSHOT_FOLDER_DEPTH, snapshot failed) or fresh
+        jenkins_conn = self._get_jenkins_connection(jenkins_url)
+        if not jenkins_conn:
+            return None
+
+        try:
+            folder_url, short_name = jenkins_conn._get_job_folder(job_name)
+            url = jenkins_conn._build_url(JOB_STATE_URL, {
+                'folder_url': folder_url,
+                'short_name': short_name,
+                'tree': JOB_STATE_TREE
+            })
+            state = json.loads(jenkins_conn.jenkins_open(requests.Request('GET', url)))
+            return {
+                'inQueue': state.get('inQueue', False),
+                'lastBuild': state.get('lastBuild')
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Could not get job state for {job_name} on {jenkins_url}: {e}")
+            return None
+    
     def stop_job_by_url(self, job_name, jenkins_url, build_number=None):
         """Stop a running job on specific Jenkins server"""
         jenkins_conn = self._get_jenkins_connection(jenkins_url)
@@ -109,19 +707,118 @@ class JenkinsService:
             return False, f"Cannot connect to Jenkins: {jenkins_url}"
 
         try:
+            if not build_number:
+                # Latest build, only if it is still running
+                state = self.get_job_state_by_url(job_name, jenkins_url, fresh=True)
+                last_build = (state or {}).get('lastBuild')
+                if last_build and last_build.get('building'):
+                    build_number = last_build['number']
             if build_number:
                 jenkins_conn.stop_build(job_name, build_number)
-            else:
-                # Get the latest build number
-                job_info = jenkins_conn.get_job_info(job_name)
-                if job_info and 'lastBuild' in job_info and job_info['lastBuild']:
-                    last_build = job_info['lastBuild']['number']
-                    jenkins_conn.stop_build(job_name, last_build)
+                jenkins_snapshots.invalidate(jenkins_url)
 
             return True, f"Job {job_name} stopped successfully on {jenkins_url}"
         except Exception as e:
             return False, f"Failed to stop job: {e}"
     
+    def resolve_build(self, handle):
+        """
+        Build number of a triggered build, None while it is still queued (or was cancelled).
+        Errors other than an expired queue item propagate, the handle stays unresolved
+        """
+        if handle.build_number or handle.cancelled:
+            return handle.build_number
+        
+        jenkins_conn = self._get_jenkins_connection(handle.jenkins_url)
+        if not jenkins_conn:
+            raise jenkins.JenkinsException(f'Cannot connect to Jenkins: {handle.jenkins_url}')
+
+        try:
+            # get_queue_item() reports every failure as JenkinsException, 404 must stay distinguishable
+            url = jenkins_conn._build_url(QUEUE_ITEM_URL, {'number': handle.queue_id})
+            item = json.loads(jenkins_conn.jenkins_open(requests.Request('GET', url)))
+            if item.get('cancelled'):
+                handle.cancelled = True
+            elif item.get('executable'):
+                handle.build_number = item['executable']['number']
+        except jenkins.NotFoundException:
+            # Queue item expired (kept ~5 minutes after leaving the queue) - find the build by queue id
+            folder_url, short_name = jenkins_conn._get_job_folder(handle.job_name)
+            url = jenkins_conn._build_url(JOB_STATE_URL, {
+                'folder_url': folder_url,
+                'short_name': short_name,
+                'tree': RECENT_BUILDS_TREE
+            })
+            builds = json.loads(jenkins_conn.jenkins_open(requests.Request('GET', url))).get('builds') or []
+            handle.build_number = next((build['number'] for build in builds if build.get('queueId') == handle.queue_id), None)
+            if not handle.build_number:
+                # Left the queue, but not among recent builds - state unknown, never guessed
+                raise jenkins.JenkinsException(f'Build of queue item {handle.queue_id} not found for {handle.job_name}')
+        return handle.build_number
+    
+    def get_build_state(self, handle):
+        """
+        State of exactly the triggered build in one tree API request:
+        {'queued': bool, 'number', 'building', 'result'} or None if the state is unknown
+        (Jenkins not available, queue item could not be resolved)
+        """
+        try:
+            number = self.resolve_build(handle)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not resolve queue item {handle.queue_id} of {handle.job_name}: {e}")
+            return None
+        if handle.cancelled:
+            return {'queued': False, 'number': None, 'building': False, 'result': 'CANCELLED'}
+        if not number:
+            return {'queued': True, 'number': None, 'building': False, 'result': None}
+        
+        jenkins_conn = self._get_jenkins_connection(handle.jenkins_url)
+        if not jenkins_conn:
+            return None
+
+        try:
+            folder_url, short_name = jenkins_conn._get_job_folder(handle.job_name)
+            url = jenkins_conn._build_url(BUILD_STATE_URL, {
+                'folder_url': folder_url,
+                'short_name': short_name,
+                'number': number,
+                'tree': BUILD_STATE_TREE
+            })
+            build = json.loads(jenkins_conn.jenkins_open(requests.Request('GET', url)))
+            return {
+                'queued': False,
+                'number': number,
+                'building': build.get('building', False),
+                'result': build.get('result')
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Could not get state of {handle.job_name}#{number}: {e}")
+            return None
+    
+    def stop_build(self, handle):
+        """Stop exactly the triggered build, or cancel its queue item if it has not started yet"""
+        jenkins_conn = self._get_jenkins_connection(handle.jenkins_url)
+        if not jenkins_conn:
+            return False, f"Cannot connect to Jenkins: {handle.jenkins_url}"
+
+        state = self.get_build_state(handle)
+        if state is None:
+            return False, f"Could not get state of {handle.job_name} build"
+        
+        try:
+            if state['queued']:
+                jenkins_conn.cancel_queue(handle.queue_id)
+                jenkins_snapshots.invalidate(handle.jenkins_url)
+                handle.cancelled = True
+                return True, f"Queue item {handle.queue_id} of {handle.job_name} cancelled on {handle.jenkins_url}"
+            if state['building']:
+                jenkins_conn.stop_build(handle.job_name, state['number'])
+                jenkins_snapshots.invalidate(handle.jenkins_url)
+                return True, f"Job {handle.job_name}#{state['number']} stopped successfully on {handle.jenkins_url}"
+            return True, f"Job {handle.job_name}#{state['number']} already finished ({state['result']})"
+        except Exception as e:
+            return False, f"Failed to stop job: {e}"
+    
     def get_all_configs(self, project=None):
         """Get all job configurations, optionally filtered by project"""
         query = JenkinsJobConfig.query
@@ -145,6 +842,23 @@ class JenkinsService:
             for project in projects
         ]
     
+    def get_config_statuses(self, job_configs, fetch=True):
+        """
+        Snapshot state of configured jobs: {config id: {'color', 'inQueue', 'lastBuild'} or None}.
+        One snapshot request per Jenkins server at most, servers are fetched in parallel.
+        fetch=False only reads snapshots already cached (e.g. right after get_servers_status)
+        """
+        jenkins_urls = {job_config.project_url for job_config in job_configs}
+        if fetch:
+            snapshots = {url: outcome.get('result') for url, outcome in self.fan_out(jenkins_urls, jenkins_snapshots.get_snapshot).items()}
+        else:
+            snapshots = {url: jenkins_snapshots.peek(url) for url in jenkins_urls}
+        statuses = {}
+        for job_config in job_configs:
+            jobs = snapshots.get(job_config.project_url)
+            statuses[job_config.id] = find_snapshot_job(jobs, job_config.job_name) if jobs else None
+        return statuses
+    
     def get_job_status(self, job_config_id):
         """Get current status of a job"""
         job_config = JenkinsJobConfig.query.get(job_config_id)
@@ -187,6 +901,18 @@ class JenkinsService:
             logger.error(f"Error getting build info for {job_name}#{build_number}: {e}")
             return None
     
+    def get_build_console_output(self, job_name, build_number, jenkins_url):
+        """Get console log of a build from specific Jenkins"""
+        jenkins_conn = self._get_jenkins_connection(jenkins_url)
+        if not jenkins_conn:
+            return None
+
+        try:
+            return jenkins_conn.get_build_console_output(job_name, build_number)
+        except Exception as e:
+            logger.error(f"Error getting console output for {job_name}#{build_number}: {e}")
+            return None
+    
     def list_jobs(self, jenkins_url):
         """List jobs from specific Jenkins"""
         jenkins_conn = self._get_jenkins_connection(jenkins_url)
@@ -201,15 +927,16 @@ class JenkinsService:
 
     # Convenience methods for different Jenkins URLs
     def trigger_job_by_url(self, jenkins_url, job_name, parameters=None):
-        """Trigger job on specific Jenkins server by URL"""
+        """Trigger job on specific Jenkins server by URL, returns (success, message, BuildHandle)"""
         try:
             jenkins_conn = self._get_jenkins_connection(jenkins_url)
             if jenkins_conn:
                 if parameters:
-                    jenkins_conn.build_job(job_name, parameters)
+                    queue_id = jenkins_conn.build_job(job_name, parameters)
                 else:
-                    jenkins_conn.build_job(job_name)
-                return True, f"Job {job_name} triggered on {jenkins_url}"
+                    queue_id = jenkins_conn.build_job(job_name)
+                jenkins_snapshots.invalidate(jenkins_url)
+                return True, f"Job {job_name} triggered on {jenkins_url}", BuildHandle(jenkins_url, job_name, queue_id)
         except Exception as e:
-            return False, f"Failed to trigger job on {jenkins_url}: {e}"
-        return False, f"Jenkins connection not available for {jenkins_url}"
\ No newline at end of file
+            return False, f"Failed to trigger job on {jenkins_url}: {e}", None
+        return False, f"Jenkins connection not available for {jenkins_url}", None
\ No newline at end of file
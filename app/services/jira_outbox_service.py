@@ -0,0 +1,181 @@
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from app import db
+from app.models.jira_outbox import JiraOutbox
+from app.models.jira_task import JiraTask
+from app.models.scheduler import Scheduler
+from app.models.slot_reservation import SlotReservation
+from app.services.jira_service import JiraService
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+ACTION_SCHEDULE = 'schedule'
+
+class JiraOutboxService:
+    """Pushes committed JiraOutbox rows to Jira concurrently, with retries and exponential backoff"""
+    
+    def __init__(self, jira_service: JiraService = None):
+        self.jira_service = jira_service or JiraService()
+    
+    @staticmethod
+    def enqueue_schedule(task, planned_start: datetime, planned_end: datetime, status: str = None):
+        """
+        Add the Jira update of a scheduled task (status 'In Progress' + planned start) to the session.
+        The caller commits it together with the local change
+        """
+        db.session.add(JiraOutbox(
+            jira_key=task.jira_key,
+            action=ACTION_SCHEDULE,
+            payload={
+                'planned_start': planned_start.isoformat(),
+                'planned_end': planned_end.isoformat(),
+                # Workflow state known locally lets JiraService skip reading the issue
+                'project_key': task.project_key,
+                'issue_type': task.issue_type,
+                'status': status
+            },
+            status='pending',
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        ))
+    
+    def drain(self, max_batches: int = None) -> dict:
+        """Claim and push due rows batch by batch until none are left (or max_batches)"""
+        stats = {'batches': 0, 'pushed': 0, 'retried': 0, 'failed': 0}
+        
+        while max_batches is None or stats['batches'] < max_batches:
+            rows = JiraOutbox.claim_batch(Config.JIRA_OUTBOX_BATCH_SIZE, Config.JIRA_OUTBOX_LEASE_SECONDS)
+            if not rows:
+                break
+            
+            stats['batches'] += 1
+            done = []
+            for row, error in self._push_batch(rows):
+                if error is None:
+                    done.append(row['id'])
+                    stats['pushed'] += 1
+                elif row['attempts'] >= Config.JIRA_OUTBOX_MAX_ATTEMPTS or row['action'] != ACTION_SCHEDULE:
+                    logger.error(f"❌ Giving up on Jira {row['action']} of {row['jira_key']} after {row['attempts']} attempts: {error}")
+                    self.mark_failed(row, error)
+                    stats['failed'] += 1
+                else:
+                    delay = self._backoff(row['attempts'])
+                    logger.warning(f"⚠️ Jira {row['action']} of {row['jira_key']} failed (attempt {row['attempts']}), retry in {delay:.0f}s: {error}")
+                    JiraOutbox.mark_retry(row['id'], error, delay)
+                    stats['retried'] += 1
+            JiraOutbox.mark_done(done)
+            db.session.commit()
+        
+        if stats['batches']:
+            logger.info(f"📤 Jira outbox drained: {stats}")
+        return stats
+    
+    @staticmethod
+    def mark_failed(row, error):
+        """
+        Give up on an outbox row. A schedule that never reached Jira is undone locally:
+        the task gets its previous status back, its ready run and slot reservation are dropped
+        """
+        JiraOutbox.mark_failed(row['id'], error)
+        if row['action'] != ACTION_SCHEDULE:
+            return
+        
+        payload = row['payload']
+        dropped = Scheduler.query.filter(
+            Scheduler.jira_task == row['jira_key'],
+            Scheduler.status == 'ready',
+            Scheduler.planned_start == datetime.fromisoformat(payload['planned_start'])
+        ).delete(synchronize_session=False)
+        if not dropped:
+            # The run was already picked up, leave it to the pipeline
+            return
+        
+        SlotReservation.query.filter_by(jira_task=row['jira_key']).delete(synchronize_session=False)
+        task = JiraTask.query.filter_by(jira_key=row['jira_key']).first()
+        if task and task.status == 'In Progress':
+            task.status = payload.get('status') or 'Open'
+            task.content_hash = None
+        logger.warning(f"↩️ Schedule of {row['jira_key']} was not applied in Jira, local run and slot released")
+    
+    def _push_batch(self, rows):
+        """Push rows concurrently; rows of the same issue go in order on one thread"""
+        by_key = {}
+        for row in rows:
+            by_key.setdefault(row['jira_key'], []).append(row)
+        
+        # Connect in this thread: credentials are read from the database
+        if not self.jira_service.jira:
+            return [(row, 'Jira is not available') for row in rows]
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=min(Config.JIRA_OUTBOX_CONCURRENCY, len(by_key))) as executor:
+            futures = [executor.submit(self._push_issue_rows, key_rows) for key_rows in by_key.values()]
+            for future in as_completed(futures):
+                results.extend(future.result())
+        return results
+    
+    def _push_issue_rows(self, rows):
+        results = []
+        for index, row in enumerate(rows):
+            error = self._push(row)
+            results.append((row, error))
+            if error is not None:
+                # Later updates of the issue must not overtake the failed one
+                results.extend((later, 'Waiting for an earlier update of the issue') for later in rows[index + 1:])
+                break
+        return results
+    
+    def _push(self, row):
+        """Apply one outbox row to Jira, returns error text or None"""
+        if row['action'] != ACTION_SCHEDULE:
+            return f"Unknown outbox action {row['action']}"
+        
+        payload = row['payload']
+        try:
+            updated = self.jira_service.update_task_status_and_timing(
+                row['jira_key'],
+                datetime.fromisoformat(payload['planned_start']),
+                datetime.fromisoformat(payload['planned_end']),
+                project_key=payload.get('project_key'),
+                issue_type=payload.get('issue_type'),
+                status=payload.get('status')
+            )
+        except Exception as e:
+            return str(e)
+        return None if updated else 'Jira update failed'
+    
+    @staticmethod
+    def _backoff(attempts: int) -> float:
+        """Exponential backoff with jitter, capped at JIRA_OUTBOX_MAX_BACKOFF_SECONDS"""
+        delay = min(Config.JIRA_OUTBOX_MAX_BACKOFF_SECONDS, Config.JIRA_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+_drainer = None
+_drainer_pid = None
+_drainer_lock = threading.Lock()
+
+def kick_jira_outbox(app):
+    """Drain the outbox in a background thread of this process unless one is already running"""
+    global _drainer, _drainer_pid
+    with _drainer_lock:
+        if _drainer and _drainer.is_alive() and _drainer_pid == os.getpid():
+            return False
+        _drainer = threading.Thread(target=_drain_in_background, args=(app,), name='jira-outbox-drainer', daemon=True)
+        _drainer_pid = os.getpid()
+        _drainer.start()
+        return True
+
+def _drain_in_background(app):
+    with app.app_context():
+        try:
+            JiraOutboxService().drain()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"❌ Jira outbox drain failed: {e}")
+        finally:
+            db.session.remove()
\ No newline at end of file
@@ -1,153 +1,584 @@
 import logging
-from datetime import datetime, date
-from jira import JIRA
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
+from urllib.parse import urlparse
+from jira import JIRA, JIRAError
+from requests.adapters import HTTPAdapter
 from app import db
-from app.models.jira_task import JiraTask
+from app.models.jira_task import JiraTask, SYNCED_COLUMNS
+from app.models.sync_watermark import SyncWatermark
 from app.models.user_data import UserData
 from config.config import Config
 
 logger = logging.getLogger(__name__)
 
-class JiraService:
+EKPLT_SYNC_PROFILE = 'ekplt_autolt'
+
+PLANNED_START_FIELD = 'customfield_10000'
+
+# Fields read by _issue_to_dict - searches request only these instead of *all
+SYNC_FIELDS = (
+    'summary', 'description', 'status', 'assignee', 'reporter', 'priority',
+    'issuetype', 'project', 'labels', 'created', 'updated', 'resolutiondate',
+    PLANNED_START_FIELD
+)
+
+# Fields needed for slot checking (labels tell the pipeline and so the slot length)
+SLOT_FIELDS = ('status', 'labels', PLANNED_START_FIELD)
+
+# Order of values in rows produced by raw_issue_to_row
+TASK_ROW_COLUMNS = ('jira_key',) + SYNCED_COLUMNS
+
+# Jira timestamps look like 2024-05-01T19:00:00.000+0300 ('Z' and '+03:00' are accepted too)
+_JIRA_DATETIME_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6})\d*)?(?:(Z)|([+-])(\d{2}):?(\d{2}))?$'
+)
+_timezones = {}
+
+# 'In Progress' transitions per workflow state: (project, issue type, status) ->
+# {'id': transition id or None, 'with_fields': whether fields can be set in the same call}
+_transition_cache = {}
+_transition_cache_lock = threading.Lock()
+
+# Per-host limit of concurrent Jira requests, shared by all threads of the process
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
+def _host_limit(url):
+    """Semaphore limiting concurrent requests to the host of url"""
+    host = urlparse(url or '').netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(max(Config.JIRA_MAX_CONCURRENT_PER_HOST, 1))
+        return _host_limits[host]
+
+def parse_jira_datetime(value):
+    """Parse Jira ISO-8601 timestamp keeping its UTC offset. Returns None for empty or malformed values"""
+    if not value or not isinstance(value, str):
+        return None
+    
+    match = _JIRA_DATETIME_RE.match(value)
+    if not match:
+        return None
+    
+    year, month, day, hour, minute, second, fraction, zulu, sign, offset_hours, offset_minutes = match.groups()
+    tzinfo = None
+    if zulu:
+        tzinfo = timezone.utc
+    elif sign:
+        offset = f'{sign}{offset_hours}{offset_minutes}'
+        tzinfo = _timezones.get(offset)
+        if tzinfo is None:
+            delta = timedelta(hours=int(offset_hours), minutes=int(offset_minutes))
+            tzinfo = _timezones[offset] = timezone(-delta if sign == '-' else delta)
+    
+    return datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second),
+        int(fraction.ljust(6, '0')) if fraction else 0, tzinfo
+    )
+
+def _jira_wall_clock(value):
+    """Jira local wall-clock time without offset and microseconds, as stored in jira_tasks"""
+    parsed = parse_jira_datetime(value)
+    return parsed.replace(tzinfo=None, microsecond=0) if parsed else None
+
+def raw_issue_to_row(raw):
+    """
+    Map raw issue JSON (search result or webhook payload) to a row tuple in TASK_ROW_COLUMNS order.
+    Produces the same values as JiraService._issue_to_dict without building jira.Issue objects
+    """
+    fields = raw['fields']
+    assignee = fields.get('assignee')
+    reporter = fields.get('reporter')
+    priority = fields.get('priority')
+    
+    return (
+        raw['key'],
+        fields.get('summary'),
+        fields.get('description', ''),
+        fields['status']['name'],
+        assignee['displayName'] if assignee else None,
+        reporter['displayName'] if reporter else None,
+        priority['name'] if priority else None,
+        fields['issuetype']['name'],
+        fields['project']['key'],
+        _jira_wall_clock(fields.get(PLANNED_START_FIELD)),
+        list(fields.get('labels') or []),
+        _jira_wall_clock(fields.get('created')),
+        _jira_wall_clock(fields.get('updated')),
+        _jira_wall_clock(fields.get('resolutiondate'))
+    )
+
+def _rejects_fields(error, fields):
+    """JIRAError body names one of fields, e.g. "Field 'customfield_10000' cannot be set" """
+    errors = {}
+    try:
+        errors = error.response.json().get('errors') or {}
+    except Exception:
+        pass
+    text = ' '.join([error.text or ''] + [str(message) for message in errors.values()])
+    return any(field in errors or field in text for field in fields)
+
+class JiraClientRegistry:
+    """
+    Per-process shared JIRA client. Connects lazily on first use, keeps one pooled
+    HTTP session and re-reads credentials every JIRA_CREDENTIALS_TTL seconds,
+    reconnecting only when they changed
+    """
+    
     def __init__(self):
-        self.jira = None
-        self._connect()
+        self._lock = threading.Lock()
+        self._client = None
+        self._credentials = None
+        self._checked_at = 0.0
+        self._pid = None
+        # Counters are bumped from the lock-free fast path too, they have their own lock
+        self._stats_lock = threading.Lock()
+        self.stats = {'connects': 0, 'connect_seconds': 0.0, 'failures': 0, 'reuses': 0}
+        # Field metadata shared by all JiraService instances of the process
+        self._fields_lock = threading.Lock()
+        self._fields = None
+        self._field_ids = {}
+        self._fields_expires_at = 0.0
+    
+    def get_client(self):
+        """Shared client or None if Jira is unreachable"""
+        if self._is_fresh():
+            self._count('reuses')
+            return self._client
+        
+        with self._lock:
+            if self._is_fresh():
+                self._count('reuses')
+                return self._client
+            
+            credentials = self._load_credentials()
+            if self._client is not None and self._pid == os.getpid() and credentials == self._credentials:
+                self._checked_at = time.monotonic()
+                self._count('reuses')
+                return self._client
+            
+            self._client = self._connect(credentials)
+            self._credentials = credentials if self._client else None
+            self._checked_at = time.monotonic()
+            self._pid = os.getpid()
+            return self._client
+    
+    def reset(self):
+        """Drop the shared client, next get_client() reconnects"""
+        with self._lock:
+            self._client = None
+            self._credentials = None
+    
+    def get_fields(self, client):
+        """Field definitions from /field, refetched every JIRA_FIELDS_CACHE_TTL seconds"""
+        with self._fields_lock:
+            if self._fields is None or time.monotonic() >= self._fields_expires_at:
+                fields = client.fields()
+                self._field_ids = {name: field['id'] for field in fields for name in field.get('clauseNames', [])}
+                self._fields = fields
+                self._fields_expires_at = time.monotonic() + Config.JIRA_FIELDS_CACHE_TTL
+                logger.info(f"🗂️ Loaded {len(fields)} Jira field definitions")
+            return self._fields
+    
+    def get_field_ids(self, client):
+        """JQL clause name -> field id, e.g. 'cf[10000]' -> 'customfield_10000'"""
+        self.get_fields(client)
+        return self._field_ids
     
-    def _connect(self):
-        """Connect to JIRA using credentials from database first, then fallback to env"""
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        connects = stats['connects']
+        return {
+            **stats,
+            'connect_seconds': round(stats['connect_seconds'], 3),
+            'avg_connect_seconds': round(stats['connect_seconds'] / connects, 3) if connects else None,
+            'connected': self._client is not None
+        }
+    
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self.stats[name] += value
+    
+    def _is_fresh(self):
+        # Forked gunicorn workers must not share the parent's sockets
+        return (
+            self._client is not None
+            and self._pid == os.getpid()
+            and time.monotonic() - self._checked_at < Config.JIRA_CREDENTIALS_TTL
+        )
+    
+    def _load_credentials(self):
+        """Credentials from database first, then fallback to env: (server, username, token)"""
         try:
-            # Try to get credentials from database first
             jira_creds = UserData.get_credentials('jira')
-            
-            if jira_creds:
-                logger.info(f"🔑 Using JIRA credentials from database for user: {jira_creds.name or 'default'}")
-                jira_url = Config.JIRA_URL  # URL still from config
-                username = jira_creds.name
-                api_token = jira_creds.token
-                
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read JIRA credentials from database: {e}")
+            jira_creds = None
+        
+        if jira_creds:
+            return Config.JIRA_URL, jira_creds.name, jira_creds.token  # URL still from config
+        
+        logger.warning("⚠️ No JIRA credentials in database, using environment variables")
+        return Config.JIRA_URL, None, Config.JIRA_API_TOKEN
+    
+    def _connect(self, credentials):
+        """Connect to JIRA with given credentials"""
+        server, username, api_token = credentials
+        started = time.monotonic()
+        try:
+            if username:
                 # Use basic auth with username if name is provided, otherwise token auth
-                if username:
-                    self.jira = JIRA(
-                        server=jira_url,
-                        basic_auth=(username, api_token),
-                        options={'verify': False}
-                    )
-                else:
-                    self.jira = JIRA(
-                        server=jira_url,
-                        token_auth=api_token,
-                        options={'verify': False}
-                    )
+                logger.info(f"🔑 Using JIRA credentials from database for user: {username}")
+                client = JIRA(
+                    server=server,
+                    basic_auth=(username, api_token),
+                    options={'verify': False}
+                )
             else:
-                # Fallback to environment variables
-                logger.warning("⚠️ No JIRA credentials in database, using environment variables")
-                self.jira = JIRA(
-                    server=Config.JIRA_URL,
-                    token_auth=Config.JIRA_API_TOKEN,
+                logger.info("🔑 Using JIRA token auth")
+                client = JIRA(
+                    server=server,
+                    token_auth=api_token,
                     options={'verify': False}
                 )
-                
+            
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.JIRA_HTTP_POOL_SIZE)
+            client._session.mount('https://', adapter)
+            client._session.mount('http://', adapter)
         except Exception as e:
+            self._count('failures')
             logger.error(f"Failed to connect to Jira: {e}")
-            self.jira = None
+            return None
+        
+        elapsed = time.monotonic() - started
+        self._count('connects')
+        self._count('connect_seconds', elapsed)
+        logger.info(f"🔌 Connected to Jira {server} in {elapsed:.2f}s (pid {os.getpid()})")
+        return client
+
+jira_clients = JiraClientRegistry()
+
+class JiraService:
+    def __init__(self, client=None):
+        self._client = client
+        self.last_sync_stats = None
+    
+    @property
+    def jira(self):
+        """Shared JIRA client, connected on first use"""
+        if self._client is None:
+            self._client = jira_clients.get_client()
+        return self._client
+    
+    @jira.setter
+    def jira(self, client):
+        self._client = client
     
     def search_tasks(self, jql_query, max_results=50):
         if not self.jira:
             return []
         
         try:
-            issues = self.jira.search_issues(jql_query, maxResults=max_results)
+            issues = self._search_issues(jql_query, maxResults=max_results)
             return [self._issue_to_dict(issue) for issue in issues]
         except Exception as e:
             logger.error(f"Error searching Jira tasks: {e}")
             return []
     
-    def sync_tasks_to_db(self, jql_query, max_results=50):
+    def sync_tasks_to_db(self, jql_query, max_results=None):
+        """
+        Sync all issues matching JQL page by page.
+        max_results caps the number of synced issues (None - sync everything)
+        """
         if not self.jira:
             return 0
         
-        synced_count = 0
         try:
-            issues = self.jira.search_issues(jql_query, maxResults=max_results)
-            
-            for issue in issues:
-                task_data = self._issue_to_dict(issue)
-                existing_task = JiraTask.query.filter_by(jira_key=issue.key).first()
-                
-                if existing_task:
-                    # Update existing task
-                    for key, value in task_data.items():
-                        if hasattr(existing_task, key):
-                            setattr(existing_task, key, value)
-                    existing_task.last_synced = datetime.now()
-                else:
-                    # Create new task
-                    new_task = JiraTask(**task_data)
-                    db.session.add(new_task)
-                
-                synced_count += 1
-            
-            db.session.commit()
-            return synced_count
+            return self._sync_jql(jql_query, max_results=max_results)
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error syncing tasks to database: {e}")
             return 0
     
-    def sync_ekplt_autolt_tasks(self, max_results=100):
+    def sync_ekplt_autolt_tasks(self, max_results=None, full=False):
         """
-        Sync tasks from EKPLT project with label 'autolt' and planned_start >= today
+        Sync tasks from EKPLT project with label 'autolt' and planned_start >= today.
+        Only issues updated since the stored watermark are fetched; a full reconcile
+        runs every JIRA_FULL_RECONCILE_HOURS (or when full=True) to catch deletions.
+        Returns the number of synced issues (0 is normal when nothing changed since
+        the watermark) or None on error; per-row counts are in last_sync_stats
         """
         if not self.jira:
-            return 0
+            return None
         
         # Build JQL query for EKPLT project with autolt label and planned_start >= today
-        today = date.today().strftime('%Y-%m-%d')
-        jql_query = (
+        today = date.today()
+        jql_filter = (
             f'project = EKPLT AND '
             f'labels = "autolt" AND '
-            f'cf[10000] >= "{today}" '  # Assuming customfield_10000 is planned_start
-            f'ORDER BY cf[10000] ASC'
+            f'cf[10000] >= "{today:%Y-%m-%d}"'  # Assuming customfield_10000 is planned_start
         )
         
-        logger.info(f"JQL Query: {jql_query}")
-        
         try:
-            # Use expand to get all fields including custom fields
-            issues = self.jira.search_issues(
-                jql_query, 
-                maxResults=max_results,
-                expand='names'  # Get field names for debugging
-            )
+            watermark = SyncWatermark.get_or_create(EKPLT_SYNC_PROFILE)
+            full = full or max_results is not None or watermark.is_full_sync_due(Config.JIRA_FULL_RECONCILE_HOURS)
             
-            synced_count = 0
+            if full:
+                jql_query = f'{jql_filter} ORDER BY cf[10000] ASC'
+            else:
+                since = watermark.watermark - timedelta(minutes=Config.JIRA_SYNC_WATERMARK_SKEW_MINUTES)
+                jql_query = f'{jql_filter} AND updated >= "{since:%Y-%m-%d %H:%M}" ORDER BY cf[10000] ASC'
             
-            for issue in issues:
-                task_data = self._issue_to_dict(issue)
-                existing_task = JiraTask.query.filter_by(jira_key=issue.key).first()
-                
-                if existing_task:
-                    # Update existing task
-                    for key, value in task_data.items():
-                        if hasattr(existing_task, key):
-                            setattr(existing_task, key, value)
-                    existing_task.last_synced = datetime.now()
-                else:
-                    # Create new task
-                    new_task = JiraTask(**task_data)
-                    db.session.add(new_task)
-                
-                synced_count += 1
-                logger.info(f"Synced: {issue.key} - {task_data['summary']}")
+            logger.info(f"JQL Query ({'full' if full else 'incremental'}): {jql_query}")
+            
+            seen_keys = set() if full else None
+            synced_count = self._sync_jql(jql_query, max_results=max_results, log_each=True, seen_keys=seen_keys)
             
+            # A capped run may skip issues, so it must not move the watermark
+            if max_results is None:
+                sync_stats = self.last_sync_stats
+                watermark.advance(sync_stats['max_updated'])
+                if full:
+                    self._reconcile_missing_ekplt_tasks(seen_keys, today)
+                    watermark.last_full_sync = datetime.now()
+                    self.last_sync_stats = sync_stats
             db.session.commit()
+            
             logger.info(f"Successfully synced {synced_count} EKPLT autolt tasks")
             return synced_count
             
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error syncing EKPLT autolt tasks: {e}")
-            return 0
+            return None
+    
+    def _reconcile_missing_ekplt_tasks(self, seen_keys, today):
+        """
+        Local EKPLT autolt tasks that the full JQL did not return were either deleted
+        in Jira or moved out of the filter. Refresh the ones that still exist and
+        delete the rest
+        """
+        local_tasks = db.session.query(JiraTask.jira_key, JiraTask.labels).filter(
+            JiraTask.project_key == 'EKPLT',
+            JiraTask.planned_start >= today
+        ).all()
+        missing_keys = [key for key, labels in local_tasks if 'autolt' in (labels or []) and key not in seen_keys]
+        if not missing_keys:
+            return
+        
+        logger.info(f"🔎 Reconciling {len(missing_keys)} local EKPLT tasks not returned by Jira")
+        chunk_size = Config.JIRA_SYNC_PAGE_SIZE
+        for i in range(0, len(missing_keys), chunk_size):
+            chunk = missing_keys[i:i + chunk_size]
+            found_keys = set()
+            # validate_query=False makes Jira skip keys of deleted issues instead of failing the query
+            self._sync_jql(
+                f'key in ({", ".join(chunk)})',
+                seen_keys=found_keys,
+                search_kwargs={'validate_query': False}
+            )
+            deleted_keys = [key for key in chunk if key not in found_keys]
+            if deleted_keys:
+                JiraTask.query.filter(JiraTask.jira_key.in_(deleted_keys)).delete(synchronize_session=False)
+                logger.info(f"🗑️ Removed {len(deleted_keys)} tasks deleted in Jira: {', '.join(deleted_keys)}")
+    
+    def _iter_issue_pages(self, jql_query, max_results=None, page_size=None, raw=False, **search_kwargs):
+        """
+        Walk search results by startAt and yield one page (list of issues) at a time, in order.
+        Once the first page reports the total, remaining pages are fetched by up to
+        JIRA_FETCH_CONCURRENCY threads with a bounded look-ahead window, so memory stays flat.
+        The stride is the page size the server actually returns (it may cap maxResults),
+        a page shorter than expected is completed sequentially before moving on.
+        max_results caps the total (None - no cap).
+        With raw=True pages contain raw issue JSON dicts instead of jira.Issue objects
+        """
+        page_size = page_size or Config.JIRA_SYNC_PAGE_SIZE
+        
+        def fetch(start_at, end, limit):
+            if end is not None:
+                limit = min(limit, end - start_at)
+            return self._fetch_page(jql_query, start_at, limit, raw, search_kwargs)
+        
+        if max_results is not None and max_results <= 0:
+            return
+        issues, total, server_page_size = fetch(0, max_results, page_size)
+        if not issues:
+            return
+        
+        if max_results is not None and total and total > max_results:
+            logger.warning(f"⚠️ JQL matched {total} issues, only first {max_results} will be processed")
+        yield issues
+        
+        end = total if max_results is None or total is None else min(total, max_results)
+        if end is None:
+            end = max_results
+        # Server may cap maxResults below page_size: step by what it really returns
+        stride = min(page_size, server_page_size or page_size)
+        if len(issues) < stride and (end is None or len(issues) < end):
+            stride = len(issues)
+        if stride < page_size:
+            logger.warning(f"⚠️ Jira returns at most {stride} issues per page (requested {page_size})")
+        
+        def fetch_sequential(start_at, stop):
+            """Pages from start_at one by one until stop (None - until a short or empty page)"""
+            while stop is None or start_at < stop:
+                issues, _, _ = fetch(start_at, stop, stride)
+                if not issues:
+                    return
+                yield issues
+                start_at += len(issues)
+                if stop is None and len(issues) < stride:
+                    return
+        
+        if total is None:
+            # Total unknown - walk pages sequentially until a short page
+            yield from fetch_sequential(len(issues), end)
+            return
+        
+        collected = len(issues)
+        offsets = iter(range(len(issues), end, stride))
+        workers = max(Config.JIRA_FETCH_CONCURRENCY, 1)
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jira-page')
+        try:
+            window = deque()
+            for start_at in offsets:
+                window.append((start_at, executor.submit(fetch, start_at, end, stride)))
+                if len(window) >= workers:
+                    break
+            
+            while window:
+                start_at, future = window.popleft()
+                issues, _, _ = future.result()
+                next_start = next(offsets, None)
+                if next_start is not None:
+                    window.append((next_start, executor.submit(fetch, next_start, end, stride)))
+                if issues:
+                    collected += len(issues)
+                    yield issues
+                
+                # Short page: fetch the rest of its stride sequentially instead of skipping it
+                expected_end = min(start_at + stride, end)
+                if start_at + len(issues) < expected_end:
+                    logger.warning(f"⚠️ Page at {start_at} returned {len(issues)} of {expected_end - start_at} issues, fetching the rest sequentially")
+                    for issues in fetch_sequential(start_at + len(issues), expected_end):
+                        collected += len(issues)
+                        yield issues
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        if collected < end:
+            # Issues moved between pages while paging - walk the tail sequentially,
+            # already synced issues may come again (upserts are idempotent)
+            logger.warning(f"⚠️ Collected {collected} issues, Jira reported {end}, paging sequentially from {collected}")
+            yield from fetch_sequential(collected, max_results)
+        elif collected > end:
+            logger.warning(f"⚠️ Collected {collected} issues, Jira reported {end}")
+    
+    def _fetch_page(self, jql_query, start_at, limit, raw, search_kwargs):
+        """Fetch one search page, returns (issues, total, maxResults reported by the server)"""
+        started = time.monotonic()
+        response = self._search_issues(
+            jql_query,
+            startAt=start_at,
+            maxResults=limit,
+            json_result=raw,
+            **search_kwargs
+        )
+        if raw:
+            issues = response.get('issues', [])
+            total = response.get('total')
+            server_page_size = response.get('maxResults')
+        else:
+            issues = list(response)
+            total = getattr(response, 'total', None)
+            server_page_size = getattr(response, 'maxResults', None)
+        
+        logger.debug(f"📥 Fetched {len(issues)} issues at {start_at} in {time.monotonic() - started:.2f}s")
+        return issues, total, server_page_size
+    
+    def _sync_jql(self, jql_query, max_results=None, log_each=False, seen_keys=None, search_kwargs=None):
+        """
+        Upsert every issue matching JQL page by page, committing in bounded chunks.
+        Per-page timings are logged and kept in self.last_sync_stats.
+        If seen_keys set is given, synced jira keys are added to it
+        """
+        commit_every = max(Config.JIRA_SYNC_COMMIT_EVERY, 1)
+        raw = Config.JIRA_RAW_SEARCH
+        synced_count = 0
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        max_updated = None
+        pending = 0
+        pages = []
+        run_started = time.monotonic()
+        
+        page_started = time.monotonic()
+        for page_number, issues in enumerate(self._iter_issue_pages(jql_query, max_results, raw=raw, **(search_kwargs or {})), start=1):
+            fetch_seconds = time.monotonic() - page_started
+            
+            write_started = time.monotonic()
+            if raw:
+                rows = [dict(zip(TASK_ROW_COLUMNS, raw_issue_to_row(issue))) for issue in issues]
+            else:
+                rows = [self._issue_to_dict(issue) for issue in issues]
+            page_counts = JiraTask.upsert_many(rows)
+            for key in counts:
+                counts[key] += page_counts[key]
+            for row in rows:
+                if row['updated_date'] and (not max_updated or row['updated_date'] > max_updated):
+                    max_updated = row['updated_date']
+                if seen_keys is not None:
+                    seen_keys.add(row['jira_key'])
+                if log_each:
+                    logger.info(f"Synced: {row['jira_key']} - {row['summary']}")
+            
+            synced_count += len(issues)
+            pending += len(issues)
+            if pending >= commit_every:
+                db.session.commit()
+                pending = 0
+            write_seconds = time.monotonic() - write_started
+            
+            page_seconds = fetch_seconds + write_seconds
+            rate = len(issues) / page_seconds if page_seconds > 0 else 0.0
+            pages.append({
+                'page': page_number,
+                'issues': len(issues),
+                **page_counts,
+                'fetch_seconds': round(fetch_seconds, 3),
+                'write_seconds': round(write_seconds, 3),
+                'issues_per_second': round(rate, 1)
+            })
+            logger.info(
+                f"📄 Page {page_number}: {len(issues)} issues "
+                f"(+{page_counts['inserted']} ~{page_counts['updated']} ={page_counts['unchanged']}, "
+                f"fetch {fetch_seconds:.2f}s, write {write_seconds:.2f}s, {rate:.1f} issues/s)"
+            )
+            page_started = time.monotonic()
+        
+        db.session.commit()
+        
+        total_seconds = time.monotonic() - run_started
+        self.last_sync_stats = {
+            'synced': synced_count,
+            **counts,
+            'max_updated': max_updated,
+            'pages': pages,
+            'seconds': round(total_seconds, 3),
+            'issues_per_second': round(synced_count / total_seconds, 1) if total_seconds > 0 else 0.0
+        }
+        logger.info(
+            f"📊 Synced {synced_count} issues in {len(pages)} pages, {total_seconds:.2f}s "
+            f"(inserted {counts['inserted']}, updated {counts['updated']}, unchanged {counts['unchanged']})"
+        )
+        return synced_count
     
     def get_ekplt_tasks_in_period(self, start_date, end_date):
         """
@@ -172,24 +603,23 @@ class JiraService:
             
             logger.info(f"🔍 Checking JIRA for EKPLT tasks in period {start_str} to {end_str}")
             
-            # Execute search
-            issues = self.jira.search_issues(jql_query, maxResults=500)  # Get more results for slot checking
-            
             tasks_data = []
-            for issue in issues:
-                planned_start_field = getattr(issue.fields, 'customfield_10000', None)
-                if planned_start_field:
-                    # Parse the planned_start datetime
-                    if isinstance(planned_start_field, str):
-                        planned_start = datetime.fromisoformat(planned_start_field.replace('Z', '+00:00'))
-                    else:
-                        planned_start = planned_start_field
-                    
-                    tasks_data.append({
-                        'jira_key': issue.key,
-                        'planned_start': planned_start.replace(tzinfo=None) if hasattr(planned_start, 'replace') else planned_start,
-                        'status': str(issue.fields.status)
-                    })
+            for issues in self._iter_issue_pages(jql_query, fields=SLOT_FIELDS):
+                for issue in issues:
+                    planned_start_field = getattr(issue.fields, PLANNED_START_FIELD, None)
+                    if planned_start_field:
+                        # Parse the planned_start datetime
+                        if isinstance(planned_start_field, str):
+                            planned_start = datetime.fromisoformat(planned_start_field.replace('Z', '+00:00'))
+                        else:
+                            planned_start = planned_start_field
+                        
+                        tasks_data.append({
+                            'jira_key': issue.key,
+                            'planned_start': planned_start.replace(tzinfo=None) if hasattr(planned_start, 'replace') else planned_start,
+                            'status': str(issue.fields.status),
+                            'labels': list(getattr(issue.fields, 'labels', None) or [])
+                        })
             
             logger.info(f"📋 Found {len(tasks_data)} EKPLT tasks in the specified period")
             return tasks_data
@@ -206,14 +636,14 @@ class JiraService:
             return None
         
         try:
-            issue = self.jira.issue(issue_key, expand='names')
+            issue = self.jira.issue(issue_key)
+            field_names = {field['id']: field['name'] for field in self._get_fields_metadata()}
             fields_info = {}
             
             # Get all available fields
             for field_key, field_value in issue.raw['fields'].items():
-                field_name = getattr(self.jira.fields(), field_key, {}).get('name', field_key)
                 fields_info[field_key] = {
-                    'name': field_name,
+                    'name': field_names.get(field_key, field_key),
                     'value': str(field_value)[:100] if field_value else None  # Truncate long values
                 }
             
@@ -222,51 +652,121 @@ class JiraService:
             logger.error(f"Error getting field info: {e}")
             return None
     
-    def update_task_status_and_timing(self, jira_key: str, planned_start: datetime, planned_end: datetime) -> bool:
+    def _search_issues(self, jql_query, fields=SYNC_FIELDS, **kwargs):
+        """search_issues with explicit field projection resolved through the cached field ids"""
+        fields = self._resolve_fields(fields)
+        with _host_limit(Config.JIRA_URL):
+            return self.jira.search_issues(jql_query, fields=fields, **kwargs)
+    
+    def _get_fields_metadata(self):
+        """Field metadata from the process-wide cache"""
+        return jira_clients.get_fields(self.jira)
+    
+    def _resolve_fields(self, fields):
+        """Field ids for field or JQL clause names; a fresh list, search_issues rewrites it in place"""
+        field_ids = jira_clients.get_field_ids(self.jira)
+        return [field_ids.get(field, field) for field in fields]
+    
+    def update_task_status_and_timing(self, jira_key: str, planned_start: datetime, planned_end: datetime,
+                                      project_key: str = None, issue_type: str = None, status: str = None) -> bool:
         """
-        Update JIRA task status to 'In Progress' and set planned_start/planned_end fields
+        Update JIRA task status to 'In Progress' and set planned_start/planned_end fields.
+        With known project/issue type/status (e.g. from the local JiraTask) and a cached
+        transition this is a single transition_issue(..., fields=...) request
         """
         if not self.jira:
             return False
         
-        try:
-            issue = self.jira.issue(jira_key)
-            
-            # Update status to 'In Progress'
-            # First, get available transitions
-            transitions = self.jira.transitions(issue)
-            in_progress_transition = None
-            
-            for transition in transitions:
-                if 'In Progress' in transition['name'] or 'in progress' in transition['name'].lower():
-                    in_progress_transition = transition
-                    break
-            
-            if in_progress_transition:
-                self.jira.transition_issue(issue, in_progress_transition['id'])
-                logger.info(f"✅ Updated {jira_key} status to 'In Progress'")
-            else:
-                logger.warning(f"⚠️ No 'In Progress' transition found for {jira_key}")
-            
-            # Update custom fields for planned_start and planned_end
-            # Note: These field IDs may need to be adjusted based on your JIRA configuration
-            fields_update = {}
-            
+        # Update custom fields for planned_start and planned_end
+        # Note: These field IDs may need to be adjusted based on your JIRA configuration
+        fields_update = {
             # Assuming customfield_10000 is planned_start
-            fields_update['customfield_10000'] = planned_start.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
-            
+            PLANNED_START_FIELD: planned_start.strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
             # Assuming customfield_10001 is planned_end (if exists)
-            # fields_update['customfield_10001'] = planned_end.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
-            
-            issue.update(fields=fields_update)
+            # 'customfield_10001': planned_end.strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
+        }
+        
+        context_given = bool(project_key and issue_type and status)
+        try:
+            if not context_given:
+                project_key, issue_type, status = self._get_workflow_state(jira_key)
+            self._move_to_in_progress(jira_key, (project_key, issue_type, status), fields_update)
             logger.info(f"✅ Updated {jira_key} timing: Start={planned_start}")
-            
             return True
             
+        except JIRAError as e:
+            if context_given:
+                # Local status may be stale - retry once with the state read from Jira
+                logger.warning(f"⚠️ Update of {jira_key} from cached state failed ({e.status_code}), retrying with live state")
+                return self.update_task_status_and_timing(jira_key, planned_start, planned_end)
+            logger.error(f"❌ Failed to update JIRA task {jira_key}: {e}")
+            return False
         except Exception as e:
             logger.error(f"❌ Failed to update JIRA task {jira_key}: {e}")
             return False
     
+    def _get_workflow_state(self, jira_key):
+        """(project key, issue type, status) of an issue"""
+        issue = self.jira.issue(jira_key, fields='project,issuetype,status')
+        return issue.fields.project.key, issue.fields.issuetype.name, issue.fields.status.name
+    
+    def _move_to_in_progress(self, jira_key, state, fields_update):
+        """Transition issue to 'In Progress' setting fields_update, using as few requests as possible"""
+        if state[2].lower() == 'in progress':
+            self._update_issue_fields(jira_key, fields_update)
+            return
+        
+        transition = self._get_in_progress_transition(jira_key, state)
+        if not transition['id']:
+            logger.warning(f"⚠️ No 'In Progress' transition found for {jira_key}")
+            self._update_issue_fields(jira_key, fields_update)
+            return
+        
+        try:
+            if transition['with_fields']:
+                try:
+                    self.jira.transition_issue(jira_key, transition['id'], fields=fields_update)
+                    logger.info(f"✅ Updated {jira_key} status to 'In Progress'")
+                    return
+                except JIRAError as e:
+                    if e.status_code != 400 or not _rejects_fields(e, fields_update):
+                        raise
+                    # Field is not on the transition screen - remember and set it separately
+                    logger.info(f"ℹ️ Transition screen of {state} does not accept fields, updating separately")
+                    transition['with_fields'] = False
+            
+            self.jira.transition_issue(jira_key, transition['id'])
+            logger.info(f"✅ Updated {jira_key} status to 'In Progress'")
+        except JIRAError:
+            # Workflow may have changed - forget the cached transition
+            with _transition_cache_lock:
+                _transition_cache.pop(state, None)
+            raise
+        
+        self._update_issue_fields(jira_key, fields_update)
+    
+    def _get_in_progress_transition(self, jira_key, state):
+        """Cached 'In Progress' transition for (project, issue type, status)"""
+        with _transition_cache_lock:
+            transition = _transition_cache.get(state)
+        if transition is not None:
+            return transition
+        
+        transition_id = None
+        for candidate in self.jira.transitions(jira_key):
+            if 'in progress' in candidate['name'].lower():
+                transition_id = candidate['id']
+                break
+        
+        transition = {'id': transition_id, 'with_fields': True}
+        with _transition_cache_lock:
+            _transition_cache[state] = transition
+        return transition
+    
+    def _update_issue_fields(self, jira_key, fields_update):
+        """Edit issue fields; the issue is fetched with the key only, not all of its fields"""
+        self.jira.issue(jira_key, fields='key').update(fields=fields_update)
+    
     def _issue_to_dict(self, issue):
         created_date = None
         updated_date = None
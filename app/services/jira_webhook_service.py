@@ -0,0 +1,168 @@
+import hmac
+import logging
+import os
+import queue
+import threading
+import time
+from app import db
+from app.models.jira_task import JiraTask
+from app.services.jira_service import TASK_ROW_COLUMNS, raw_issue_to_row
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+ISSUE_CREATED = 'jira:issue_created'
+ISSUE_UPDATED = 'jira:issue_updated'
+ISSUE_DELETED = 'jira:issue_deleted'
+ISSUE_EVENTS = (ISSUE_CREATED, ISSUE_UPDATED, ISSUE_DELETED)
+
+class JiraWebhookService:
+    """Validates Jira issue webhooks, queues them and applies them to jira_tasks in batches"""
+    
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue(maxsize=Config.JIRA_WEBHOOK_QUEUE_SIZE)
+        self._worker = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+    
+    def is_authorized(self, secret):
+        """Check shared secret if JIRA_WEBHOOK_SECRET is configured"""
+        if not Config.JIRA_WEBHOOK_SECRET:
+            return True
+        return bool(secret) and hmac.compare_digest(secret, Config.JIRA_WEBHOOK_SECRET)
+    
+    def parse_event(self, payload):
+        """
+        Validate webhook payload and map it with the sync mapping.
+        Returns (event, jira_key, row) where row is None for deletions,
+        or None for events other than issue created/updated/deleted.
+        Raises ValueError for malformed payloads
+        """
+        if not isinstance(payload, dict):
+            raise ValueError('Payload must be a JSON object')
+        
+        event = payload.get('webhookEvent')
+        if event not in ISSUE_EVENTS:
+            return None
+        
+        issue = payload.get('issue')
+        if not isinstance(issue, dict) or not isinstance(issue.get('key'), str) or not issue['key']:
+            raise ValueError('Payload has no issue key')
+        
+        if event == ISSUE_DELETED:
+            return event, issue['key'], None
+        
+        if not isinstance(issue.get('fields'), dict):
+            raise ValueError(f"Issue {issue['key']} has no fields")
+        try:
+            row = raw_issue_to_row(issue)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Issue {issue['key']} is missing field {e}")
+        return event, issue['key'], row
+    
+    def enqueue(self, payload):
+        """
+        Validate payload and put it on the apply queue.
+        Returns event name or None if the event is ignored.
+        Raises ValueError for malformed payloads and queue.Full on overload
+        """
+        parsed = self.parse_event(payload)
+        if parsed is None:
+            return None
+        
+        self._ensure_worker()
+        self.queue.put_nowait(parsed)
+        return parsed[0]
+    
+    def apply_batch(self, events):
+        """
+        Apply queued events in arrival order: the last event per issue wins.
+        All upserts go in one INSERT ... ON CONFLICT, deletions in one DELETE.
+        An upsert never overwrites a task with a later updated_date.
+        Returns None if the batch could not be written
+        """
+        latest = {}
+        for event, jira_key, row in events:
+            latest[jira_key] = row
+        
+        rows = [dict(zip(TASK_ROW_COLUMNS, row)) for row in latest.values() if row is not None]
+        deleted_keys = [jira_key for jira_key, row in latest.items() if row is None]
+        
+        with self.app.app_context():
+            try:
+                counts = JiraTask.upsert_many(rows, newer_only=True)
+                deleted = 0
+                if deleted_keys:
+                    deleted = JiraTask.query.filter(JiraTask.jira_key.in_(deleted_keys)).delete(synchronize_session=False)
+                db.session.commit()
+                logger.info(
+                    f"🪝 Applied {len(events)} webhook events: inserted {counts['inserted']}, "
+                    f"updated {counts['updated']}, unchanged {counts['unchanged']}, deleted {deleted}"
+                )
+                return {**counts, 'deleted': deleted}
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"❌ Failed to apply {len(events)} webhook events: {e}")
+                return None
+            finally:
+                db.session.remove()
+    
+    def _ensure_worker(self):
+        """Start the apply thread in this process (gunicorn workers are forked, threads are not)"""
+        if self._worker and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        
+        with self._lock:
+            if self._worker and self._worker.is_alive() and self._worker_pid == os.getpid():
+                return
+            self._worker = threading.Thread(target=self._run, name='jira-webhook-worker', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+    
+    def _run(self):
+        """Collect events into batches of JIRA_WEBHOOK_BATCH_SIZE or JIRA_WEBHOOK_FLUSH_SECONDS and apply them"""
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + Config.JIRA_WEBHOOK_FLUSH_SECONDS
+            
+            while len(batch) < Config.JIRA_WEBHOOK_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            self._apply_with_retry(batch)
+            for _ in batch:
+                self.queue.task_done()
+    
+    def _apply_with_retry(self, batch):
+        """
+        Apply a batch, retrying up to JIRA_WEBHOOK_MAX_RETRIES times with a linear pause.
+        New events wait on the queue meanwhile, so they are still applied after this batch
+        """
+        for attempt in range(Config.JIRA_WEBHOOK_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(Config.JIRA_WEBHOOK_RETRY_SECONDS * attempt)
+            if self.apply_batch(batch) is not None:
+                return True
+            logger.warning(f"⚠️ Webhook batch attempt {attempt + 1}/{Config.JIRA_WEBHOOK_MAX_RETRIES + 1} failed")
+        
+        keys = sorted({jira_key for _, jira_key, _ in batch})
+        logger.error(f"❌ Dropped {len(batch)} webhook events after retries, next sync will pick them up: {', '.join(keys)}")
+        return False
+
+_webhook_service = None
+_webhook_service_lock = threading.Lock()
+
+def get_jira_webhook_service(app):
+    """Process-wide webhook service"""
+    global _webhook_service
+    if _webhook_service is None:
+        with _webhook_service_lock:
+            if _webhook_service is None:
+                _webhook_service = JiraWebhookService(app)
+    return _webhook_service
\ No newline at end of file
@@ -0,0 +1,255 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from app.services.interval_index import IntervalIndex
+
+logger = logging.getLogger(__name__)
+
+def parse_windows(value: str) -> List[Tuple[int, int]]:
+    """
+    Parse daily windows like '19:00-23:00,08:00-12:00' into (start, end) minutes from midnight.
+    A window ending at or before its start ends the next day ('22:00-02:00')
+    """
+    windows = []
+    for part in filter(None, (chunk.strip() for chunk in value.split(','))):
+        start_text, end_text = part.split('-')
+        start = _parse_minutes(start_text)
+        end = _parse_minutes(end_text)
+        if end <= start:
+            end += 24 * 60
+        windows.append((start, end))
+    if not windows:
+        raise ValueError('At least one scheduling window is required')
+    return sorted(windows)
+
+def parse_weekdays(value: str) -> frozenset:
+    """Parse ISO weekdays (1 = Monday .. 7 = Sunday) like '1-5,7'"""
+    weekdays = set()
+    for part in filter(None, (chunk.strip() for chunk in value.split(','))):
+        if '-' in part:
+            first, last = (int(day) for day in part.split('-'))
+            weekdays.update(range(first, last + 1))
+        else:
+            weekdays.add(int(part))
+    if not weekdays or not weekdays <= set(range(1, 8)):
+        raise ValueError(f'Invalid weekdays: {value}')
+    return frozenset(weekdays)
+
+def parse_dates(value: str) -> frozenset:
+    """Parse comma-separated YYYY-MM-DD dates"""
+    return frozenset(
+        datetime.strptime(part.strip(), '%Y-%m-%d').date()
+        for part in value.split(',') if part.strip()
+    )
+
+def parse_pipeline_hours(value: str) -> Dict[str, float]:
+    """Parse per-pipeline slot lengths like 'EKP=4,INFOSRV=2.5'"""
+    hours = {}
+    for part in filter(None, (chunk.strip() for chunk in value.split(','))):
+        pipeline, pipeline_hours = part.split('=')
+        hours[pipeline.strip().upper()] = float(pipeline_hours)
+    return hours
+
+def _parse_minutes(value: str) -> int:
+    hours, minutes = value.strip().split(':')
+    return int(hours) * 60 + int(minutes)
+
+class SlotConflict(Exception):
+    """Raised by a claim callback when the slot was taken by someone else meanwhile"""
+    
+    def __init__(self, stand: int, start: datetime, end: datetime):
+        super().__init__(f"stand {stand} is already booked within {start} - {end}")
+        self.stand = stand
+        self.start = start
+        self.end = end
+
+class SlotCalendar:
+    """When runs may take place: daily windows, weekday mask and blackout dates"""
+    
+    def __init__(self, windows: List[Tuple[int, int]], weekdays: Iterable[int] = range(1, 8),
+                 blackout_dates: Iterable[date] = ()):
+        self.windows = sorted(windows)
+        self.weekdays = frozenset(weekdays)
+        self.blackout_dates = frozenset(blackout_dates)
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            parse_windows(config.SCHEDULER_WINDOWS),
+            parse_weekdays(config.SCHEDULER_WEEKDAYS),
+            parse_dates(config.SCHEDULER_BLACKOUT_DATES)
+        )
+    
+    def is_open_day(self, day: date) -> bool:
+        return day.isoweekday() in self.weekdays and day not in self.blackout_dates
+    
+    def iter_windows(self, start: datetime, end: datetime):
+        """Yield (window_start, window_end) datetimes intersecting [start, end) in chronological order"""
+        # Overnight windows of the previous day may still be open at start
+        day = start.date() - timedelta(days=1)
+        while True:
+            midnight = datetime.combine(day, datetime.min.time())
+            if midnight >= end:
+                return
+            if self.is_open_day(day):
+                for window_start, window_end in self.windows:
+                    window_start = midnight + timedelta(minutes=window_start)
+                    window_end = midnight + timedelta(minutes=window_end)
+                    if window_start >= end:
+                        return
+                    if window_end > start:
+                        yield window_start, window_end
+            day += timedelta(days=1)
+    
+    def runs_per_day(self, duration: timedelta) -> int:
+        """How many back-to-back runs of duration fit into the windows of one open day"""
+        if duration <= timedelta(0):
+            return 0
+        return sum(timedelta(minutes=end - start) // duration for start, end in self.windows)
+    
+    def longest_window_hours(self) -> float:
+        """Length of the longest daily window: no run longer than that can ever be placed"""
+        return max(end - start for start, end in self.windows) / 60
+    
+    def describe(self) -> dict:
+        return {
+            'windows': [
+                f"{start // 60 % 24:02d}:{start % 60:02d}-{end // 60 % 24:02d}:{end % 60:02d}"
+                for start, end in self.windows
+            ],
+            'weekdays': sorted(self.weekdays),
+            'blackout_dates': sorted(day.isoformat() for day in self.blackout_dates)
+        }
+
+class SlotAllocator:
+    """
+    Places runs into calendar windows on N parallel test stands.
+    Every stand keeps its own IntervalIndex of occupied time; a run must fit
+    entirely inside one window on one stand.
+    
+    Occupied time only grows, so once no slot of a given duration starts before
+    some moment it never will again. That frontier is cached per duration and
+    search resumes from it, which keeps batch placement linear in the horizon
+    instead of rescanning every full window for each task
+    """
+    
+    def __init__(self, calendar: SlotCalendar, stands: int = 1, slot_hours: Dict[str, float] = None,
+                 default_slot_hours: float = 4, align_minutes: int = 15, max_claim_retries: int = 5,
+                 frontier_cache: bool = True):
+        self.calendar = calendar
+        self.stands = [IntervalIndex() for _ in range(max(stands, 1))]
+        self.slot_hours = {pipeline.upper(): hours for pipeline, hours in (slot_hours or {}).items()}
+        self.default_slot_hours = default_slot_hours
+        self.align = timedelta(minutes=align_minutes)
+        self.max_claim_retries = max_claim_retries
+        self.frontier_cache = frontier_cache
+        self._frontier = {}  # (duration, not_before) -> no free slot starts in [not_before, frontier)
+    
+    def slot_duration(self, pipeline: Optional[str]) -> timedelta:
+        hours = self.slot_hours.get((pipeline or '').upper(), self.default_slot_hours)
+        return timedelta(hours=hours)
+    
+    def add_occupied(self, start: datetime, end: datetime):
+        """Register a run that is already planned; it takes the first stand free at that time"""
+        for index in self.stands:
+            if not index.overlaps(start, end):
+                index.add(start, end)
+                return
+        # Already over capacity - count it on the first stand
+        self.stands[0].add(start, end)
+    
+    def reserve(self, stand: int, start: datetime, end: datetime):
+        self.stands[stand].add(start, end)
+    
+    def find_slot(self, pipeline: Optional[str], not_before: datetime,
+                  horizon_end: datetime) -> Optional[Tuple[int, datetime, datetime]]:
+        """Earliest (stand, start, end) for a run of pipeline, or None within the horizon"""
+        duration = self.slot_duration(pipeline)
+        not_before = self._align_up(not_before)
+        key = (duration, not_before)
+        search_from = max(not_before, self._frontier.get(key, not_before)) if self.frontier_cache else not_before
+        
+        for window_start, window_end in self.calendar.iter_windows(search_from, horizon_end):
+            begin = max(window_start, search_from)
+            best = None
+            for stand, index in enumerate(self.stands):
+                start = index.next_free(begin, duration, limit=window_end)
+                if start is not None and (best is None or start < best[1]):
+                    best = (stand, start)
+            if best:
+                self._frontier[key] = best[1]
+                return best[0], best[1], best[1] + duration
+        
+        self._frontier[key] = max(search_from, horizon_end)
+        return None
+    
+    def allocate_batch(self, tasks: Iterable[Tuple[object, str]], not_before: datetime, horizon_end: datetime,
+                       claim: Callable[[object, str, int, datetime, datetime], bool] = None) -> Tuple[list, list]:
+        """
+        Place (task, pipeline) pairs in order in a single pass.
+        claim(task, pipeline, stand, start, end) persists the assignment; when it returns False the
+        slot stays free and the task is reported as failed. When it raises SlotConflict the slot
+        is marked occupied and the next free one is tried, up to max_claim_retries times.
+        Returns (assignments, unplaced) where unplaced are (task, reason) pairs
+        """
+        assignments = []
+        unplaced = []
+        for task, pipeline in tasks:
+            for _ in range(self.max_claim_retries + 1):
+                slot = self.find_slot(pipeline, not_before, horizon_end)
+                if slot is None:
+                    unplaced.append((task, 'no_slot'))
+                    break
+                
+                stand, start, end = slot
+                try:
+                    claimed = claim is None or claim(task, pipeline, stand, start, end)
+                except SlotConflict as conflict:
+                    # Booked by a concurrent scheduler since we loaded occupancy
+                    self.reserve(conflict.stand, conflict.start, conflict.end)
+                    continue
+                
+                if not claimed:
+                    unplaced.append((task, 'claim_failed'))
+                    break
+                
+                self.reserve(stand, start, end)
+                assignments.append({
+                    'task': task,
+                    'pipeline': pipeline,
+                    'stand': stand,
+                    'start': start,
+                    'end': end
+                })
+                break
+            else:
+                unplaced.append((task, 'conflict'))
+        return assignments, unplaced
+    
+    def _align_up(self, moment: datetime) -> datetime:
+        """Round up to the slot grid so runs start at tidy times"""
+        midnight = datetime.combine(moment.date(), datetime.min.time())
+        steps = -(-(moment - midnight) // self.align)
+        return midnight + steps * self.align
+
+def plan_schedule(tasks: Iterable[Tuple[object, str]], occupied: Iterable[Tuple[Optional[int], datetime, datetime]],
+                  calendar: SlotCalendar, not_before: datetime, horizon_end: datetime, stands: int = 1,
+                  slot_hours: Dict[str, float] = None, default_slot_hours: float = 4,
+                  claim: Callable[[object, str, int, datetime, datetime], bool] = None,
+                  frontier_cache: bool = True) -> Tuple[list, list]:
+    """
+    Planning core without I/O: place (task, pipeline) pairs around occupied
+    (stand, start, end) intervals, stand None meaning "first stand free at that time".
+    Without claim nothing is persisted, which is what dry runs and benchmarks use.
+    Returns (assignments, unplaced) as SlotAllocator.allocate_batch
+    """
+    allocator = SlotAllocator(calendar, stands, slot_hours, default_slot_hours, frontier_cache=frontier_cache)
+    
+    # Runs with a known stand first, the rest take what is left in start order
+    for stand, start, end in sorted(occupied, key=lambda interval: (interval[0] is None, interval[1])):
+        if stand is None:
+            allocator.add_occupied(start, end)
+        else:
+            allocator.reserve(min(stand, len(allocator.stands) - 1), start, end)
+    
+    return allocator.allocate_batch(tasks, not_before, horizon_end, claim=claim)
\ No newline at end of file
@@ -1,9 +1,19 @@
 import logging
 from datetime import datetime, timedelta
 from app import db
+from app.models.jira_outbox import JiraOutbox
 from app.models.jira_task import JiraTask
 from app.models.scheduler import Scheduler
+from app.models.slot_reservation import SlotReservation
+from app.services.autolt_service import check_stand_jobs, parse_stand_jobs
+from app.services.duration_stats_service import DurationStatsService
+from app.services.jira_outbox_service import JiraOutboxService, kick_jira_outbox
 from app.services.jira_service import JiraService
+from app.services.slot_allocator import SlotCalendar, SlotConflict, parse_pipeline_hours, plan_schedule
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from config.config import Config
 from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
@@ -13,138 +23,195 @@ class TaskSchedulerService:
     
     def __init__(self):
         self.jira_service = JiraService()
-        self.slot_duration_hours = 4
-        self.start_hour = 19  # 19:00
+        self.calendar = SlotCalendar.from_config(Config)
+        self.stands = Config.SCHEDULER_STANDS
+        # Parallel stands only add capacity if each runs its own Jenkins jobs
+        check_stand_jobs(self.stands, parse_stand_jobs(Config.AUTOLT_STAND_JOBS))
+        self.slot_hours = parse_pipeline_hours(Config.SCHEDULER_SLOT_HOURS)
+        self.default_slot_hours = Config.SCHEDULER_DEFAULT_SLOT_HOURS
+        self.horizon_days = Config.SCHEDULER_HORIZON_DAYS
+        self.duration_stats = DurationStatsService()
     
-    def schedule_next_tasks(self) -> dict:
+    def get_slot_hours(self) -> dict:
+        """Slot length per pipeline, sized from run history when SCHEDULER_DURATION_STATS_ENABLED"""
+        if not Config.SCHEDULER_DURATION_STATS_ENABLED:
+            return dict(self.slot_hours)
+        return self.duration_stats.slot_hours(self.slot_hours, max_hours=self.calendar.longest_window_hours())
+    
+    def schedule_next_tasks(self, dry_run: bool = False, horizon_days: Optional[int] = None) -> dict:
         """
         Main method to schedule next available tasks
+        With dry_run nothing is written and JIRA is not called: occupied time comes
+        from slot reservations and the synced jira_tasks table
         Returns summary of scheduled tasks
         """
-        logger.info("🔄 Starting task scheduling process...")
+        logger.info(f"🔄 Starting task scheduling process{' (dry run)' if dry_run else ''}...")
         
         # 1. Get tasks with status 'Open' ordered by planned_start
         open_tasks = self._get_open_tasks()
         if not open_tasks:
-            return {"scheduled": 0, "message": "No open tasks found"}
+            return {"scheduled": 0, "dry_run": dry_run, "message": "No open tasks found"}
         
         logger.info(f"📋 Found {len(open_tasks)} open tasks")
         
-        # 2. Schedule each task in available slots
-        scheduled_count = 0
+        # 2. Load occupied slots: reservations plus a single Jira query for the whole horizon
+        now = datetime.now()
+        horizon_end = now + timedelta(days=horizon_days or self.horizon_days)
+        if not dry_run:
+            SlotReservation.release_finished([task.jira_key for task in open_tasks], now)
+        slot_hours = self.get_slot_hours()
+        logger.info(f"⏱️ Slot lengths: {slot_hours}")
+        occupied = self._load_occupied(now, horizon_end, slot_hours, from_jira=not dry_run)
+        
+        # 3. Place the whole batch in one pass; _schedule_task claims each slot in the
+        # reservations table, a concurrent booking makes the allocator try the next slot
+        assignments, unplaced = plan_schedule(
+            [(task, self._resolve_pipeline(task.labels)) for task in open_tasks],
+            occupied,
+            self.calendar,
+            now,
+            horizon_end,
+            stands=self.stands,
+            slot_hours=slot_hours,
+            default_slot_hours=self.default_slot_hours,
+            claim=None if dry_run else self._schedule_task
+        )
+        
+        # Push the queued JIRA updates in the background, cron drains whatever is left
+        if assignments and not dry_run:
+            kick_jira_outbox(current_app._get_current_object())
+        
         results = []
+        for assignment in assignments:
+            task = assignment['task']
+            logger.info(f"{'🧪 Would schedule' if dry_run else '✅ Scheduled'} {task.jira_key} ({assignment['pipeline']}) on stand {assignment['stand']} for {assignment['start']}")
+            results.append({
+                "task": task.jira_key,
+                "pipeline": assignment['pipeline'],
+                "stand": assignment['stand'],
+                "slot_start": assignment['start'],
+                "slot_end": assignment['end']
+            })
         
-        for task in open_tasks:
-            try:
-                slot_time = self._find_next_available_slot()
-                if slot_time:
-                    success = self._schedule_task(task, slot_time)
-                    if success:
-                        scheduled_count += 1
-                        results.append({
-                            "task": task.jira_key,
-                            "slot_start": slot_time,
-                            "slot_end": slot_time + timedelta(hours=self.slot_duration_hours)
-                        })
-                        logger.info(f"✅ Scheduled {task.jira_key} for {slot_time}")
-                    else:
-                        logger.error(f"❌ Failed to schedule {task.jira_key}")
-                else:
-                    logger.warning(f"⏰ No available slot found for {task.jira_key}")
-                    break  # No more slots available
-            except Exception as e:
-                logger.error(f"❌ Error scheduling {task.jira_key}: {e}")
+        for task, reason in unplaced:
+            if reason == 'no_slot':
+                logger.warning(f"⏰ No available slot found for {task.jira_key}")
+            elif reason == 'conflict':
+                logger.warning(f"⚔️ Slots for {task.jira_key} kept being booked concurrently, will retry next run")
+            else:
+                logger.error(f"❌ Failed to schedule {task.jira_key}")
         
         return {
-            "scheduled": scheduled_count,
+            "scheduled": len(results),
+            "dry_run": dry_run,
             "tasks": results,
-            "message": f"Successfully scheduled {scheduled_count} tasks"
+            "unscheduled": [task.jira_key for task, _ in unplaced],
+            "message": f"{'Dry run: would schedule' if dry_run else 'Successfully scheduled'} {len(results)} tasks"
         }
     
     def _get_open_tasks(self) -> List[JiraTask]:
-        """Get tasks with status 'Open' ordered by planned_start date"""
+        """
+        Get tasks with status 'Open' ordered by planned_start date.
+        Tasks with an upcoming reservation are skipped: they are already scheduled,
+        a sync may just have reverted the status before their JIRA update was pushed
+        """
+        reserved = SlotReservation.query.filter(
+            SlotReservation.jira_task == JiraTask.jira_key,
+            func.upper(SlotReservation.period) > datetime.now()
+        ).exists()
         return JiraTask.query.filter(
-            JiraTask.status == 'Open'
+            JiraTask.status == 'Open',
+            ~reserved
         ).order_by(
             JiraTask.planned_start.asc()
         ).all()
     
-    def _find_next_available_slot(self) -> Optional[datetime]:
-        """
-        Find next available 4-hour slot starting from today 19:00
-        Returns None if no slot available
-        """
-        # Start from today at 19:00
-        now = datetime.now()
-        current_date = now.date()
-        
-        # If it's past 23:00 today, start from tomorrow
-        if now.hour >= 23:
-            current_date = current_date + timedelta(days=1)
-        
-        # Check next 14 days for available slots
-        for day_offset in range(14):
-            check_date = current_date + timedelta(days=day_offset)
-            slot_start = datetime.combine(check_date, datetime.min.time()) + timedelta(hours=self.start_hour)
-            slot_end = slot_start + timedelta(hours=self.slot_duration_hours)
-            
-            # Check if this slot is free (no overlapping tasks)
-            if self._is_slot_available(slot_start, slot_end):
-                return slot_start
-        
-        return None
+    def _resolve_pipeline(self, labels) -> str:
+        """Pipeline from task labels (e.g. 'infosrv'), SCHEDULER_DEFAULT_PIPELINE otherwise"""
+        known = {pipeline.lower(): pipeline for pipeline in self.slot_hours}
+        for label in labels or []:
+            if label.lower() in known:
+                return known[label.lower()]
+        return Config.SCHEDULER_DEFAULT_PIPELINE
     
-    def _is_slot_available(self, slot_start: datetime, slot_end: datetime) -> bool:
+    def _load_occupied(self, now: datetime, horizon_end: datetime, slot_hours: dict,
+                       from_jira: bool = True) -> List[Tuple[Optional[int], datetime, datetime]]:
         """
-        Check if time slot is available (no overlapping scheduled tasks in JIRA EKPLT project)
+        Occupied (stand, start, end) intervals around the scheduling horizon:
+        stand reservations plus EKPLT tasks planned in JIRA (fetched once),
+        or in the synced jira_tasks table when from_jira is False
         """
-        # Get all EKPLT tasks in the period covering our slot
-        period_start = slot_start.date()
-        period_end = slot_end.date()
+        # A run planned the day before can still overlap the first window
+        period_start = datetime.combine(now.date() - timedelta(days=1), datetime.min.time())
+        period_end = datetime.combine(horizon_end.date() + timedelta(days=2), datetime.min.time())
         
-        # Get tasks from JIRA for the period
-        jira_tasks = self.jira_service.get_ekplt_tasks_in_period(period_start, period_end)
+        occupied = []
+        reserved = set()
+        for jira_task, stand, start, end in SlotReservation.in_period(period_start, period_end):
+            occupied.append((stand, start, end))
+            reserved.add(jira_task)
         
-        # Check for overlapping tasks
-        for task in jira_tasks:
-            if task['planned_start']:
-                task_start = task['planned_start']
-                task_end = task_start + timedelta(hours=self.slot_duration_hours)
-                
-                # Check if there's overlap between our slot and existing task
-                if (task_start < slot_end and task_end > slot_start):
-                    logger.info(f"⚠️ Slot {slot_start} conflicts with existing task {task['jira_key']} at {task_start}")
-                    return False
+        if from_jira:
+            planned_tasks = self.jira_service.get_ekplt_tasks_in_period(period_start.date(), period_end.date())
+        else:
+            planned_tasks = [
+                {'jira_key': task.jira_key, 'planned_start': task.planned_start, 'labels': task.labels}
+                for task in JiraTask.query.filter(
+                    JiraTask.project_key == 'EKPLT',
+                    JiraTask.planned_start >= period_start,
+                    JiraTask.planned_start <= period_end
+                )
+            ]
         
-        return True
+        # Tasks planned in JIRA by hand have no reservation and take the first free stand
+        planned = 0
+        for task in planned_tasks:
+            if not task['planned_start'] or task['jira_key'] in reserved:
+                continue
+            pipeline = self._resolve_pipeline(task.get('labels'))
+            hours = slot_hours.get(pipeline, self.default_slot_hours)
+            occupied.append((None, task['planned_start'], task['planned_start'] + timedelta(hours=hours)))
+            planned += 1
+        
+        logger.info(f"📆 Registered {len(reserved)} reservations and {planned} other EKPLT tasks as occupied")
+        return occupied
     
-    def _schedule_task(self, task: JiraTask, slot_time: datetime) -> bool:
+    def _schedule_task(self, task: JiraTask, pipeline: str, stand: int, slot_time: datetime, slot_end: datetime) -> bool:
         """
-        Schedule a task for the given slot time
-        1. Update JIRA (status to 'In Progress', set planned_start and planned_end)
-        2. Save to scheduler table
+        Schedule a task for the given slot time on a stand in one transaction:
+        1. Claim the slot in slot_reservations (raises SlotConflict if it is taken)
+        2. Save task status and scheduler entry
+        3. Queue the JIRA update (status 'In Progress', planned_start) in jira_outbox
         """
+        # 1. Claim the slot, the database rejects overlapping bookings on the stand
+        try:
+            SlotReservation.claim(task.jira_key, stand, slot_time, slot_end, pipeline)
+        except IntegrityError as e:
+            if SlotReservation.is_overlap(e):
+                logger.info(f"🔁 Slot {slot_time} on stand {stand} was booked concurrently, retrying {task.jira_key}")
+                raise SlotConflict(stand, slot_time, slot_end)
+            logger.warning(f"⚠️ Task {task.jira_key} is already reserved by another scheduler run")
+            return False
+        
         try:
-            slot_end = slot_time + timedelta(hours=self.slot_duration_hours)
-            
-            # 1. Update JIRA task
-            jira_updated = self._update_jira_task(task.jira_key, slot_time, slot_end)
-            if not jira_updated:
-                logger.warning(f"⚠️ Failed to update JIRA for task {task.jira_key}")
-                return False
-            
             # 2. Update local database
+            jira_status = task.status
             task.status = 'In Progress'
             task.planned_start = slot_time
-            db.session.commit()
+            # Not Jira's state until the outbox pushes it - let the next sync rewrite the row
+            task.content_hash = None
             
-            # 3. Create scheduler entry
             scheduler_entry = Scheduler(
                 jira_task=task.jira_key,
                 planned_start=slot_time,
-                status='ready'
+                status='ready',
+                pipeline=pipeline,
+                stand=stand
             )
             db.session.add(scheduler_entry)
+            
+            # 3. JIRA is updated by the outbox drainer after commit
+            JiraOutboxService.enqueue_schedule(task, slot_time, slot_end, status=jira_status)
             db.session.commit()
             
             return True
@@ -154,17 +221,6 @@ class TaskSchedulerService:
             logger.error(f"❌ Error scheduling task {task.jira_key}: {e}")
             return False
     
-    def _update_jira_task(self, jira_key: str, planned_start: datetime, planned_end: datetime) -> bool:
-        """
-        Update JIRA task with new status and timing
-        Returns True if successful
-        """
-        try:
-            return self.jira_service.update_task_status_and_timing(jira_key, planned_start, planned_end)
-        except Exception as e:
-            logger.error(f"❌ JIRA update failed for {jira_key}: {e}")
-            return False
-    
     def get_scheduling_status(self) -> dict:
         """Get current scheduling status and statistics"""
         total_open = JiraTask.query.filter(JiraTask.status == 'Open').count()
@@ -175,6 +231,11 @@ class TaskSchedulerService:
             "open_tasks": total_open,
             "scheduled_tasks": total_scheduled,
             "running_tasks": total_running,
-            "slot_duration_hours": self.slot_duration_hours,
-            "start_time": f"{self.start_hour}:00"
+            "jira_outbox": JiraOutbox.get_stats(),
+            "slot_hours": self.slot_hours,
+            "effective_slot_hours": self.get_slot_hours(),
+            "default_slot_hours": self.default_slot_hours,
+            "stands": self.stands,
+            "horizon_days": self.horizon_days,
+            **self.calendar.describe()
         }
\ No newline at end of file
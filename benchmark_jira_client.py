@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Measure Jira handler latency with a fresh client per request (old behaviour)
+vs the shared per-process client from JiraClientRegistry.
+
+Each iteration does what a sync/schedule handler does first: obtain a client
+and make one lightweight API call (/rest/api/2/myself).
+"""
+import argparse
+import os
+import statistics
+import time
+from app import create_app
+from app.services.jira_service import JiraClientRegistry, JiraService, jira_clients
+from config.config import config as app_config
+
+def measure(name, func, iterations):
+    """Run func iterations times and print latency percentiles"""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<32} avg {statistics.mean(timings):8.1f} ms  p50 {statistics.median(timings):8.1f} ms  p95 {p95:8.1f} ms")
+    return statistics.mean(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+
+    with app.app_context():
+        def fresh_client_handler():
+            # Old JiraService(): credentials query + new authenticated JIRA session every time
+            registry = JiraClientRegistry()
+            client = registry.get_client()
+            client.myself()
+
+        def shared_client_handler():
+            JiraService().jira.myself()
+
+        if not JiraService().jira:
+            print("❌ Cannot connect to Jira, check credentials")
+            return
+
+        print(f"📊 Jira handler latency, {args.iterations} iterations")
+        print("=" * 80)
+        fresh = measure('fresh client per request', fresh_client_handler, args.iterations)
+        shared = measure('shared client', shared_client_handler, args.iterations)
+        print("=" * 80)
+        print(f"⚡ Connect cost removed per request: {fresh - shared:.1f} ms (x{fresh / shared:.1f})")
+        print(f"🔌 Shared client stats: {jira_clients.get_stats()}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
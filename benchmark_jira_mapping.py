@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: jira.Issue + _issue_to_dict vs raw JSON fast path (raw_issue_to_row)
+"""
+import argparse
+import time
+from jira.resources import Issue
+from app.services.jira_service import JiraService, TASK_ROW_COLUMNS, raw_issue_to_row
+
+def make_raw_issue(number):
+    """Build a search hit shaped like /rest/api/2/search output"""
+    return {
+        'id': str(100000 + number),
+        'key': f'EKPLT-{number}',
+        'self': f'https://jira.example.com/rest/api/2/issue/{100000 + number}',
+        'fields': {
+            'summary': f'Load test #{number}',
+            'description': 'Nightly load test run ' * 10,
+            'status': {'name': 'Open', 'id': '1', 'statusCategory': {'key': 'new', 'name': 'To Do'}},
+            'assignee': {'displayName': 'Load Tester', 'name': 'tester', 'active': True},
+            'reporter': {'displayName': 'Release Manager', 'name': 'rm', 'active': True},
+            'priority': {'name': 'Major', 'id': '3'},
+            'issuetype': {'name': 'Task', 'id': '3', 'subtask': False},
+            'project': {'key': 'EKPLT', 'name': 'EKP Load Testing', 'id': '10000'},
+            'labels': ['autolt', 'nightly'],
+            'created': '2024-05-01T10:15:30.000+0300',
+            'updated': '2024-05-02T11:20:00.123+0300',
+            'resolutiondate': None,
+            'customfield_10000': '2024-05-10T19:00:00.000+0300'
+        }
+    }
+
+def bench(name, func, raw_issues, repeat):
+    """Run func over all issues repeat times and print best issues/sec"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(raw_issues)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    rate = len(raw_issues) / best
+    print(f"{name:<45} {best * 1000:9.1f} ms  {rate:12,.0f} issues/s")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--issues', type=int, default=5000, help='issues per run')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per variant, best is reported')
+    args = parser.parse_args()
+
+    raw_issues = [make_raw_issue(number) for number in range(args.issues)]
+    # Mapping does not need a Jira connection
+    service = JiraService.__new__(JiraService)
+
+    def resource_path(issues):
+        return [service._issue_to_dict(Issue({}, None, raw=raw)) for raw in issues]
+
+    def raw_path(issues):
+        return [raw_issue_to_row(raw) for raw in issues]
+
+    def raw_dict_path(issues):
+        return [dict(zip(TASK_ROW_COLUMNS, raw_issue_to_row(raw))) for raw in issues]
+
+    # Both paths must produce the same values
+    expected = {key: value for key, value in resource_path(raw_issues[:1])[0].items() if key in TASK_ROW_COLUMNS}
+    assert expected == raw_dict_path(raw_issues[:1])[0], 'raw mapping differs from _issue_to_dict'
+
+    print(f"📊 Mapping {args.issues} issues, best of {args.repeat}")
+    print("=" * 80)
+    base = bench('jira.Issue + _issue_to_dict', resource_path, raw_issues, args.repeat)
+    fast = bench('raw_issue_to_row (tuples)', raw_path, raw_issues, args.repeat)
+    bench('raw_issue_to_row + dict (sync rows)', raw_dict_path, raw_issues, args.repeat)
+    print("=" * 80)
+    print(f"⚡ Raw path speedup: x{fast / base:.1f}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
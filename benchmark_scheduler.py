@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the scheduling core (plan_schedule) on synthetic data: no Jira, no database.
+
+Scales open tasks and horizon length, reports planning time and placed tasks,
+and compares against the allocator without the per-duration frontier cache
+(skipped for big grids, see --baseline-limit).
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from app.services.slot_allocator import (
+    SlotCalendar, parse_dates, parse_pipeline_hours, parse_weekdays, parse_windows, plan_schedule
+)
+
+def make_tasks(count, infosrv_share, rng):
+    """(task key, pipeline) pairs in planning order"""
+    return [
+        (f'EKPLT-{number}', 'INFOSRV' if rng.random() < infosrv_share else 'EKP')
+        for number in range(count)
+    ]
+
+def make_occupied(start, horizon_days, per_day, stands, rng):
+    """Random already planned runs: some with a known stand, some taken from Jira only"""
+    occupied = []
+    for _ in range(int(horizon_days * per_day)):
+        run_start = start + timedelta(days=rng.uniform(0, horizon_days))
+        run_start = run_start.replace(minute=run_start.minute // 15 * 15, second=0, microsecond=0)
+        stand = rng.randrange(stands) if rng.random() < 0.5 else None
+        occupied.append((stand, run_start, run_start + timedelta(hours=rng.choice((2, 3, 4)))))
+    return occupied
+
+def run(tasks, occupied, calendar, start, horizon_days, args, frontier_cache):
+    started = time.perf_counter()
+    assignments, unplaced = plan_schedule(
+        tasks, occupied, calendar, start, start + timedelta(days=horizon_days),
+        stands=args.stands,
+        slot_hours=parse_pipeline_hours(args.slot_hours),
+        default_slot_hours=4,
+        frontier_cache=frontier_cache
+    )
+    return time.perf_counter() - started, assignments, unplaced
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', default='100,500,1000,10000', help='open task counts, comma separated')
+    parser.add_argument('--horizon-days', default='14,90,1000,10000', help='horizon lengths, comma separated')
+    parser.add_argument('--windows', default='08:00-12:00,13:00-17:00,19:00-23:00')
+    parser.add_argument('--weekdays', default='1-7')
+    parser.add_argument('--blackout-dates', default='')
+    parser.add_argument('--slot-hours', default='EKP=4,INFOSRV=2')
+    parser.add_argument('--stands', type=int, default=2)
+    parser.add_argument('--occupied-per-day', type=float, default=1.0, help='already planned runs per day')
+    parser.add_argument('--infosrv-share', type=float, default=0.3)
+    parser.add_argument('--baseline-limit', type=int, default=1000, help='max tasks to also run without frontier cache')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    calendar = SlotCalendar(parse_windows(args.windows), parse_weekdays(args.weekdays), parse_dates(args.blackout_dates))
+    start = datetime(2030, 1, 1, 6, 0)
+
+    print(f"📊 plan_schedule benchmark: windows {calendar.describe()['windows']}, {args.stands} stand(s)")
+    print("=" * 96)
+    print(f"{'tasks':>7} {'horizon':>8} {'occupied':>9} {'placed':>7} {'unplaced':>9} {'time, ms':>10} {'no cache, ms':>13} {'speedup':>8}")
+
+    for horizon_days in (int(value) for value in args.horizon_days.split(',')):
+        for task_count in (int(value) for value in args.tasks.split(',')):
+            rng = random.Random(args.seed)
+            tasks = make_tasks(task_count, args.infosrv_share, rng)
+            occupied = make_occupied(start, horizon_days, args.occupied_per_day, args.stands, rng)
+
+            elapsed, assignments, unplaced = run(tasks, occupied, calendar, start, horizon_days, args, True)
+            baseline = speedup = ''
+            if task_count <= args.baseline_limit:
+                base_elapsed, base_assignments, _ = run(tasks, occupied, calendar, start, horizon_days, args, False)
+                # The cache must not change the plan
+                assert [(a['task'], a['stand'], a['start']) for a in assignments] == \
+                    [(a['task'], a['stand'], a['start']) for a in base_assignments], 'frontier cache changed the plan'
+                baseline = f"{base_elapsed * 1000:.1f}"
+                speedup = f"x{base_elapsed / elapsed:.1f}"
+
+            print(f"{task_count:>7} {horizon_days:>7}d {len(occupied):>9} {len(assignments):>7} {len(unplaced):>9} "
+                  f"{elapsed * 1000:>10.1f} {baseline:>13} {speedup:>8}")
+    print("=" * 96)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -25,11 +25,77 @@ class Config:
     JIRA_USERNAME = os.environ.get('JIRA_USERNAME')
     JIRA_API_TOKEN = os.environ.get('JIRA_API_TOKEN')
     
+    # Shared Jira client: credentials re-read interval (seconds) and HTTP keep-alive pool size
+    JIRA_CREDENTIALS_TTL = int(os.environ.get('JIRA_CREDENTIALS_TTL', 300))
+    JIRA_HTTP_POOL_SIZE = int(os.environ.get('JIRA_HTTP_POOL_SIZE', 10))
+    
+    # Jira sync paging: issues per search request and rows per DB commit
+    JIRA_SYNC_PAGE_SIZE = int(os.environ.get('JIRA_SYNC_PAGE_SIZE', 100))
+    JIRA_SYNC_COMMIT_EVERY = int(os.environ.get('JIRA_SYNC_COMMIT_EVERY', 500))
+    
+    # Pages fetched in parallel after the first one and max concurrent requests per Jira host
+    JIRA_FETCH_CONCURRENCY = int(os.environ.get('JIRA_FETCH_CONCURRENCY', 8))
+    JIRA_MAX_CONCURRENT_PER_HOST = int(os.environ.get('JIRA_MAX_CONCURRENT_PER_HOST', 8))
+    
+    # Incremental sync: overlap applied to the 'updated' watermark and full reconcile interval
+    JIRA_SYNC_WATERMARK_SKEW_MINUTES = int(os.environ.get('JIRA_SYNC_WATERMARK_SKEW_MINUTES', 5))
+    JIRA_FULL_RECONCILE_HOURS = int(os.environ.get('JIRA_FULL_RECONCILE_HOURS', 24))
+    
+    # Field metadata (/rest/api/2/field) cache lifetime in seconds
+    JIRA_FIELDS_CACHE_TTL = int(os.environ.get('JIRA_FIELDS_CACHE_TTL', 3600))
+    
+    # Map raw search JSON straight into rows instead of building jira.Issue objects
+    JIRA_RAW_SEARCH = os.environ.get('JIRA_RAW_SEARCH', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Jira webhooks: shared secret (?secret= or X-Webhook-Secret) and batching of DB writes
+    JIRA_WEBHOOK_SECRET = os.environ.get('JIRA_WEBHOOK_SECRET')
+    JIRA_WEBHOOK_QUEUE_SIZE = int(os.environ.get('JIRA_WEBHOOK_QUEUE_SIZE', 10000))
+    JIRA_WEBHOOK_BATCH_SIZE = int(os.environ.get('JIRA_WEBHOOK_BATCH_SIZE', 100))
+    JIRA_WEBHOOK_FLUSH_SECONDS = float(os.environ.get('JIRA_WEBHOOK_FLUSH_SECONDS', 2))
+    # A batch that failed to apply is retried this many times with a growing pause before it is dropped
+    JIRA_WEBHOOK_MAX_RETRIES = int(os.environ.get('JIRA_WEBHOOK_MAX_RETRIES', 5))
+    JIRA_WEBHOOK_RETRY_SECONDS = float(os.environ.get('JIRA_WEBHOOK_RETRY_SECONDS', 2))
+    
+    # Jira write-back outbox: scheduling commits its Jira update locally, a drainer pushes it
+    JIRA_OUTBOX_CONCURRENCY = int(os.environ.get('JIRA_OUTBOX_CONCURRENCY', 8))
+    JIRA_OUTBOX_BATCH_SIZE = int(os.environ.get('JIRA_OUTBOX_BATCH_SIZE', 50))
+    JIRA_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('JIRA_OUTBOX_MAX_ATTEMPTS', 8))
+    JIRA_OUTBOX_BACKOFF_SECONDS = int(os.environ.get('JIRA_OUTBOX_BACKOFF_SECONDS', 30))
+    JIRA_OUTBOX_MAX_BACKOFF_SECONDS = int(os.environ.get('JIRA_OUTBOX_MAX_BACKOFF_SECONDS', 3600))
+    JIRA_OUTBOX_LEASE_SECONDS = int(os.environ.get('JIRA_OUTBOX_LEASE_SECONDS', 300))
+    
     # Jenkins Configuration
     JENKINS_URL = os.environ.get('JENKINS_URL')
     JENKINS_USERNAME = os.environ.get('JENKINS_USERNAME')
     JENKINS_TOKEN = os.environ.get('JENKINS_TOKEN')
     
+    # Shared Jenkins connections: credentials re-read interval, client lifetime,
+    # idle time before a health probe (seconds) and HTTP keep-alive pool size per server
+    JENKINS_CREDENTIALS_TTL = int(os.environ.get('JENKINS_CREDENTIALS_TTL', 300))
+    JENKINS_CONNECTION_TTL = int(os.environ.get('JENKINS_CONNECTION_TTL', 1800))
+    JENKINS_HEALTH_CHECK_SECONDS = int(os.environ.get('JENKINS_HEALTH_CHECK_SECONDS', 60))
+    JENKINS_HTTP_POOL_SIZE = int(os.environ.get('JENKINS_HTTP_POOL_SIZE', 10))
+    
+    # Jobs snapshot per Jenkins server (one tree=jobs[...] request): cache lifetime and folder levels followed
+    JENKINS_SNAPSHOT_TTL = int(os.environ.get('JENKINS_SNAPSHOT_TTL', 15))
+    JENKINS_SNAPSHOT_FOLDER_DEPTH = int(os.environ.get('JENKINS_SNAPSHOT_FOLDER_DEPTH', 2))
+    
+    # Parallel calls to several Jenkins servers: worker threads, max concurrent requests per server
+    # and how long (seconds) a fan-out waits for the slowest server
+    JENKINS_FANOUT_WORKERS = int(os.environ.get('JENKINS_FANOUT_WORKERS', 8))
+    JENKINS_MAX_CONCURRENT_PER_SERVER = int(os.environ.get('JENKINS_MAX_CONCURRENT_PER_SERVER', 4))
+    JENKINS_FANOUT_TIMEOUT = float(os.environ.get('JENKINS_FANOUT_TIMEOUT', 20))
+    
+    # Jenkins request timeouts (seconds), below the gunicorn worker timeout. Per-server overrides:
+    # 'https://jenkins-mobile.company.ru=3:60,https://jenkins-prod.company.ru=5:20' (connect:read)
+    JENKINS_CONNECT_TIMEOUT = float(os.environ.get('JENKINS_CONNECT_TIMEOUT', 5))
+    JENKINS_READ_TIMEOUT = float(os.environ.get('JENKINS_READ_TIMEOUT', 20))
+    JENKINS_SERVER_TIMEOUTS = os.environ.get('JENKINS_SERVER_TIMEOUTS', '')
+    
+    # Circuit breaker per Jenkins server: consecutive failures before failing fast and seconds until a trial request
+    JENKINS_BREAKER_FAILURES = int(os.environ.get('JENKINS_BREAKER_FAILURES', 5))
+    JENKINS_BREAKER_RESET_SECONDS = int(os.environ.get('JENKINS_BREAKER_RESET_SECONDS', 30))
+    
     # Redis for Celery and Caching
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
     
@@ -40,6 +106,49 @@ class Config:
     # Scheduler Configuration
     SCHEDULER_API_ENABLED = True
     
+    # Load test slot allocation: daily windows (HH:MM-HH:MM, comma separated), ISO weekdays
+    # (1 = Monday), blackout dates (YYYY-MM-DD), slot length per pipeline and parallel test stands
+    SCHEDULER_WINDOWS = os.environ.get('SCHEDULER_WINDOWS', '19:00-23:00')
+    SCHEDULER_WEEKDAYS = os.environ.get('SCHEDULER_WEEKDAYS', '1-7')
+    SCHEDULER_BLACKOUT_DATES = os.environ.get('SCHEDULER_BLACKOUT_DATES', '')
+    SCHEDULER_SLOT_HOURS = os.environ.get('SCHEDULER_SLOT_HOURS', 'EKP=4,INFOSRV=4')
+    SCHEDULER_DEFAULT_SLOT_HOURS = float(os.environ.get('SCHEDULER_DEFAULT_SLOT_HOURS', 4))
+    SCHEDULER_DEFAULT_PIPELINE = os.environ.get('SCHEDULER_DEFAULT_PIPELINE', 'EKP')
+    SCHEDULER_STANDS = int(os.environ.get('SCHEDULER_STANDS', 1))
+    # Jenkins jobs of stands other than stand 0 (which uses the built-in jobs), e.g.
+    # 'EKP@1=Start_EKP_pipe_2/test-project-build_2,INFOSRV@1=Start_infosrv_pipe_2/infosrv_only_2'.
+    # With SCHEDULER_STANDS > 1 every pipeline needs its own jobs on every stand
+    AUTOLT_STAND_JOBS = os.environ.get('AUTOLT_STAND_JOBS', '')
+    SCHEDULER_HORIZON_DAYS = int(os.environ.get('SCHEDULER_HORIZON_DAYS', 14))
+    
+    # AutoLT pipeline phases (persisted state machine advanced by /tasks/api/pipeline-tick)
+    AUTOLT_WARMUP_MINUTES = int(os.environ.get('AUTOLT_WARMUP_MINUTES', 30))
+    AUTOLT_TEST_MINUTES = int(os.environ.get('AUTOLT_TEST_MINUTES', 60))
+    AUTOLT_DEPLOY_TIMEOUT_MINUTES = int(os.environ.get('AUTOLT_DEPLOY_TIMEOUT_MINUTES', 60))
+    AUTOLT_DEPLOY_POLL_SECONDS = int(os.environ.get('AUTOLT_DEPLOY_POLL_SECONDS', 30))
+    # Warmup readiness probes per pipeline, all must pass; AUTOLT_WARMUP_MINUTES is the cap.
+    # '|' separated: build (test job build running), console:<marker> (marker in its log),
+    # http:<url> (2xx/3xx response). Empty - wait the full AUTOLT_WARMUP_MINUTES
+    AUTOLT_READINESS_PROBES = {
+        'EKP': os.environ.get('AUTOLT_READINESS_EKP', ''),
+        'INFOSRV': os.environ.get('AUTOLT_READINESS_INFOSRV', ''),
+    }
+    AUTOLT_READINESS_MIN_POLL_SECONDS = int(os.environ.get('AUTOLT_READINESS_MIN_POLL_SECONDS', 60))
+    AUTOLT_READINESS_MAX_POLL_SECONDS = int(os.environ.get('AUTOLT_READINESS_MAX_POLL_SECONDS', 300))
+    AUTOLT_READINESS_HTTP_TIMEOUT = int(os.environ.get('AUTOLT_READINESS_HTTP_TIMEOUT', 5))
+    
+    # Runs advanced in parallel per tick and retry interval of a run waiting for a locked Jenkins job
+    AUTOLT_TICK_WORKERS = int(os.environ.get('AUTOLT_TICK_WORKERS', 4))
+    AUTOLT_LOCK_POLL_SECONDS = int(os.environ.get('AUTOLT_LOCK_POLL_SECONDS', 60))
+    
+    # Slot lengths learned from completed runs: the chosen percentile of run duration per pipeline
+    # (plus lead time before the first test stage) replaces SCHEDULER_SLOT_HOURS once enough runs exist
+    SCHEDULER_DURATION_STATS_ENABLED = os.environ.get('SCHEDULER_DURATION_STATS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SCHEDULER_DURATION_PERCENTILE = float(os.environ.get('SCHEDULER_DURATION_PERCENTILE', 0.9))
+    SCHEDULER_DURATION_MIN_SAMPLES = int(os.environ.get('SCHEDULER_DURATION_MIN_SAMPLES', 5))
+    SCHEDULER_DURATION_LOOKBACK_DAYS = int(os.environ.get('SCHEDULER_DURATION_LOOKBACK_DAYS', 90))
+    SCHEDULER_DURATION_LEAD_MINUTES = int(os.environ.get('SCHEDULER_DURATION_LEAD_MINUTES', 30))
+    
     @staticmethod
     def init_app(app):
         pass
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Local script to add content_hash column to jira_tasks table
+"""
+import os
+from app import create_app, db
+from config.config import config as app_config
+
+def add_content_hash_column():
+    """Add content_hash column used to skip no-op sync updates"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Adding content_hash column to jira_tasks table...")
+        with db.engine.connect() as conn:
+            conn.execute(db.text('ALTER TABLE autoltv2.jira_tasks ADD COLUMN IF NOT EXISTS content_hash VARCHAR(40);'))
+            conn.commit()
+        print("✅ content_hash column added successfully!")
+        print("ℹ️ Existing tasks get their hash on the next sync")
+
+if __name__ == '__main__':
+    add_content_hash_column()
\ No newline at end of file
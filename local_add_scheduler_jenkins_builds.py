@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Local script to add jenkins_builds column to scheduler table
+"""
+import os
+from app import create_app, db
+from config.config import config as app_config
+
+def add_scheduler_jenkins_builds_column():
+    """Add jenkins_builds (queue item / build number of every job triggered by a run)"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Adding jenkins_builds column to scheduler table...")
+        with db.engine.connect() as conn:
+            conn.execute(db.text('ALTER TABLE scheduler ADD COLUMN IF NOT EXISTS jenkins_builds JSON;'))
+            conn.commit()
+        print("✅ Column added successfully!")
+        print("ℹ️ Runs started before the upgrade fall back to the last build of their jobs")
+
+if __name__ == '__main__':
+    add_scheduler_jenkins_builds_column()
\ No newline at end of file
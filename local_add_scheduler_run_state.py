@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Local script to add pipeline state columns to scheduler table
+"""
+import os
+from app import create_app, db
+from config.config import config as app_config
+
+def add_scheduler_run_state_columns():
+    """Add phase_started_at / next_run_at used by the pipeline executor"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Adding phase_started_at and next_run_at columns to scheduler table...")
+        with db.engine.connect() as conn:
+            conn.execute(db.text('ALTER TABLE scheduler ADD COLUMN IF NOT EXISTS phase_started_at TIMESTAMP WITHOUT TIME ZONE;'))
+            conn.execute(db.text('ALTER TABLE scheduler ADD COLUMN IF NOT EXISTS next_run_at TIMESTAMP WITHOUT TIME ZONE;'))
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS ix_scheduler_next_run_at ON scheduler (next_run_at);'))
+            conn.commit()
+        print("✅ Columns added successfully!")
+        print("ℹ️ Runs started before the upgrade have no next_run_at and are not resumed")
+
+if __name__ == '__main__':
+    add_scheduler_run_state_columns()
\ No newline at end of file
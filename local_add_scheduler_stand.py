@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Local script to add stand column to scheduler table
+"""
+import os
+from app import create_app, db
+from config.config import config as app_config
+
+def add_scheduler_stand_column():
+    """Add stand (test stand the slot allocator placed the run on)"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Adding stand column to scheduler table...")
+        with db.engine.connect() as conn:
+            conn.execute(db.text('ALTER TABLE scheduler ADD COLUMN IF NOT EXISTS stand INTEGER;'))
+            conn.commit()
+        print("✅ Column added successfully!")
+        print("ℹ️ Existing runs have no stand and use the jobs of stand 0")
+
+if __name__ == '__main__':
+    add_scheduler_stand_column()
\ No newline at end of file
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Local script to create jira_outbox table
+"""
+import os
+from app import create_app, db
+from app.models.jira_outbox import JiraOutbox
+from config.config import config as app_config
+
+def create_jira_outbox_table():
+    """Create jira_outbox table"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Creating jira_outbox table...")
+        db.create_all()
+        print("✅ jira_outbox table created successfully!")
+        
+        print("\n📊 Table structure:")
+        print("- id: Integer (Primary Key)")
+        print("- jira_key: String(50) - issue to update")
+        print("- action: String(30) - schedule")
+        print("- payload: JSON - planned start/end and known workflow state")
+        print("- status: String(20) - pending, in_flight, done, failed")
+        print("- attempts: Integer - push attempts so far")
+        print("- next_attempt_at: DateTime - backoff until")
+        print("- locked_until: DateTime - lease of the drainer that claimed the row")
+        print("- last_error: Text")
+        print("- created_at, updated_at: DateTime")
+
+if __name__ == '__main__':
+    create_jira_outbox_table()
\ No newline at end of file
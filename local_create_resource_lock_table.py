@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Local script to create resource_locks table
+"""
+import os
+from app import create_app, db
+from app.models.resource_lock import ResourceLock
+from config.config import config as app_config
+
+def create_resource_lock_table():
+    """Create resource_locks table"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Creating resource_locks table...")
+        db.create_all()
+        print("✅ resource_locks table created successfully!")
+        
+        print("\n📊 Table structure:")
+        print("- resource: String(100) (Primary Key) - locked resource, e.g. jenkins:Start_EKP_pipe")
+        print("- holder_id: Integer - scheduler.id of the run holding the lock")
+        print("- holder: String(50) - jira task of the run")
+        print("- acquired_at: DateTime")
+
+if __name__ == '__main__':
+    create_resource_lock_table()
\ No newline at end of file
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Local script to create slot_reservations table
+"""
+import os
+from app import create_app, db
+from app.models.slot_reservation import SlotReservation
+from config.config import config as app_config
+
+def create_slot_reservation_table():
+    """Create slot_reservations table with the per-stand no-overlap constraint"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Enabling btree_gist extension...")
+        with db.engine.connect() as conn:
+            # Needed for '=' on an integer column inside a gist EXCLUDE constraint
+            conn.execute(db.text('CREATE EXTENSION IF NOT EXISTS btree_gist;'))
+            conn.commit()
+        
+        print("Creating slot_reservations table...")
+        db.create_all()
+        print("✅ slot_reservations table created successfully!")
+        
+        print("\n📊 Table structure:")
+        print("- id: Integer (Primary Key)")
+        print("- jira_task: String(50) (Unique) - reserved task")
+        print("- pipeline: String(20) - EKP, INFOSRV")
+        print("- stand: Integer - test stand number")
+        print("- period: TSRANGE - reserved time [start, end)")
+        print("- created_at: DateTime")
+        print("- EXCLUDE USING gist (stand WITH =, period WITH &&)")
+
+if __name__ == '__main__':
+    create_slot_reservation_table()
\ No newline at end of file
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Local script to create sync_watermarks table
+"""
+import os
+from app import create_app, db
+from app.models.sync_watermark import SyncWatermark
+from config.config import config as app_config
+
+def create_sync_watermark_table():
+    """Create sync_watermarks table"""
+    config_name = os.getenv('FLASK_ENV', 'development')
+    app = create_app(app_config[config_name])
+    
+    with app.app_context():
+        print("Creating sync_watermarks table...")
+        db.create_all()
+        print("✅ sync_watermarks table created successfully!")
+        
+        print("\n📊 Table structure:")
+        print("- profile: String(50) (Primary Key) - sync profile name")
+        print("- watermark: DateTime - highest Jira updated date seen")
+        print("- last_full_sync: DateTime - last full reconcile run")
+
+if __name__ == '__main__':
+    create_sync_watermark_table()
\ No newline at end of file
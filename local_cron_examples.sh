@@ -12,8 +12,8 @@ echo "# 1. Полная автоматизация (синхронизация +
 echo "*/15 * * * * curl -X POST http://localhost:5000/tasks/api/auto-sync-and-schedule"
 echo ""
 
-echo "# 2. Только синхронизация каждые 10 минут"  
-echo "*/10 * * * * curl -X POST http://localhost:5000/tasks/api/auto-sync-only"
+echo "# 2. Только синхронизация каждый час (страховка к Jira webhook, см. ниже)"  
+echo "0 * * * * curl -X POST http://localhost:5000/tasks/api/auto-sync-only"
 echo ""
 
 echo "# 3. Только планирование каждые 30 минут"
@@ -32,6 +32,21 @@ echo "# 6. Планирование каждый будний день в 18:30
 echo "30 18 * * 1-5 curl -X POST http://localhost:5000/tasks/api/auto-schedule-only"
 echo ""
 
+echo "# 7. Отправка отложенных обновлений Jira (outbox) каждую минуту"
+echo "* * * * * curl -X POST http://localhost:5000/tasks/api/jira-outbox-drain"
+echo ""
+
+echo "# 8. AutoLT: постановка задач текущего часа в очередь и продвижение прогонов"
+echo "0 * * * * curl -X POST http://localhost:5000/tasks/api/autolt-process"
+echo "* * * * * curl -X POST http://localhost:5000/tasks/api/pipeline-tick"
+echo ""
+
+echo "=== Jira webhook (основной источник изменений) ==="
+echo "В Jira: System -> WebHooks, события Issue created/updated/deleted, JQL: project = EKPLT AND labels = autolt"
+echo "URL: http://<host>:5000/tasks/api/jira-webhook?secret=<JIRA_WEBHOOK_SECRET>"
+echo "Проверка локально: python replay_jira_webhooks.py --synthetic 100"
+echo ""
+
 echo "=== Команды для управления cron ==="
 echo "crontab -e     # редактировать cron jobs"
 echo "crontab -l     # показать текущие cron jobs" 
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Local Jira webhook replayer for /tasks/api/jira-webhook
+
+Replays captured payloads (JSON files with one payload or a list of payloads,
+or JSON Lines files) or generates synthetic issue events.
+"""
+import argparse
+import json
+import sys
+import time
+import requests
+
+def load_payloads(paths):
+    """Load webhook payloads from JSON / JSON Lines files"""
+    payloads = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            content = f.read().strip()
+        if not content:
+            continue
+        try:
+            data = json.loads(content)
+            payloads.extend(data if isinstance(data, list) else [data])
+        except json.JSONDecodeError:
+            payloads.extend(json.loads(line) for line in content.splitlines() if line.strip())
+    return payloads
+
+def synthetic_payloads(count, project='EKPLT', delete_every=0):
+    """Generate issue created/updated/deleted events shaped like Jira webhooks"""
+    payloads = []
+    for number in range(1, count + 1):
+        key = f'{project}-{900000 + number}'
+        if delete_every and number % delete_every == 0:
+            payloads.append({'webhookEvent': 'jira:issue_deleted', 'issue': {'key': key}})
+            continue
+        payloads.append({
+            'webhookEvent': 'jira:issue_created' if number % 2 else 'jira:issue_updated',
+            'timestamp': int(time.time() * 1000),
+            'issue': {
+                'key': key,
+                'fields': {
+                    'summary': f'Webhook replay task {number}',
+                    'description': 'Synthetic webhook event',
+                    'status': {'name': 'Open'},
+                    'assignee': None,
+                    'reporter': {'displayName': 'Webhook Replayer'},
+                    'priority': {'name': 'Major'},
+                    'issuetype': {'name': 'Task'},
+                    'project': {'key': project},
+                    'labels': ['autolt'],
+                    'created': '2024-05-01T10:00:00.000+0300',
+                    'updated': '2024-05-01T10:00:00.000+0300',
+                    'resolutiondate': None,
+                    'customfield_10000': '2024-05-10T19:00:00.000+0300'
+                }
+            }
+        })
+    return payloads
+
+def replay(payloads, base_url, secret=None, delay=0.0):
+    """POST payloads one by one and report status codes and latency"""
+    url = f"{base_url}/tasks/api/jira-webhook"
+    params = {'secret': secret} if secret else None
+    session = requests.Session()
+    statuses = {}
+    latencies = []
+
+    for payload in payloads:
+        started = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, params=params, timeout=10)
+            status = response.status_code
+        except requests.exceptions.RequestException as e:
+            print(f"❌ {payload.get('issue', {}).get('key')}: {e}")
+            status = 'error'
+        latencies.append(time.perf_counter() - started)
+        statuses[status] = statuses.get(status, 0) + 1
+        if delay:
+            time.sleep(delay)
+
+    latencies.sort()
+    print(f"📨 Sent {len(payloads)} events to {url}")
+    print(f"📊 Status codes: {statuses}")
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        print(f"⏱️ Latency p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+    return statuses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', help='captured payload files (.json / .jsonl)')
+    parser.add_argument('--url', default='http://localhost:5000', help='application base URL')
+    parser.add_argument('--secret', help='JIRA_WEBHOOK_SECRET value')
+    parser.add_argument('--synthetic', type=int, default=0, help='generate N synthetic events')
+    parser.add_argument('--delete-every', type=int, default=0, help='make every Nth synthetic event a deletion')
+    parser.add_argument('--delay', type=float, default=0.0, help='pause between events, seconds')
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.files)
+    if args.synthetic:
+        payloads.extend(synthetic_payloads(args.synthetic, delete_every=args.delete_every))
+    if not payloads:
+        parser.error('nothing to replay: pass payload files or --synthetic N')
+
+    statuses = replay(payloads, args.url, args.secret, args.delay)
+    failed = sum(count for status, count in statuses.items() if status not in (200, 202))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file